@@ -0,0 +1,213 @@
+"""
+Cópias de segurança com o bot a escrever: impacto nas escritas, consistência e restauro.
+
+    python -m benchmarks.backup_bench
+    python -m benchmarks.backup_bench --users 500000 --write-rate 400 --seconds 10 -o backup.json
+
+Cria uma base de dados com `--users` utilizadores (e `--usage` linhas de
+command_usage, para ter tamanho) e abre-a com o `DatabaseManager`. Chegam
+`--write-rate` add_xp_coins(xp=1, coins=1) por segundo durante `--seconds`
+segundos sem cópias e outros tantos com o `BackupManager` a fazer cópias
+seguidas; compara a latência das escritas nos dois casos.
+
+Verifica, e sai com código 1 se alguma falhar:
+- cada cópia feita durante as escritas passa no quick_check e é um
+  snapshot de um commit (a soma de coins é igual à de commands_count, que
+  as escritas sobem juntas);
+- repor a última cópia, depois de estragar a base de dados, devolve
+  exatamente o conteúdo que ela tinha quando foi copiada.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+from benchmarks.storage_bench import _summary, seed
+
+BASE_ID = 10**17
+
+
+def digest(path: str) -> str:
+    """Hash do conteúdo de todas as tabelas (por ordem de chave), independente das páginas."""
+    connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        h = hashlib.sha256()
+        tables = connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+        ).fetchall()
+        for (table,) in tables:
+            h.update(table.encode())
+            for row in connection.execute(f'SELECT * FROM "{table}" ORDER BY 1, 2'):
+                h.update(repr(row).encode())
+        return h.hexdigest()
+    finally:
+        connection.close()
+
+
+def balanced(archive: str, workdir: str) -> bool:
+    """A cópia tem SUM(coins) = SUM(commands_count), i.e. não apanhou meia escrita."""
+    from database.backup import _decompress
+
+    path = os.path.join(workdir, "check.db")
+    _decompress(archive, path)
+    connection = sqlite3.connect(path)
+    try:
+        coins, count = connection.execute("SELECT SUM(coins), SUM(commands_count) FROM users").fetchone()
+    finally:
+        connection.close()
+        os.remove(path)
+    return coins == count
+
+
+async def run(path: str, backup_dir: str, args) -> Dict:
+    from database import DatabaseManager
+    from database.backup import BackupManager
+
+    db = await DatabaseManager.open(path, user_cache_size=0)
+    manager = BackupManager(
+        path, backup_dir, keep_last=1000, keep_daily=0, pages=args.pages, step_sleep=args.step_sleep
+    )
+    rng = random.Random(0)
+
+    async def phase(with_backups: bool) -> Dict:
+        stop = asyncio.Event()
+        latencies: List[float] = []
+        pending = set()
+        results = []
+
+        async def write() -> None:
+            started = time.perf_counter()
+            await db.add_xp_coins(BASE_ID + rng.randrange(args.users), xp=1, coins=1)
+            latencies.append(time.perf_counter() - started)
+
+        async def writer() -> None:
+            interval = 1 / args.write_rate
+            next_at = time.perf_counter()
+            while not stop.is_set():
+                task = asyncio.create_task(write())
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+                next_at += interval
+                await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+
+        async def backups() -> None:
+            while not stop.is_set():
+                results.append(await manager.run())
+                await asyncio.sleep(1.1)  # o nome das cópias tem resolução de um segundo
+
+        tasks = [asyncio.create_task(writer())]
+        if with_backups:
+            tasks.append(asyncio.create_task(backups()))
+        await asyncio.sleep(args.seconds)
+        stop.set()
+        await asyncio.gather(*tasks)
+        await asyncio.gather(*pending)
+        return {"write": _summary(latencies), "writes": len(latencies), "backups": results}
+
+    without = await phase(False)
+    during = await phase(True)
+    await db.close()
+    return {"sem_copia": without, "com_copia": during}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=200_000)
+    parser.add_argument("--usage", type=int, default=1_000_000, help="linhas de command_usage")
+    parser.add_argument("--write-rate", type=float, default=200, help="escritas por segundo")
+    parser.add_argument("--seconds", type=float, default=5.0, help="duração de cada fase")
+    parser.add_argument("--pages", type=int, default=256, help="páginas por passo da cópia")
+    parser.add_argument("--step-sleep", type=float, default=0.01, help="pausa entre passos (segundos)")
+    parser.add_argument("--dir", help="diretório de trabalho (por defeito um temporário)")
+    parser.add_argument("-o", "--output", help="gravar o relatório JSON neste ficheiro")
+    args = parser.parse_args()
+
+    from database.backup import list_backups, restore, verify
+
+    workdir = tempfile.mkdtemp(dir=args.dir)
+    failures = []
+    try:
+        path = os.path.join(workdir, "database.db")
+        backup_dir = os.path.join(workdir, "backups")
+        seed(path, args.users, version=None)
+        connection = sqlite3.connect(path)
+        rng = random.Random(1)
+        with connection:
+            connection.executemany(
+                "INSERT OR IGNORE INTO command_usage(discord_id, command_name, usage_count) VALUES (?, ?, ?)",
+                ((BASE_ID + rng.randrange(args.users), f"comando{rng.randrange(60)}", rng.randrange(1, 50))
+                 for _ in range(args.usage)),
+            )
+        connection.close()
+        print(f"Base de dados: {os.path.getsize(path) / 2**20:.0f} MiB")
+
+        report = asyncio.run(run(path, backup_dir, args))
+        backups = report["com_copia"].pop("backups")
+        report["sem_copia"].pop("backups")
+        report["copias"] = [
+            {"seconds": b.seconds, "pages": b.pages, "size_bytes": b.size_bytes, "compressed_bytes": b.compressed_bytes}
+            for b in backups
+        ]
+
+        for archive in list_backups(backup_dir):
+            verify(archive)
+            if not balanced(archive, workdir):
+                failures.append(f"{os.path.basename(archive)}: soma de coins != commands_count (cópia rasgada)")
+        if not backups:
+            failures.append("nenhuma cópia terminou durante as escritas")
+
+        # Restauro: copiar, estragar, repor e comparar com o que estava quando se copiou
+        before = digest(path)
+        shutil.rmtree(backup_dir)
+        from database.backup import BackupManager
+
+        final = asyncio.run(BackupManager(path, backup_dir).run())
+        connection = sqlite3.connect(path)
+        with connection:
+            connection.execute("DELETE FROM command_usage WHERE discord_id % 2 = 0")
+            connection.execute("UPDATE users SET coins = -1")
+        connection.close()
+        started = time.perf_counter()
+        restore(final.path, path)
+        report["restore_seconds"] = time.perf_counter() - started
+        report["restore_ok"] = digest(path) == before
+        if not report["restore_ok"]:
+            failures.append("o conteúdo reposto não é igual ao copiado")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"{args.write_rate:g} escritas/s, {args.seconds:g}s por fase, cópias de {args.pages} páginas por passo")
+    print(f"{'fase':<10} {'escritas':>8}  {'escrita p50/p99/max (ms)':>26}")
+    for name in ("sem_copia", "com_copia"):
+        r = report[name]
+        w = r["write"]
+        print(f"{name:<10} {r['writes']:8d}  {w['p50_ms']:8.2f} {w['p99_ms']:8.2f} {w['max_ms']:8.1f}")
+    for i, b in enumerate(report["copias"]):
+        print(
+            f"cópia {i + 1}: {b['pages']} páginas, {b['size_bytes'] / 2**20:.0f} MiB -> "
+            f"{b['compressed_bytes'] / 2**20:.1f} MiB em {b['seconds']:.2f}s"
+        )
+    print(f"restauro em {report['restore_seconds']:.2f}s, conteúdo igual: {report['restore_ok']}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"Relatório gravado em {args.output}")
+
+    if failures:
+        for failure in failures:
+            print(f"FALHOU: {failure}")
+        sys.exit(1)
+    print("OK: cópias consistentes e restauro verificado")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+Débito e latência de cada método do DatabaseManager, com N pedidos em simultâneo.
+
+    python -m benchmarks.db_bench
+    python -m benchmarks.seed_db seed.db --users 1000000 --usage 20000000
+    python -m benchmarks.db_bench --db seed.db --concurrency 1,8,64 --seconds 5 -o db.json
+    python -m benchmarks.db_bench --db seed.db --methods get_user,add_warn --ops 20000
+
+Sem `--db` semeia uma base de dados pequena num diretório temporário (com
+os parâmetros `--users`, `--usage`, ... do `benchmarks.seed_db`). Com
+`--db` usa uma já semeada, copiada para um temporário para as escritas
+não a mudarem (`--in-place` usa o próprio ficheiro).
+
+Para cada método e cada nível de `--concurrency`, N tarefas chamam o
+método em ciclo fechado (cada uma espera pela resposta antes do pedido
+seguinte) durante `--seconds` segundos ou até `--ops` chamadas. Os
+argumentos seguem as distribuições da base de dados (utilizadores ativos,
+comandos e jogos populares, servidor de casa, reincidentes nos avisos),
+sorteados a partir de `--seed`: com a mesma base de dados e a mesma
+semente, cada tarefa faz exatamente a mesma sequência de pedidos.
+
+Mostra ops/s e p50/p95/p99/max de cada método por nível de concorrência.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+from typing import Awaitable, Callable, Dict, List
+
+from benchmarks.seed_db import DAY, NOW, REASONS, Population, load_population, seed
+
+Call = Callable[[random.Random], Awaitable]
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    ordered = sorted(values) or [0.0]
+
+    def at(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+    return {"p50_ms": at(0.50), "p95_ms": at(0.95), "p99_ms": at(0.99), "max_ms": ordered[-1] * 1000}
+
+
+def calls(db, pop: Population) -> Dict[str, Call]:
+    """Cada método do DatabaseManager, com os argumentos sorteados das distribuições da `Population`."""
+    new_users = iter(range(pop.users, 2**40))
+
+    async def get_user(rng):
+        return await db.get_user(pop.user_id(pop.user(rng)))
+
+    async def create_user(rng):
+        index = next(new_users)
+        return await db.create_user(pop.user_id(index), f"user{index}")
+
+    async def add_xp_coins(rng):
+        return await db.add_xp_coins(pop.user_id(pop.user(rng)), xp=rng.randrange(1, 20), coins=rng.randrange(1, 20))
+
+    async def flush_command_usage(rng):
+        # Um flush do CommandUsageBuffer: ~50 utilizadores ativos num intervalo
+        usage = {}
+        for _ in range(50):
+            key = (pop.user_id(pop.user(rng)), pop.command(rng))
+            usage[key] = usage.get(key, 0) + 1
+        return await db.flush_command_usage(usage)
+
+    async def get_command_stats(rng):
+        return await db.get_command_stats(20, ascending=rng.random() < 0.2)
+
+    async def add_warn(rng):
+        user = pop.offender(rng)
+        return await db.add_warn(
+            pop.user_id(user), pop.guild(rng, user), pop.user_id(pop.user(rng)), rng.choice(REASONS)
+        )
+
+    async def get_warnings(rng):
+        user = pop.offender(rng)
+        return await db.get_warnings(pop.user_id(user), pop.guild(rng, user))
+
+    async def add_gaming_session(rng):
+        user = pop.gamer(rng)
+        started_at = NOW + rng.randrange(DAY)
+        return await db.add_gaming_session(
+            pop.user_id(user), pop.guild(rng, user), pop.game(rng), started_at, started_at + pop.duration(rng)
+        )
+
+    async def get_user_stats(rng):
+        user = pop.gamer(rng)
+        return await db.get_user_stats(pop.user_id(user), pop.guild(rng, user))
+
+    return {
+        "get_user": get_user,
+        "create_user": create_user,
+        "add_xp_coins": add_xp_coins,
+        "flush_command_usage": flush_command_usage,
+        "get_command_stats": get_command_stats,
+        "add_warn": add_warn,
+        "get_warnings": get_warnings,
+        "add_gaming_session": add_gaming_session,
+        "get_user_stats": get_user_stats,
+    }
+
+
+async def drive(call: Call, concurrency: int, seconds: float, ops: int, seed_key: str) -> Dict:
+    latencies: List[float] = []
+    deadline = time.perf_counter() + seconds
+    remaining = [ops or float("inf")]
+
+    async def worker(index: int) -> None:
+        rng = random.Random(f"{seed_key}:{index}")
+        while remaining[0] > 0 and time.perf_counter() < deadline:
+            remaining[0] -= 1
+            started = time.perf_counter()
+            await call(rng)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {"ops": len(latencies), "ops_per_s": len(latencies) / elapsed, **percentiles(latencies)}
+
+
+async def run(path: str, pop: Population, args) -> Dict[str, Dict[str, Dict]]:
+    from database import DatabaseManager
+
+    db = await DatabaseManager.open(path, readers=args.db_readers, user_cache_size=args.user_cache)
+    methods = calls(db, pop)
+    selected = args.methods.split(",") if args.methods else list(methods)
+    unknown = [name for name in selected if name not in methods]
+    if unknown:
+        await db.close()
+        raise SystemExit(f"métodos desconhecidos: {', '.join(unknown)} (há {', '.join(methods)})")
+
+    report: Dict[str, Dict[str, Dict]] = {}
+    try:
+        for name in selected:
+            report[name] = {}
+            for concurrency in args.concurrency:
+                result = await drive(methods[name], concurrency, args.seconds, args.ops, f"{args.seed}:{name}:{concurrency}")
+                report[name][str(concurrency)] = result
+                print(
+                    f"{name:<20} {concurrency:>4} {result['ops']:>8} {result['ops_per_s']:>9.0f}  "
+                    f"{result['p50_ms']:7.2f} {result['p95_ms']:7.2f} {result['p99_ms']:7.2f} {result['max_ms']:8.1f}"
+                )
+    finally:
+        await db.close()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", help="base de dados do benchmarks.seed_db (por defeito semeia uma pequena)")
+    parser.add_argument("--in-place", action="store_true", help="usar o ficheiro de --db em vez de uma cópia")
+    parser.add_argument("--methods", help="métodos separados por vírgulas (por defeito todos)")
+    parser.add_argument(
+        "--concurrency", type=lambda s: [int(n) for n in s.split(",")], default=[1, 8, 32],
+        help="pedidos em simultâneo, ex. 1,8,32",
+    )
+    parser.add_argument("--seconds", type=float, default=3.0, help="duração de cada medição")
+    parser.add_argument("--ops", type=int, default=0, help="parar cada medição ao fim de N chamadas")
+    parser.add_argument("--seed", type=int, default=1, help="semente dos argumentos (e da base de dados semeada)")
+    parser.add_argument("--user-cache", type=int, default=4096, help="tamanho da cache do get_user (0 desliga)")
+    parser.add_argument("--db-readers", type=int, default=4, help="ligações de leitura do Storage")
+    parser.add_argument("--users", type=int, default=50_000, help="sem --db: utilizadores a semear")
+    parser.add_argument("--usage", type=int, default=500_000, help="sem --db: usos de comandos")
+    parser.add_argument("--warns", type=int, default=20_000, help="sem --db: avisos")
+    parser.add_argument("--sessions", type=int, default=200_000, help="sem --db: sessões de jogo")
+    parser.add_argument("--dir", help="diretório de trabalho (por defeito um temporário)")
+    parser.add_argument("-o", "--output", help="gravar o relatório JSON neste ficheiro")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(dir=args.dir)
+    try:
+        if args.db:
+            pop = load_population(args.db)
+            path = args.db
+            if not args.in_place:
+                path = os.path.join(workdir, "database.db")
+                shutil.copyfile(args.db, path)
+        else:
+            pop = Population(users=args.users, seed=args.seed)
+            path = os.path.join(workdir, "database.db")
+            seed(path, pop, usage=args.usage, warns=args.warns, sessions=args.sessions)
+
+        print(f"{'método':<20} {'N':>4} {'ops':>8} {'ops/s':>9}  {'p50':>7} {'p95':>7} {'p99':>7} {'max (ms)':>8}")
+        report = asyncio.run(run(path, pop, args))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(
+                {"population": pop.params, "seconds": args.seconds, "ops": args.ops, "methods": report},
+                f, ensure_ascii=False, indent=2,
+            )
+        print(f"Relatório gravado em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Updates perdidos e latência de add_xp_coins/create_user com chamadas em simultâneo.
+
+    python -m benchmarks.economy_bench
+    python -m benchmarks.economy_bench --callers 100 --ops 50 --hot-users 5 -o economy.json
+
+"antes" é o código original do DatabaseManager (uma ligação, o saldo lido
+em Python e reescrito, commit a cada instrução); "depois" é o atual (um
+UPDATE ... RETURNING por operação, na fila do escritor). `--callers` tarefas
+fazem `--ops` add_xp_coins(coins=1) cada uma sobre `--hot-users`
+utilizadores: no fim a soma dos saldos tem de ser callers × ops. Depois
+criam-se `--new-users` utilizadores em simultâneo (create_user).
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+from typing import Dict, List
+
+from benchmarks.storage_bench import LegacyDatabase, _summary
+
+BASE_ID = 10**17
+
+
+class LegacyEconomy(LegacyDatabase):
+    """O create_user de antes: insert + commit, select, insert + commit e um get_user."""
+
+    async def create_user(self, discord_id: int, name: str):
+        joined_at = datetime.datetime.utcnow().isoformat()
+        await self.connection.execute(
+            "INSERT OR IGNORE INTO users(discord_id, name, joined_at) VALUES (?, ?, ?)",
+            (str(discord_id), name, joined_at),
+        )
+        await self.connection.commit()
+        async with self.connection.execute("SELECT id FROM users WHERE discord_id=?", (str(discord_id),)) as cursor:
+            row = await cursor.fetchone()
+        if row:
+            await self.connection.execute("INSERT OR IGNORE INTO user_settings(user_id) VALUES(?)", (row[0],))
+            await self.connection.commit()
+        return await self.get_user(discord_id)
+
+
+def seed(path: str, users: int, version) -> None:
+    from database.migrations import migrate_sync
+
+    connection = sqlite3.connect(path)
+    migrate_sync(connection, target=version)
+    cast = str if version == 1 else int
+    connection.executemany(
+        "INSERT INTO users(discord_id, name, coins, joined_at) VALUES (?, ?, 0, '2024-01-01T00:00:00')",
+        ((cast(BASE_ID + i), f"user{i}") for i in range(users)),
+    )
+    connection.execute("INSERT INTO user_settings(user_id) SELECT id FROM users")
+    connection.commit()
+    connection.close()
+
+
+async def run_mode(mode: str, path: str, args) -> Dict:
+    import aiosqlite
+
+    from database import DatabaseManager
+
+    if mode == "antes":
+        db = LegacyEconomy(await aiosqlite.connect(path))
+        await db.connection.execute("PRAGMA journal_mode = DELETE")
+    else:
+        db = await DatabaseManager.open(path, user_cache_size=0)
+
+    add_latencies: List[float] = []
+
+    async def caller(index: int) -> None:
+        for i in range(args.ops):
+            started = time.perf_counter()
+            await db.add_xp_coins(BASE_ID + (index + i) % args.hot_users, xp=1, coins=1)
+            add_latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(caller(i) for i in range(args.callers)))
+    add_seconds = time.perf_counter() - started
+
+    create_latencies: List[float] = []
+
+    async def create(index: int) -> None:
+        started = time.perf_counter()
+        await db.create_user(BASE_ID + args.hot_users + index, f"novo{index}")
+        create_latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(create(i) for i in range(args.new_users)))
+    await db.close()
+
+    connection = sqlite3.connect(path)
+    coins = connection.execute("SELECT SUM(coins) FROM users").fetchone()[0]
+    created = connection.execute("SELECT COUNT(*) FROM users").fetchone()[0] - args.hot_users
+    settings = connection.execute("SELECT COUNT(*) FROM user_settings").fetchone()[0]
+    connection.close()
+
+    expected = args.callers * args.ops
+    return {
+        "expected_coins": expected,
+        "coins": coins,
+        "lost_updates": expected - coins,
+        "add_per_s": expected / add_seconds,
+        "add": _summary(add_latencies),
+        "created": created,
+        "settings_rows": settings,
+        "create": _summary(create_latencies),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--callers", type=int, default=50, help="tarefas em simultâneo")
+    parser.add_argument("--ops", type=int, default=20, help="add_xp_coins por tarefa")
+    parser.add_argument("--hot-users", type=int, default=10, help="utilizadores disputados")
+    parser.add_argument("--new-users", type=int, default=200, help="create_user em simultâneo")
+    parser.add_argument("--dir", help="diretório para a base de dados (por defeito um temporário)")
+    parser.add_argument("-o", "--output", help="gravar o relatório JSON neste ficheiro")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(dir=args.dir)
+    try:
+        report = {}
+        for mode in ("antes", "depois"):
+            path = os.path.join(workdir, f"{mode}.db")
+            seed(path, args.hot_users, version=1 if mode == "antes" else None)
+            report[mode] = asyncio.run(run_mode(mode, path, args))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"{args.callers} tarefas × {args.ops} add_xp_coins sobre {args.hot_users} utilizadores; {args.new_users} create_user")
+    print(
+        f"{'modo':<7} {'moedas':>13} {'perdidos':>8} {'add/s':>7}  {'add p50/p99 (ms)':>17}  "
+        f"{'criados':>7}  {'create p50/p99 (ms)':>20}"
+    )
+    for mode, r in report.items():
+        add, create = r["add"], r["create"]
+        print(
+            f"{mode:<7} {r['coins']:>6}/{r['expected_coins']:<6} {r['lost_updates']:8d} {r['add_per_s']:7.0f}  "
+            f"{add['p50_ms']:8.2f} {add['p99_ms']:8.2f}  {r['created']:7d}  {create['p50_ms']:9.2f} {create['p99_ms']:10.2f}"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"Relatório gravado em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+"""
+Camada Discord falsa para correr comandos sem gateway.
+
+`FakeInteraction` e `FakeContext` são subclasses das classes do discord.py
+(os `isinstance` nos cogs e no paginator continuam a funcionar), mas tudo o
+que iria para a API do Discord fica registado numa `Transcript`.
+"""
+import time
+from typing import Any, List, Optional
+
+import discord
+from discord.ext import commands
+
+
+def _snowflake() -> int:
+    # id com o timestamp atual, para que `created_at` faça sentido
+    return discord.utils.time_snowflake(discord.utils.utcnow()) + (time.perf_counter_ns() & 0x3FFFFF)
+
+
+class SentMessage:
+    def __init__(self, transcript: "Transcript", **kwargs) -> None:
+        self.id = _snowflake()
+        self.transcript = transcript
+        self.content: Optional[str] = kwargs.get("content")
+        self.embeds: List[discord.Embed] = list(kwargs.get("embeds") or [])
+        if kwargs.get("embed") is not None:
+            self.embeds.append(kwargs["embed"])
+        self.files: List[discord.File] = list(kwargs.get("files") or [])
+        if kwargs.get("file") is not None:
+            self.files.append(kwargs["file"])
+        self.view = kwargs.get("view")
+        self.ephemeral = bool(kwargs.get("ephemeral"))
+        self.edits = 0
+
+    async def edit(self, **kwargs) -> "SentMessage":
+        self.edits += 1
+        self.transcript.edits += 1
+        if "content" in kwargs:
+            self.content = kwargs["content"]
+        if "embed" in kwargs:
+            self.embeds = [kwargs["embed"]] if kwargs["embed"] is not None else []
+        if "view" in kwargs:
+            self.view = kwargs["view"]
+        return self
+
+    async def delete(self, **kwargs) -> None:
+        self.transcript.deleted += 1
+
+    async def add_reaction(self, emoji) -> None:
+        pass
+
+
+class Transcript:
+    """Tudo o que um comando enviou, editou ou apagou."""
+
+    def __init__(self) -> None:
+        self.messages: List[SentMessage] = []
+        self.edits = 0
+        self.deleted = 0
+        self.deferred = False
+
+    def add(self, **kwargs) -> SentMessage:
+        message = SentMessage(self, **kwargs)
+        self.messages.append(message)
+        return message
+
+    @property
+    def embeds(self) -> int:
+        return sum(len(m.embeds) for m in self.messages)
+
+    @property
+    def files(self) -> int:
+        return sum(len(m.files) for m in self.messages)
+
+    def text(self) -> str:
+        """Conteúdo enviado (texto e títulos/descrições dos embeds), para procurar erros."""
+        parts = []
+        for m in self.messages:
+            if m.content:
+                parts.append(m.content)
+            for e in m.embeds:
+                parts.extend(filter(None, (e.title, e.description)))
+        return "\n".join(parts)
+
+
+class _Typing:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        return None
+
+
+class FakeUser:
+    def __init__(self, user_id: int = 111111111111111111, name: str = "replay") -> None:
+        self.id = user_id
+        self.name = name
+        self.global_name = name
+        self.display_name = name
+        self.mention = f"<@{user_id}>"
+        self.bot = False
+        self.avatar = None
+        self.display_avatar = discord.Asset._from_default_avatar(None, 0)
+        self.guild_permissions = discord.Permissions.all()
+        self.roles: List[Any] = []
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class FakeChannel:
+    def __init__(self, transcript: Transcript, channel_id: int = 222222222222222222) -> None:
+        self.id = channel_id
+        self.name = "replay"
+        self.mention = f"<#{channel_id}>"
+        self.transcript = transcript
+
+    async def send(self, content: Optional[str] = None, **kwargs) -> SentMessage:
+        return self.transcript.add(content=content, **kwargs)
+
+    def typing(self) -> _Typing:
+        return _Typing()
+
+
+class FakeGuild:
+    def __init__(self, guild_id: int, user: FakeUser) -> None:
+        self.id = guild_id
+        self.name = "Replay"
+        self.members = [user]
+        self.member_count = 1
+        self.icon = None
+
+    def get_member(self, user_id: int):
+        return next((m for m in self.members if m.id == user_id), None)
+
+
+class FakeInteractionResponse:
+    def __init__(self, transcript: Transcript) -> None:
+        self.transcript = transcript
+        self._done = False
+
+    def is_done(self) -> bool:
+        return self._done
+
+    async def defer(self, *, ephemeral: bool = False, thinking: bool = False) -> None:
+        self._done = True
+        self.transcript.deferred = True
+
+    async def send_message(self, content: Optional[str] = None, **kwargs) -> None:
+        self._done = True
+        self.transcript.add(content=content, **kwargs)
+
+    async def edit_message(self, **kwargs) -> None:
+        self._done = True
+        self.transcript.edits += 1
+
+    async def send_modal(self, modal) -> None:
+        self._done = True
+
+
+class FakeWebhook:
+    def __init__(self, transcript: Transcript) -> None:
+        self.transcript = transcript
+
+    async def send(self, content: Optional[str] = None, **kwargs) -> SentMessage:
+        return self.transcript.add(content=content, **kwargs)
+
+
+class FakeInteraction(discord.Interaction):
+    def __init__(self, bot: commands.Bot, transcript: Transcript, user: FakeUser, guild: FakeGuild) -> None:
+        # Não chama o __init__ do discord.py (precisaria de um payload do gateway):
+        # preenche os slots que os cogs usam.
+        self.id = _snowflake()
+        self.type = discord.InteractionType.application_command
+        self.guild_id = guild.id
+        self.data = {}
+        self.application_id = getattr(bot, "application_id", None)
+        self.message = None
+        self.user = user
+        self.token = "replay"
+        self.version = 1
+        self.locale = discord.Locale.american_english
+        self.guild_locale = discord.Locale.american_english
+        self.extras = {}
+        self.command_failed = False
+        self.channel = FakeChannel(transcript)
+        self._client = bot
+        self._state = bot._connection
+        self._permissions = discord.Permissions.all().value
+        self._app_permissions = discord.Permissions.all().value
+        self._cs_response = FakeInteractionResponse(transcript)
+        self._cs_followup = FakeWebhook(transcript)
+        self._cs_command = None
+        self._fake_guild = guild
+        self.transcript = transcript
+
+    @property
+    def guild(self) -> FakeGuild:
+        return self._fake_guild
+
+    async def original_response(self) -> SentMessage:
+        if self.transcript.messages:
+            return self.transcript.messages[0]
+        return self.transcript.add()
+
+    async def edit_original_response(self, **kwargs) -> SentMessage:
+        message = await self.original_response()
+        return await message.edit(**kwargs)
+
+    async def delete_original_response(self) -> None:
+        self.transcript.deleted += 1
+
+
+class FakeContext(commands.Context):
+    def __init__(self, bot: commands.Bot, transcript: Transcript, user: FakeUser, guild: FakeGuild, command) -> None:
+        # Como no FakeInteraction, nada de payloads: só o que os comandos usam
+        self.bot = bot
+        self.command = command
+        self.interaction = None
+        self.message = None
+        self.prefix = bot.bot_prefix or "!"
+        self.invoked_with = command.name
+        self.invoked_parents = []
+        self.invoked_subcommand = None
+        self.subcommand_passed = None
+        self.command_failed = False
+        self.args = []
+        self.kwargs = {}
+        self.current_parameter = None
+        self.current_argument = None
+        self._state = bot._connection
+        self._fake_author = user
+        self._fake_guild = guild
+        self._fake_channel = FakeChannel(transcript)
+        self.transcript = transcript
+
+    @property
+    def author(self) -> FakeUser:
+        return self._fake_author
+
+    @property
+    def guild(self) -> FakeGuild:
+        return self._fake_guild
+
+    @property
+    def channel(self) -> FakeChannel:
+        return self._fake_channel
+
+    @property
+    def me(self):
+        return self.bot.user
+
+    async def send(self, content: Optional[str] = None, **kwargs) -> SentMessage:
+        kwargs.pop("ephemeral", None)
+        return self.transcript.add(content=content, **kwargs)
+
+    async def reply(self, content: Optional[str] = None, **kwargs) -> SentMessage:
+        return await self.send(content, **kwargs)
+
+    async def defer(self, *, ephemeral: bool = False) -> None:
+        self.transcript.deferred = True
+
+    def typing(self, *, ephemeral: bool = False) -> _Typing:
+        return _Typing()
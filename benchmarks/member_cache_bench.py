@@ -0,0 +1,239 @@
+"""
+Custo em memória e CPU de cada política de cache de membros (utils/members.py).
+
+    python -m benchmarks.member_cache_bench
+    python -m benchmarks.member_cache_bench --members 50000 --events 200000 -o cache.json
+
+Cada política corre num processo à parte, com um `ConnectionState` do
+discord.py configurado como o bot o configuraria, e recebe os mesmos
+eventos sintéticos do gateway: o GUILD_CREATE de um servidor grande, o
+chunking (se a política o pedir) e depois um fluxo de PRESENCE_UPDATE,
+GUILD_MEMBER_UPDATE e GUILD_MEMBER_ADD. Eventos de um intent desligado não
+são enviados pelo Discord, por isso também não entram aqui: é essa a
+poupança. Mede-se a RSS e o heap (tracemalloc) depois do arranque e o
+tempo de CPU a processar o fluxo.
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# nome: argumentos do build_cache_policy
+POLICIES: Dict[str, dict] = {
+    "anterior": dict(members=True, presences=True, member_cache="all", chunk_guilds_at_startup=True),
+    "members+chunk": dict(members=True, presences=False, member_cache="all", chunk_guilds_at_startup=True),
+    "default": dict(members=True, presences=False, member_cache="default", chunk_guilds_at_startup=False),
+    "minimo": dict(members=False, presences=False, member_cache="none", chunk_guilds_at_startup=False),
+}
+
+GUILD_ID = "328240164621254656"
+BASE_ID = 10**17
+GAMES = ["Minecraft", "Old School RuneScape", "Counter-Strike 2", "Baldur's Gate 3", "Spotify", "Visual Studio Code"]
+
+
+def _user(i: int) -> dict:
+    return {
+        "id": str(BASE_ID + i),
+        "username": f"membro{i}",
+        "discriminator": "0",
+        "avatar": "a" * 32 if i % 3 else None,
+        "global_name": f"Membro {i}",
+    }
+
+
+def _member(i: int) -> dict:
+    return {
+        "user": _user(i),
+        "roles": [str(BASE_ID + 10**6 + i % 5)] if i % 2 else [],
+        "joined_at": "2024-01-01T00:00:00+00:00",
+        "deaf": False,
+        "mute": False,
+        "flags": 0,
+    }
+
+
+def _presence(i: int, rng: random.Random) -> dict:
+    activities = []
+    if rng.random() < 0.6:
+        activities.append({"name": rng.choice(GAMES), "type": 0, "created_at": 1700000000000})
+    if rng.random() < 0.2:
+        activities.append({"name": "Custom Status", "type": 4, "state": "🍺", "created_at": 1700000000000})
+    status = rng.choice(("online", "idle", "dnd"))
+    return {
+        "user": {"id": str(BASE_ID + i)},
+        "guild_id": GUILD_ID,
+        "status": status,
+        "activities": activities,
+        "client_status": {rng.choice(("desktop", "mobile", "web")): status},
+    }
+
+
+def _guild_create(member_ids: List[int], presences: List[dict], total: int) -> dict:
+    return {
+        "id": GUILD_ID,
+        "name": "Deboche",
+        "owner_id": str(BASE_ID),
+        "member_count": total,
+        "large": total > 250,
+        "members": [_member(i) for i in member_ids],
+        "presences": presences,
+        "channels": [],
+        "threads": [],
+        "voice_states": [],
+        "emojis": [],
+        "stickers": [],
+        "features": [],
+        "roles": [
+            {"id": GUILD_ID, "name": "@everyone", "permissions": "0", "position": 0, "color": 0,
+             "hoist": False, "managed": False, "mentionable": False},
+        ] + [
+            {"id": str(BASE_ID + 10**6 + r), "name": f"cargo{r}", "permissions": "0", "position": r + 1,
+             "color": 0, "hoist": False, "managed": False, "mentionable": False}
+            for r in range(5)
+        ],
+    }
+
+
+def _current_rss() -> int:
+    from utils.importtime import current_rss
+
+    return current_rss()
+
+
+# ---------- processo filho: uma política ----------
+def _child(name: str, total: int, online_ratio: float, events: int) -> Dict:
+    import discord
+    from discord.state import ConnectionState
+
+    from utils.members import build_cache_policy
+
+    policy = build_cache_policy(**POLICIES[name])
+    intents = policy.intents
+    rng = random.Random(0)
+
+    state = ConnectionState(
+        dispatch=lambda *args, **kwargs: None,
+        handlers={},
+        hooks={},
+        http=None,
+        intents=intents,
+        member_cache_flags=policy.member_cache_flags,
+        chunk_guilds_at_startup=policy.chunk_guilds_at_startup,
+    )
+
+    online = [i for i in range(total) if rng.random() < online_ratio]
+    # O Discord manda os membros online (com presenças) no GUILD_CREATE só com o intent presences
+    if intents.presences:
+        create = _guild_create(online, [_presence(i, rng) for i in online], total)
+    else:
+        create = _guild_create([0], [], total)
+
+    gc.collect()
+    rss_before = _current_rss()
+    tracemalloc.start()
+    cpu = time.process_time()
+
+    guild = state._add_guild_from_data(create)
+    if policy.chunk_guilds_at_startup:
+        # GUILD_MEMBERS_CHUNK pedidos no arranque: o discord.py guarda todos
+        for start in range(0, total, 1000):
+            for i in range(start, min(start + 1000, total)):
+                member = discord.Member(data=_member(i), guild=guild, state=state)
+                guild._add_member(member)
+
+    setup_cpu = time.process_time() - cpu
+    cached = len(guild.members)
+    gc.collect()
+    heap, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rss_after = _current_rss()
+
+    # Fluxo de eventos: 95% presenças, 4% updates de membros, 1% entradas
+    stream = []
+    joined = total
+    for _ in range(events):
+        roll = rng.random()
+        if roll < 0.95:
+            if intents.presences:
+                stream.append(("PRESENCE_UPDATE", _presence(rng.choice(online), rng)))
+        elif roll < 0.99:
+            if intents.members:
+                data = _member(rng.randrange(total))
+                data["guild_id"] = GUILD_ID
+                data["nick"] = f"nick{rng.randrange(1000)}"
+                stream.append(("GUILD_MEMBER_UPDATE", data))
+        elif intents.members:
+            data = _member(joined)
+            data["guild_id"] = GUILD_ID
+            joined += 1
+            stream.append(("GUILD_MEMBER_ADD", data))
+
+    parsers = state.parsers
+    cpu = time.process_time()
+    for event, data in stream:
+        parsers[event](data)
+    stream_cpu = time.process_time() - cpu
+
+    return {
+        "policy": policy.describe(),
+        "cached_members": cached,
+        "rss_mb": (rss_after - rss_before) / 2**20,
+        "heap_mb": heap / 2**20,
+        "setup_cpu_ms": setup_cpu * 1000,
+        "events": len(stream),
+        "stream_cpu_ms": stream_cpu * 1000,
+        "final_members": len(guild.members),
+    }
+
+
+# ---------- processo pai ----------
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--policies", default=",".join(POLICIES))
+    parser.add_argument("--members", type=int, default=20000, help="membros do servidor sintético")
+    parser.add_argument("--online", type=float, default=0.2, help="proporção de membros online")
+    parser.add_argument("--events", type=int, default=100000, help="eventos do gateway depois do arranque")
+    parser.add_argument("-o", "--output", help="gravar o relatório JSON neste ficheiro")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(_child(args.child, args.members, args.online, args.events)))
+        return
+
+    report = {}
+    for name in args.policies.split(","):
+        cmd = [
+            sys.executable, "-m", "benchmarks.member_cache_bench", "--child", name,
+            "--members", str(args.members), "--online", str(args.online), "--events", str(args.events),
+        ]
+        out = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True)
+        if out.returncode != 0:
+            raise RuntimeError(f"Política {name} falhou:\n{out.stderr}")
+        report[name] = json.loads(out.stdout.strip().splitlines()[-1])
+
+    print(f"{'política':<14} {'membros':>8} {'RSS MiB':>8} {'heap MiB':>9} {'arranque':>9} {'eventos':>8} {'CPU eventos':>12}")
+    for name, r in report.items():
+        print(
+            f"{name:<14} {r['cached_members']:8d} {r['rss_mb']:8.1f} {r['heap_mb']:9.1f} "
+            f"{r['setup_cpu_ms']:7.0f}ms {r['events']:8d} {r['stream_cpu_ms']:10.0f}ms  {r['policy']}"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"Relatório gravado em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
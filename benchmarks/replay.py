@@ -0,0 +1,325 @@
+"""
+Benchmark offline dos comandos do bot com respostas HTTP gravadas.
+
+    python -m benchmarks.replay run -o antes.json          # mede todos os cenários
+    python -m benchmarks.replay run -k steam -n 50          # só os que contêm "steam"
+    python -m benchmarks.replay compare antes.json depois.json
+    python -m benchmarks.replay run --record -k kanye       # grava fixtures novas (precisa de rede)
+
+Para cada cenário mede o tempo de parede (p50/p95), as alocações
+(tracemalloc, numa execução à parte para não distorcer os tempos) e o
+número de pedidos ao exterior. Não abre ligações nem fala com o Discord.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.scenarios import SCENARIOS, Scenario  # noqa: E402
+from benchmarks.vcr import FIXTURES_DIR, ReplayHTTPClient, RecordingHTTPClient, save_fixtures  # noqa: E402
+
+INVOKE_TIMEOUT = 30.0
+
+
+def _prepare_environment(workdir: str) -> None:
+    # Tem de acontecer antes de importar o bot/config
+    os.environ.setdefault("GUILD_ID", "1")
+    os.environ.setdefault("OPENWEATHER_API_KEY", "replay")
+    os.environ.setdefault("POLLINATIONS_API_KEY", "replay")
+    os.environ.setdefault("GROQ_API_KEY", "replay")
+    os.environ["LOG_FILE"] = os.path.join(workdir, "replay.log")
+    os.environ["HTTP_CACHE_FILE"] = ""
+    os.environ["METRICS_PORT"] = "0"
+
+
+async def build_bot(http, extensions: List[str]):
+    import bot as bot_module
+    from database import DatabaseManager
+
+    bot_module.import_profiler.uninstall()
+    # Só interessa o que os comandos enviam, não os logs deles
+    bot_module.logger.setLevel("WARNING")
+    logging.getLogger("discord").setLevel("ERROR")
+
+    bot = bot_module.DiscordBot()
+    # O que o login faria: o loop no bot (bot.loop.create_task nos cogs)
+    await bot._async_setup_hook()
+    bot.http_client = http
+    bot.database = await DatabaseManager.open(":memory:")
+    await seed_database(bot.database)
+
+    for extension in extensions:
+        await bot.load_extension(extension)
+    return bot
+
+
+async def seed_database(database) -> None:
+    """O utilizador dos cenários (/perfil, /trocas) e uma semana de uso de comandos (/stats)."""
+    from benchmarks.fakes import FakeUser
+
+    user = FakeUser()
+    await database.create_user(user.id, user.name)
+    rng = random.Random(0)
+    now = int(time.time()) // 3600
+    usage: Dict = {}
+    history: Dict = {}
+    for command in ("perfil", "stats", "trocas", "clima", "steamgame", "pokedex", "ye", "xkcd"):
+        for hour in range(now - 7 * 24, now + 1):
+            count = rng.randrange(4)
+            if count:
+                history[hour, command, int(os.environ["GUILD_ID"])] = count
+                usage[user.id, command] = usage.get((user.id, command), 0) + count
+    await database.flush_command_usage(usage, history)
+
+
+def _find_command(bot, scenario: Scenario):
+    from discord import app_commands
+
+    if scenario.kind == "ctx":
+        command = bot.get_command(scenario.command)
+        if command is None:
+            raise LookupError(f"Comando de texto/híbrido '{scenario.command}' não encontrado")
+        return command
+
+    for cog in bot.cogs.values():
+        for command in cog.walk_app_commands():
+            if isinstance(command, app_commands.Command) and command.qualified_name == scenario.command:
+                return command
+    raise LookupError(f"Slash command '{scenario.command}' não encontrado")
+
+
+async def invoke(bot, scenario: Scenario, command):
+    from benchmarks.fakes import FakeContext, FakeGuild, FakeInteraction, FakeUser, Transcript
+
+    transcript = Transcript()
+    user = FakeUser()
+    guild = FakeGuild(int(os.environ["GUILD_ID"]), user)
+    if scenario.kind == "ctx":
+        ctx = FakeContext(bot, transcript, user, guild, command)
+        coro = command.callback(command.cog, ctx, **scenario.kwargs)
+    else:
+        interaction = FakeInteraction(bot, transcript, user, guild)
+        interaction._cs_command = command
+        coro = command.callback(command.binding, interaction, **scenario.kwargs)
+
+    # alguns cogs fazem print(); não é para ir parar ao relatório
+    with contextlib.redirect_stdout(io.StringIO()):
+        await asyncio.wait_for(coro, INVOKE_TIMEOUT)
+    return transcript
+
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def measure(bot, http, scenario: Scenario, iterations: int) -> Dict:
+    command = _find_command(bot, scenario)
+    result: Dict = {"cog": scenario.cog, "command": scenario.command, "ok": True, "error": None}
+
+    # 1.ª execução à parte: imports preguiçosos, caches do discord.py, etc.
+    http.reset()
+    try:
+        transcript = await invoke(bot, scenario, command)
+    except Exception as e:
+        result.update(ok=False, error=f"{type(e).__name__}: {e}", misses=list(http.misses))
+        return result
+
+    result["messages"] = len(transcript.messages)
+    result["embeds"] = transcript.embeds
+    result["upstream_calls"] = http.calls
+    if http.misses:
+        result.update(ok=False, error="pedidos sem fixture", misses=sorted(set(http.misses)))
+    elif "❌" in transcript.text():
+        result.update(ok=False, error=transcript.text().split("\n", 1)[0][:200])
+
+    wall = []
+    for _ in range(iterations):
+        http.reset()
+        started = time.perf_counter()
+        await invoke(bot, scenario, command)
+        wall.append((time.perf_counter() - started) * 1000)
+    result["wall_ms"] = {
+        "p50": _percentile(wall, 0.5),
+        "p95": _percentile(wall, 0.95),
+        "mean": statistics.fmean(wall),
+        "min": min(wall),
+    }
+
+    http.reset()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        await invoke(bot, scenario, command)
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    result["alloc_peak_kb"] = (peak - before) / 1024
+    result["alloc_retained_kb"] = (after - before) / 1024
+    return result
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(scenarios: List[Scenario], iterations: int, latency: float) -> Dict:
+    random.seed(0)
+    http = ReplayHTTPClient.from_dir(latency=latency)
+    bot = await build_bot(http, sorted({s.extension for s in scenarios}))
+    results = {}
+    try:
+        for scenario in scenarios:
+            results[scenario.name] = await measure(bot, http, scenario, iterations)
+            _print_result(scenario.name, results[scenario.name])
+    finally:
+        await bot.close()
+
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "iterations": iterations,
+            "latency_ms": latency * 1000,
+        },
+        "scenarios": results,
+    }
+
+
+async def record(scenarios: List[Scenario]) -> None:
+    """Corre cada cenário uma vez contra as APIs reais e grava as respostas."""
+    http = RecordingHTTPClient()
+    await http.start()
+    bot = await build_bot(http, sorted({s.extension for s in scenarios}))
+    per_cog: Dict[str, List[dict]] = {}
+    try:
+        for scenario in scenarios:
+            http.recorded = []
+            await invoke(bot, scenario, _find_command(bot, scenario))
+            per_cog.setdefault(scenario.cog, []).extend(http.recorded)
+            print(f"{scenario.name}: {len(http.recorded)} respostas gravadas")
+    finally:
+        await bot.close()
+
+    for cog, entries in per_cog.items():
+        path = os.path.join(FIXTURES_DIR, f"{cog}.json")
+        existing = []
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                existing = json.load(f)
+        # as respostas novas substituem as antigas do mesmo pedido
+        replaced = {e["request"] for e in entries}
+        save_fixtures(path, [e for e in existing if e["request"] not in replaced] + entries)
+
+
+def _print_result(name: str, result: Dict) -> None:
+    if "wall_ms" not in result:
+        print(f"{name:<24} FALHOU  {result['error']}")
+        return
+    wall = result["wall_ms"]
+    status = "ok" if result["ok"] else f"AVISO: {result['error']}"
+    print(
+        f"{name:<24} p50 {wall['p50']:8.2f} ms  p95 {wall['p95']:8.2f} ms  "
+        f"alloc {result['alloc_peak_kb']:8.1f} KiB  http {result['upstream_calls']:2d}  {status}"
+    )
+
+
+def compare(old: Dict, new: Dict, threshold: float) -> int:
+    """Imprime as diferenças entre dois relatórios. Devolve o número de regressões."""
+    print(f"{'cenário':<24} {'p50 antes':>10} {'p50 depois':>10} {'Δ':>8}  {'alloc Δ':>9}  {'http':>7}")
+    regressions = 0
+    for name in sorted(set(old["scenarios"]) | set(new["scenarios"])):
+        a = old["scenarios"].get(name)
+        b = new["scenarios"].get(name)
+        if not a or not b or "wall_ms" not in a or "wall_ms" not in b:
+            print(f"{name:<24} {'—' if not a else 'ok':>10} {'—' if not b else 'ok':>10}")
+            continue
+        p50_a, p50_b = a["wall_ms"]["p50"], b["wall_ms"]["p50"]
+        delta = (p50_b - p50_a) / p50_a * 100 if p50_a else 0.0
+        alloc_delta = b["alloc_peak_kb"] - a["alloc_peak_kb"]
+        calls = f"{a['upstream_calls']}→{b['upstream_calls']}"
+        flag = ""
+        if delta > threshold:
+            flag = "  ⚠ mais lento"
+            regressions += 1
+        if b["upstream_calls"] > a["upstream_calls"]:
+            flag += "  ⚠ mais pedidos"
+            regressions += 1
+        print(f"{name:<24} {p50_a:10.2f} {p50_b:10.2f} {delta:+7.1f}%  {alloc_delta:+8.1f}K  {calls:>7}{flag}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="action", required=True)
+
+    run_parser = sub.add_parser("run", help="medir os cenários")
+    run_parser.add_argument("-k", "--filter", default="", help="só cenários cujo nome contém este texto")
+    run_parser.add_argument("-n", "--iterations", type=int, default=20)
+    run_parser.add_argument("-o", "--output", help="gravar o relatório JSON neste ficheiro")
+    run_parser.add_argument("--latency", type=float, default=0.0, help="latência simulada por pedido (ms)")
+    run_parser.add_argument("--record", action="store_true", help="gravar fixtures a partir das APIs reais")
+
+    compare_parser = sub.add_parser("compare", help="comparar dois relatórios")
+    compare_parser.add_argument("old")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=10.0, help="regressão a partir de X%% no p50")
+
+    args = parser.parse_args()
+
+    if args.action == "compare":
+        with open(args.old, encoding="utf-8") as f:
+            old = json.load(f)
+        with open(args.new, encoding="utf-8") as f:
+            new = json.load(f)
+        sys.exit(1 if compare(old, new, args.threshold) else 0)
+
+    scenarios = [s for s in SCENARIOS if args.filter in s.name]
+    if not scenarios:
+        parser.error(f"nenhum cenário contém '{args.filter}'")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        _prepare_environment(workdir)
+        # Alguns cogs guardam ficheiros no diretório atual (bot_todos.json, quem_joga_hoje.json)
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            if args.record:
+                asyncio.run(record(scenarios))
+                return
+            report = asyncio.run(run(scenarios, args.iterations, args.latency / 1000))
+        finally:
+            os.chdir(cwd)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"Relatório gravado em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
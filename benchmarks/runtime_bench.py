@@ -0,0 +1,221 @@
+"""
+Compara os perfis de runtime (utils/runtime.py) com a mesma carga sintética.
+
+    python -m benchmarks.runtime_bench                        # default vs performance
+    python -m benchmarks.runtime_bench -c 64 -d 20 -r 5 -o runtime.json
+
+Cada perfil corre num processo à parte (o loop e o GC são globais), com o
+bot montado como em produção: todos os cogs carregados e, no fim do
+arranque, `runtime.freeze()`. A carga são `concurrency` "comandos" em
+paralelo, cada um a fazer um pedido pelo `bot.http_client` a um servidor
+aiohttp local que serve as fixtures de `benchmarks/fixtures`, a ler o
+JSON, a montar um embed e a lançar umas tasks curtas (como o defer/send
+de um comando). O servidor corre no mesmo loop, por isso também ganha ou
+perde com o perfil; é igual para todos.
+
+Os perfis alternam em várias rondas e o relatório usa a mediana das
+rondas, para o ruído da máquina não decidir o resultado.
+"""
+import argparse
+import asyncio
+import gc
+import glob
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.vcr import FIXTURES_DIR, _encode_body  # noqa: E402
+
+
+def _load_payloads() -> List[bytes]:
+    payloads = []
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, "*.json"))):
+        with open(path, encoding="utf-8") as f:
+            payloads.extend(_encode_body(e) for e in json.load(f) if e.get("encoding", "json") == "json")
+    return payloads
+
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+# ---------- processo filho: um perfil ----------
+async def _workload(bot_module, concurrency: int, duration: float, warmup: float) -> Dict:
+    import discord
+    from aiohttp import web
+
+    payloads = _load_payloads()
+
+    async def serve(request: web.Request) -> web.Response:
+        return web.Response(body=payloads[int(request.match_info["n"])], content_type="application/json")
+
+    app = web.Application()
+    app.router.add_get("/f/{n}", serve)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    bot = bot_module.DiscordBot()
+    bot.http_client.limit_per_host = concurrency
+    await bot.http_client.start()
+    for path in sorted(glob.glob(os.path.join(ROOT, "cogs", "*.py"))):
+        await bot.load_extension("cogs." + os.path.basename(path)[:-3])
+    bot_module.runtime.freeze()
+
+    gc_time = [0.0, 0]
+    gc_started = [0.0]
+
+    def on_gc(phase: str, info: dict) -> None:
+        if phase == "start":
+            gc_started[0] = time.perf_counter()
+        else:
+            gc_time[0] += time.perf_counter() - gc_started[0]
+            gc_time[1] += 1
+
+    async def noop() -> None:
+        await asyncio.sleep(0)
+
+    async def command(n: int) -> None:
+        resp = await bot.http_client.fetch(f"http://127.0.0.1:{port}/f/{n}")
+        data = resp.body
+        embed = discord.Embed(title=f"#{n}", description=str(type(data).__name__), color=0xBEBEFE)
+        items = data if isinstance(data, list) else list(data.items()) if isinstance(data, dict) else [data]
+        for item in items[:10]:
+            embed.add_field(name="campo", value=str(item)[:100], inline=True)
+        embed.to_dict()
+        await asyncio.gather(noop(), noop(), noop())
+
+    latencies: List[float] = []
+    state = {"measuring": False, "stop": False}
+
+    async def worker(offset: int) -> None:
+        n = offset
+        while not state["stop"]:
+            started = time.perf_counter()
+            await command(n % len(payloads))
+            if state["measuring"]:
+                latencies.append(time.perf_counter() - started)
+            n += concurrency
+
+    workers = [asyncio.create_task(worker(i)) for i in range(concurrency)]
+    await asyncio.sleep(warmup)
+    gc.callbacks.append(on_gc)
+    state["measuring"] = True
+    started = time.perf_counter()
+    await asyncio.sleep(duration)
+    state["measuring"] = False
+    elapsed = time.perf_counter() - started
+    gc.callbacks.remove(on_gc)
+    state["stop"] = True
+    await asyncio.gather(*workers)
+
+    await bot.close()
+    await runner.cleanup()
+    return {
+        "runtime": bot_module.runtime.describe(),
+        "requests": len(latencies),
+        "throughput": len(latencies) / elapsed,
+        "p50_ms": _percentile(latencies, 0.5) * 1000,
+        "p95_ms": _percentile(latencies, 0.95) * 1000,
+        "p99_ms": _percentile(latencies, 0.99) * 1000,
+        "gc_collections": gc_time[1],
+        "gc_ms": gc_time[0] * 1000,
+        "frozen": bot_module.runtime.frozen,
+    }
+
+
+def _child(args: argparse.Namespace) -> None:
+    from benchmarks.replay import _prepare_environment
+
+    with tempfile.TemporaryDirectory() as workdir:
+        _prepare_environment(workdir)
+        os.environ["RUNTIME_PROFILE"] = args.child
+        import bot as bot_module
+
+        bot_module.import_profiler.uninstall()
+        bot_module.logger.setLevel("WARNING")
+        logging.getLogger("discord").setLevel("ERROR")
+        result = bot_module.runtime.run(_workload(bot_module, args.concurrency, args.duration, args.warmup))
+    print(json.dumps(result))
+
+
+# ---------- processo pai ----------
+def _run_profile(profile: str, args: argparse.Namespace) -> Dict:
+    cmd = [
+        sys.executable, "-m", "benchmarks.runtime_bench", "--child", profile,
+        "-c", str(args.concurrency), "-d", str(args.duration), "--warmup", str(args.warmup),
+    ]
+    out = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True)
+    if out.returncode != 0:
+        raise RuntimeError(f"Perfil {profile} falhou:\n{out.stderr}")
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def _summary(rounds: List[Dict]) -> Dict:
+    keys = ("throughput", "p50_ms", "p95_ms", "p99_ms", "gc_collections", "gc_ms")
+    summary = {k: statistics.median(r[k] for r in rounds) for k in keys}
+    summary["runtime"] = rounds[0]["runtime"]
+    summary["frozen"] = rounds[0]["frozen"]
+    summary["rounds"] = rounds
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profiles", default="default,performance")
+    parser.add_argument("-c", "--concurrency", type=int, default=32, help="comandos em paralelo")
+    parser.add_argument("-d", "--duration", type=float, default=10.0, help="segundos medidos por ronda")
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("-r", "--rounds", type=int, default=3)
+    parser.add_argument("-o", "--output", help="gravar o relatório JSON neste ficheiro")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(args)
+        return
+
+    profiles = args.profiles.split(",")
+    rounds: Dict[str, List[Dict]] = {p: [] for p in profiles}
+    for i in range(args.rounds):
+        for profile in profiles:
+            result = _run_profile(profile, args)
+            rounds[profile].append(result)
+            print(
+                f"ronda {i + 1} {profile:<12} {result['throughput']:8.0f} req/s  "
+                f"p50 {result['p50_ms']:6.2f} ms  p99 {result['p99_ms']:6.2f} ms"
+            )
+
+    report = {p: _summary(r) for p, r in rounds.items()}
+    base = report[profiles[0]]
+    print()
+    print(f"{'perfil':<12} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'GC n':>6} {'GC ms':>8}  runtime")
+    for profile, s in report.items():
+        gain = (s["throughput"] / base["throughput"] - 1) * 100
+        print(
+            f"{profile:<12} {s['throughput']:9.0f} {s['p50_ms']:8.2f} {s['p95_ms']:8.2f} {s['p99_ms']:8.2f} "
+            f"{s['gc_collections']:6.0f} {s['gc_ms']:8.1f}  {s['runtime']}"
+            + (f"  ({gain:+.1f}% req/s)" if s is not base else "")
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"Relatório gravado em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Comandos reproduzidos pelo benchmark (`python -m benchmarks.replay`).
+
+Cada cenário é um comando com argumentos fixos. `kind` indica como é
+invocado: "app" para slash commands puros (recebem uma Interaction) e "ctx"
+para comandos híbridos/de prefixo (recebem um Context). Para juntar um cog
+novo basta um cenário aqui e as respostas em `fixtures/<cog>.json`
+(gravadas com `--record` ou escritas à mão).
+
+A base de dados é uma SQLite em memória com o utilizador dos cenários e
+uma semana de uso de comandos (`replay.seed_database`). Ficam de fora, de
+propósito, os cogs que não se reproduzem só com HTTP e base de dados:
+
+- music, music_quiz: ligam-se a um canal de voz e tocam com o FFmpeg;
+- download: corre o yt-dlp no pool de processos e envia o ficheiro;
+- news: o /mirante abre um Chromium com o Playwright;
+- generate: escreve um cog novo em cogs/ e carrega-o;
+- owner: comandos de administração (sync, reload, backups, métricas).
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    extension: str
+    command: str
+    kind: str = "app"
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def cog(self) -> str:
+        return self.extension.rsplit(".", 1)[-1]
+
+
+SCENARIOS = [
+    Scenario("admin.perfil", "cogs.ADMIN", "perfil"),
+    Scenario("admin.stats", "cogs.ADMIN", "stats"),
+    Scenario("admin.stats_7d", "cogs.ADMIN", "stats", kwargs={"periodo": "7d"}),
+    Scenario("anime.search", "cogs.anime", "anime", kwargs={"query": "naruto"}),
+    Scenario("anime_quote", "cogs.anime_quote", "anime_quote", kind="ctx"),
+    Scenario("bg3.d20", "cogs.bg3", "d20", kind="ctx"),
+    Scenario(
+        "bg3.quem_joga", "cogs.bg3", "quem_joga", kind="ctx",
+        kwargs={"nome_jogo": "Baldur's Gate 3", "objetivos": "Ato 2", "start_time": "21:00", "end_time": "23:30"},
+    ),
+    Scenario("clima.lisboa", "cogs.clima", "clima", kind="ctx", kwargs={"city": "Lisboa"}),
+    Scenario("epstein.random", "cogs.epstein", "epstein"),
+    Scenario("food.cocktail", "cogs.food", "cocktail", kwargs={"nome": "margarita"}),
+    Scenario("fun.facto", "cogs.fun", "facto", kind="ctx"),
+    Scenario("fun.owen_wilson", "cogs.fun", "owen_wilson", kind="ctx"),
+    Scenario("fun.shrek", "cogs.fun", "shrek"),
+    Scenario("grafico.bar", "cogs.grafico", "grafico", kind="ctx"),
+    Scenario("internet.hastebin", "cogs.internet", "hastebin", kwargs={"texto": "print('olá')"}),
+    Scenario("internet.pokedex", "cogs.internet", "pokedex", kwargs={"pokemon": "pikachu"}),
+    Scenario("internet.ss", "cogs.internet", "ss", kwargs={"website": "example.com"}),
+    Scenario("internet.xkcd", "cogs.internet", "xkcd", kind="ctx"),
+    Scenario("ipma.avisos", "cogs.ipma", "ipma", kind="ctx"),
+    Scenario("joker.start", "cogs.joker", "joker", kwargs={"em_portugues": False}),
+    Scenario("kanye.ye", "cogs.kanye", "ye", kind="ctx"),
+    Scenario("meme_gaming", "cogs.meme_gaming", "meme_gaming"),
+    Scenario("osrs.hiscores", "cogs.OSRS", "osrs", kwargs={"username": "Zezima"}),
+    Scenario("pollinations.bob_ross", "cogs.pollinations", "bob_ross", kwargs={"prompt": "um farol ao pôr do sol"}),
+    Scenario("portugal.feriado_pt", "cogs.portugal", "feriado_pt"),
+    Scenario("portugal.feriados", "cogs.portugal", "feriados"),
+    Scenario("portugal.fogos", "cogs.portugal", "fogos"),
+    Scenario("portugal.futebol", "cogs.portugal", "futebol", kwargs={"limite": 5}),
+    Scenario("portugal.insulto_tuga", "cogs.portugal", "insulto_tuga"),
+    Scenario("reddit.hot", "cogs.reddit", "reddit", kwargs={"sort": "hot", "limit": 10}),
+    Scenario("steam.descontos", "cogs.steam", "steamgame", kwargs={"mode": "descontos"}),
+    Scenario("steam.pesquisar", "cogs.steam", "steamgame", kwargs={"mode": "pesquisar", "query": "hades"}),
+    Scenario(
+        "strategy.estrategia", "cogs.strategy", "estrategia",
+        kwargs={"objetivo": "ganhar o torneio de CS2", "recursos": "5 jogadores", "tempo": "2 meses"},
+    ),
+    Scenario("todo.add", "cogs.todo", "todo add", kind="ctx", kwargs={"text": "rever o PR"}),
+    Scenario("todo.list", "cogs.todo", "todo list", kind="ctx"),
+    Scenario("trades.oferecer", "cogs.trades", "trocas", kwargs={"oferecer": "skin AK-47"}),
+    Scenario("waifu.default", "cogs.waifu", "waifu", kind="ctx"),
+]
@@ -0,0 +1,241 @@
+"""
+Planos e tempos das consultas do DatabaseManager antes e depois das migrações.
+
+    python -m benchmarks.schema_bench
+    python -m benchmarks.schema_bench --usage 5000000 --warns 2000000 -o schema.json
+
+Cria uma base de dados no esquema antigo (migração 0001: IDs em TEXT, sem
+índices) com milhões de linhas, copia-a e aplica as restantes à cópia. Em cada uma
+mostra o EXPLAIN QUERY PLAN e o tempo das consultas que o DatabaseManager
+faz, com IDs ao acaso de entre os que existem. Os dados são gerados com uma
+semente fixa, por isso duas corridas dão as mesmas bases de dados.
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+BASE_ID = 10**17
+GAMES = [f"jogo {i}" for i in range(40)]
+COMMANDS = [f"comando{i}" for i in range(60)]
+
+
+class Query(NamedTuple):
+    name: str
+    sql: str
+    params: Callable[[random.Random, Callable[[int], object]], tuple]
+    legacy_sql: Optional[str] = None  # a consulta de antes, se mudou
+
+
+def _user(rng: random.Random, args) -> int:
+    return BASE_ID + rng.randrange(args.users)
+
+
+def build_queries(args) -> List[Query]:
+    user = lambda rng: _user(rng, args)  # noqa: E731
+    guild = lambda rng: BASE_ID + rng.randrange(args.guilds)  # noqa: E731
+    return [
+        Query(
+            "get_user",
+            """
+            SELECT u.id, u.discord_id, u.name, u.coins, u.commands_count, s.language, s.notifications_enabled
+            FROM users u LEFT JOIN user_settings s ON s.user_id = u.id
+            WHERE u.discord_id = ?
+            """,
+            lambda rng, ident: (ident(user(rng)),),
+        ),
+        Query(
+            "add_warn (último id)",
+            "SELECT id FROM warns WHERE user_id=? AND server_id=? ORDER BY id DESC LIMIT 1",
+            lambda rng, ident: (user(rng), guild(rng)),
+        ),
+        Query(
+            "remove_warn (contagem)",
+            "SELECT COUNT(*) FROM warns WHERE user_id=? AND server_id=?",
+            lambda rng, ident: (user(rng), guild(rng)),
+        ),
+        Query(
+            "get_warnings",
+            "SELECT user_id, server_id, moderator_id, reason, strftime('%s', created_at), id "
+            "FROM warns WHERE user_id=? AND server_id=?",
+            lambda rng, ident: (user(rng), guild(rng)),
+        ),
+        Query(
+            "sessões de um user",
+            "SELECT COUNT(*), SUM(duration) FROM gaming_sessions WHERE user_id=? AND server_id=?",
+            lambda rng, ident: (user(rng), guild(rng)),
+        ),
+        Query(
+            "get_user_stats",
+            "SELECT game_name, total_duration FROM gaming_totals WHERE user_id=? AND server_id=? "
+            "ORDER BY total_duration DESC",
+            lambda rng, ident: (user(rng), guild(rng)),
+        ),
+        Query(
+            "uso de um comando (upsert)",
+            "SELECT usage_count FROM command_usage WHERE discord_id=? AND command_name=?",
+            lambda rng, ident: (ident(user(rng)), rng.choice(COMMANDS)),
+        ),
+        Query(
+            "get_command_stats",
+            "SELECT command_name, total FROM command_totals WHERE total > 0 "
+            "ORDER BY total DESC, command_name DESC LIMIT ?",
+            lambda rng, ident: (20,),
+            "SELECT command_name, SUM(usage_count) AS total FROM command_usage "
+            "GROUP BY command_name ORDER BY total DESC LIMIT ?",
+        ),
+    ]
+
+
+def seed(path: str, args) -> Dict[str, int]:
+    """Base de dados no esquema da migração 0001, com os IDs como o código antigo os gravava."""
+    from database.migrations import migrate_sync
+
+    rng = random.Random(args.seed)
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode = OFF")
+    connection.execute("PRAGMA synchronous = OFF")
+    migrate_sync(connection, target=1)
+
+    user = lambda: BASE_ID + rng.randrange(args.users)  # noqa: E731
+    guild = lambda: BASE_ID + rng.randrange(args.guilds)  # noqa: E731
+    with connection:
+        connection.executemany(
+            "INSERT INTO users(discord_id, name, coins, commands_count, joined_at) VALUES (?, ?, ?, ?, ?)",
+            ((str(BASE_ID + i), f"user{i}", rng.randrange(1000), rng.randrange(500), "2024-01-01T00:00:00")
+             for i in range(args.users)),
+        )
+        connection.execute("INSERT INTO user_settings(user_id) SELECT id FROM users")
+        connection.executemany(
+            "INSERT INTO warns(id, user_id, server_id, moderator_id, reason) VALUES (?, ?, ?, ?, ?)",
+            ((i, user(), guild(), user(), "spam") for i in range(args.warns)),
+        )
+        connection.executemany(
+            "INSERT INTO gaming_sessions(user_id, server_id, game_name, started_at, ended_at, duration) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            ((user(), guild(), rng.choice(GAMES), 1_700_000_000 + i, 1_700_000_600 + i, 600)
+             for i in range(args.sessions)),
+        )
+        connection.executemany(
+            "INSERT OR IGNORE INTO gaming_totals(user_id, server_id, game_name, total_duration) VALUES (?, ?, ?, ?)",
+            ((user(), guild(), rng.choice(GAMES), rng.randrange(100_000)) for _ in range(args.totals)),
+        )
+        connection.executemany(
+            "INSERT OR IGNORE INTO command_usage(discord_id, command_name, usage_count) VALUES (?, ?, ?)",
+            ((str(user()), rng.choice(COMMANDS), rng.randrange(1, 50)) for _ in range(args.usage)),
+        )
+    counts = {
+        table: connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        for table in ("users", "user_settings", "warns", "gaming_sessions", "gaming_totals", "command_usage")
+    }
+    connection.close()
+    return counts
+
+
+def measure(path: str, queries: List[Query], ident: Callable[[int], object], args, legacy: bool) -> Dict[str, Dict]:
+    connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    connection.execute("PRAGMA cache_size = -65536")
+    results = {}
+    for query in queries:
+        if legacy and query.legacy_sql:
+            query = query._replace(sql=query.legacy_sql)
+        rng = random.Random(args.seed)
+        params = query.params(rng, ident)
+        plan = [row[3] for row in connection.execute(f"EXPLAIN QUERY PLAN {query.sql}", params)]
+        connection.execute(query.sql, query.params(rng, ident)).fetchall()  # aquece a cache
+        timings = []
+        deadline = time.perf_counter() + args.budget
+        while len(timings) < args.calls and (len(timings) < 3 or time.perf_counter() < deadline):
+            params = query.params(rng, ident)
+            started = time.perf_counter()
+            connection.execute(query.sql, params).fetchall()
+            timings.append(time.perf_counter() - started)
+        results[query.name] = {
+            "plan": plan,
+            "calls": len(timings),
+            "p50_ms": statistics.median(timings) * 1000,
+            "mean_ms": statistics.fmean(timings) * 1000,
+        }
+    connection.close()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=200_000)
+    parser.add_argument("--guilds", type=int, default=20)
+    parser.add_argument("--warns", type=int, default=1_000_000)
+    parser.add_argument("--sessions", type=int, default=1_000_000)
+    parser.add_argument("--totals", type=int, default=500_000)
+    parser.add_argument("--usage", type=int, default=2_000_000, help="linhas de command_usage")
+    parser.add_argument("--calls", type=int, default=2000, help="máximo de chamadas por consulta")
+    parser.add_argument("--budget", type=float, default=2.0, help="segundos por consulta")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--dir", help="diretório para as bases de dados (por defeito um temporário)")
+    parser.add_argument("-o", "--output", help="gravar o relatório JSON neste ficheiro")
+    args = parser.parse_args()
+
+    from database.migrations import migrate_sync
+
+    workdir = tempfile.mkdtemp(dir=args.dir)
+    try:
+        before = os.path.join(workdir, "antes.db")
+        after = os.path.join(workdir, "depois.db")
+        started = time.perf_counter()
+        counts = seed(before, args)
+        print(f"Seed em {time.perf_counter() - started:.1f}s: " + ", ".join(f"{t} {n:,}" for t, n in counts.items()))
+
+        shutil.copy(before, after)
+        connection = sqlite3.connect(after)
+        started = time.perf_counter()
+        migrate_sync(connection)
+        migration_seconds = time.perf_counter() - started
+        connection.execute("VACUUM")
+        connection.close()
+        sizes = {"antes": os.path.getsize(before), "depois": os.path.getsize(after)}
+        print(
+            f"Migrações em {migration_seconds:.1f}s; tamanho {sizes['antes'] / 2**20:.0f} MiB -> "
+            f"{sizes['depois'] / 2**20:.0f} MiB"
+        )
+
+        queries = build_queries(args)
+        report = {
+            "rows": counts,
+            "migration_seconds": migration_seconds,
+            "size_bytes": sizes,
+            "antes": measure(before, queries, str, args, legacy=True),
+            "depois": measure(after, queries, int, args, legacy=False),
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print()
+    print(f"{'consulta':<28} {'antes p50 (ms)':>14} {'depois p50 (ms)':>15} {'x':>8}")
+    for query in queries:
+        old, new = report["antes"][query.name], report["depois"][query.name]
+        print(f"{query.name:<28} {old['p50_ms']:14.3f} {new['p50_ms']:15.3f} {old['p50_ms'] / new['p50_ms']:8.0f}")
+    print()
+    for query in queries:
+        print(query.name)
+        print(f"  antes:  {' | '.join(report['antes'][query.name]['plan'])}")
+        print(f"  depois: {' | '.join(report['depois'][query.name]['plan'])}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"Relatório gravado em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
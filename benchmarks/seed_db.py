@@ -0,0 +1,335 @@
+"""
+Base de dados sintética com volume e distribuições realistas, reproduzível a partir de uma semente.
+
+    python -m benchmarks.seed_db seed.db
+    python -m benchmarks.seed_db seed.db --users 1000000 --usage 20000000 --sessions 5000000 --seed 7
+
+Preenche users, user_settings, command_usage (e, pelos triggers,
+command_totals), warns, gaming_sessions e gaming_totals no esquema da
+migração mais recente (ou de `--version`):
+
+- popularidade dos comandos, dos jogos e dos servidores em Zipf
+  (`--zipf`): meia dúzia de comandos faz quase todo o uso;
+- atividade dos utilizadores em Pareto (cauda pesada): poucos
+  utilizadores fazem muitos comandos, a maioria quase nenhum;
+- só `--gamers` dos utilizadores jogam, também com cauda pesada, e as
+  sessões têm duração log-normal (mediana de 1 h, até 12 h);
+- os avisos caem sobretudo num punhado de "reincidentes".
+
+Cada utilizador tem um servidor "de casa" onde acontece quase tudo. O
+commands_count de cada utilizador é a soma do seu command_usage e
+gaming_totals é a soma das sessões, como o bot os deixaria.
+
+A mesma semente (e os mesmos parâmetros) dá exatamente a mesma base de
+dados. Ao lado fica `<ficheiro>.json` com os parâmetros, que o
+`benchmarks.db_bench` usa para refazer a `Population` e sortear
+argumentos com as mesmas distribuições.
+"""
+import argparse
+import bisect
+import itertools
+import json
+import math
+import os
+import random
+import sqlite3
+import sys
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Sequence
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+BASE_ID = 10**17
+GUILD_BASE_ID = 9 * 10**17
+# "Agora" fixo (2025-01-01 UTC): as datas geradas não dependem do dia em que se semeia
+NOW = 1_735_689_600
+DAY = 86_400
+
+COMMANDS = (
+    "perfil", "stats", "trocas", "meme_gaming", "moeda", "bola", "clima", "futebol", "musica", "rps",
+    "quem_joga", "pokedex", "xkcd", "anime", "waifu", "reddit", "ipma", "feriados", "facto", "joker",
+    "insulto_tuga", "steamgame", "cocktail", "music_quiz", "osrs", "bolacha", "shrek", "owen_wilson",
+    "bob_ross", "anime_quote", "grafico", "hastebin", "aviso", "purge", "nick", "fogos", "mirante",
+    "santarem", "concelho", "estrategia", "todo", "sim", "nao", "ye", "download", "arquivo",
+)
+GAMES = (
+    "League of Legends", "Counter-Strike 2", "Minecraft", "Fortnite", "VALORANT", "Rocket League",
+    "Grand Theft Auto V", "EA SPORTS FC 24", "Dota 2", "Apex Legends", "Call of Duty", "Overwatch 2",
+    "Roblox", "Rainbow Six Siege", "Old School RuneScape", "World of Warcraft", "Genshin Impact",
+    "Terraria", "Stardew Valley", "Elden Ring", "Baldur's Gate 3", "The Sims 4", "Euro Truck Simulator 2",
+    "Hearthstone", "Among Us", "PUBG: BATTLEGROUNDS", "Destiny 2", "Path of Exile", "Rust", "Dead by Daylight",
+)
+REASONS = ("spam", "linguagem", "flood", "publicidade", "off-topic", "insultos", "NSFW", "raid")
+
+
+def zipf_weights(n: int, s: float) -> List[float]:
+    """Pesos cumulativos de uma Zipf com expoente `s` sobre `n` elementos (o primeiro é o mais comum)."""
+    return list(itertools.accumulate(1 / rank**s for rank in range(1, n + 1)))
+
+
+def pareto_weights(rng: random.Random, n: int, alpha: float, cap: float) -> List[float]:
+    """
+    Pesos cumulativos de `n` elementos com peso Pareto(`alpha`) truncado em
+    `cap` (o mínimo é 1): quanto menor o alpha, mais pesada a cauda; o `cap`
+    evita que um só elemento leve metade de tudo (ninguém joga 20 h por dia).
+    """
+    return list(itertools.accumulate(min(cap, rng.paretovariate(alpha)) for _ in range(n)))
+
+
+def _names(base: Sequence[str], n: int, extra: str) -> List[str]:
+    return list(base[:n]) + [f"{extra}{i}" for i in range(len(base), n)]
+
+
+class Population:
+    """
+    Os utilizadores, servidores, comandos e jogos de uma semente, com o peso
+    de cada um. Só depende dos parâmetros: o seed_db e o db_bench refazem a
+    mesma a partir do JSON ao lado da base de dados.
+    """
+
+    def __init__(
+        self,
+        *,
+        users: int,
+        guilds: int = 50,
+        commands: int = len(COMMANDS),
+        games: int = 200,
+        gamers: float = 0.3,
+        zipf: float = 1.1,
+        seed: int = 1,
+    ) -> None:
+        self.params = {
+            "users": users, "guilds": guilds, "commands": commands, "games": games,
+            "gamers": gamers, "zipf": zipf, "seed": seed,
+        }
+        rng = random.Random(f"{seed}:population")
+        self.users = users
+        self.guild_ids = [GUILD_BASE_ID + i for i in range(guilds)]
+        self.guild_weights = zipf_weights(guilds, zipf)
+
+        # A ordem de popularidade muda com a semente
+        self.commands = _names(COMMANDS, commands, "comando")
+        rng.shuffle(self.commands)
+        self.command_weights = zipf_weights(commands, zipf)
+        self.games = _names(GAMES, games, "Jogo ")
+        rng.shuffle(self.games)
+        self.game_weights = zipf_weights(games, zipf)
+
+        # alpha 1.16: a regra dos 80/20
+        self.activity = pareto_weights(rng, users, 1.16, 1000)
+        self.home = [self._pick(rng, self.guild_weights) for _ in range(users)]
+        self.gamers = sorted(rng.sample(range(users), max(1, int(users * gamers))))
+        self.gamer_weights = pareto_weights(rng, len(self.gamers), 1.05, 50)
+        self.offenders = pareto_weights(rng, users, 1.0, 200)
+
+    @staticmethod
+    def _pick(rng: random.Random, cum_weights: List[float]) -> int:
+        return bisect.bisect(cum_weights, rng.random() * cum_weights[-1])
+
+    @staticmethod
+    def user_id(index: int) -> int:
+        return BASE_ID + index
+
+    def user(self, rng: random.Random) -> int:
+        """Índice de um utilizador, pela atividade."""
+        return self._pick(rng, self.activity)
+
+    def gamer(self, rng: random.Random) -> int:
+        return self.gamers[self._pick(rng, self.gamer_weights)]
+
+    def offender(self, rng: random.Random) -> int:
+        return self._pick(rng, self.offenders)
+
+    def guild(self, rng: random.Random, user: int) -> int:
+        """O servidor de casa do utilizador em 90% das vezes; senão um qualquer, pela popularidade."""
+        index = self.home[user] if rng.random() < 0.9 else self._pick(rng, self.guild_weights)
+        return self.guild_ids[index]
+
+    def command(self, rng: random.Random) -> str:
+        return self.commands[self._pick(rng, self.command_weights)]
+
+    def game(self, rng: random.Random) -> str:
+        return self.games[self._pick(rng, self.game_weights)]
+
+    @staticmethod
+    def duration(rng: random.Random) -> int:
+        """Duração de uma sessão de jogo: log-normal com mediana de 1 h, entre 1 min e 12 h."""
+        return int(min(12 * 3600, max(60, rng.lognormvariate(math.log(3600), 1.0))))
+
+
+def _timestamp(seconds: int) -> str:
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(seconds))
+
+
+def seed(
+    path: str,
+    population: Population,
+    *,
+    usage: int,
+    warns: int,
+    sessions: int,
+    version: Optional[int] = None,
+    log=print,
+) -> Dict[str, int]:
+    """Cria a base de dados em `path` e devolve o número de linhas de cada tabela."""
+    from database.migrations import migrate_sync
+
+    rng = random.Random(f"{population.params['seed']}:data")
+    # no esquema antigo (versão 1) os ids eram TEXT
+    cast = str if version == 1 else int
+    pop = population
+
+    connection = sqlite3.connect(path)
+    # Sem journal nem fsync: se falhar a meio, volta-se a semear
+    connection.execute("PRAGMA journal_mode = OFF")
+    connection.execute("PRAGMA synchronous = OFF")
+    migrate_sync(connection, target=version)
+
+    started = time.perf_counter()
+    usage_counts: Counter = Counter()
+    for _ in range(usage):
+        usage_counts[pop.user(rng), pop.command(rng)] += 1
+    commands_count = [0] * pop.users
+    for (user, _), count in usage_counts.items():
+        commands_count[user] += count
+
+    with connection:
+        connection.executemany(
+            "INSERT INTO users(discord_id, name, xp, reputation, coins, joined_at, commands_count) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                (
+                    cast(pop.user_id(i)), f"user{i}", commands_count[i] * 5, rng.randrange(20),
+                    int(rng.paretovariate(1.5) * 50), _timestamp(NOW - rng.randrange(3 * 365 * DAY)).replace(" ", "T"),
+                    commands_count[i],
+                )
+                for i in range(pop.users)
+            ),
+        )
+        connection.execute("INSERT INTO user_settings(user_id) SELECT id FROM users")
+    log(f"users: {pop.users} ({time.perf_counter() - started:.1f}s)")
+
+    started = time.perf_counter()
+    with connection:
+        # Por utilizador e comando, como o upsert do bot os deixa (e pela ordem da chave)
+        connection.executemany(
+            "INSERT INTO command_usage(discord_id, command_name, usage_count) VALUES (?, ?, ?)",
+            ((cast(pop.user_id(user)), name, count) for (user, name), count in sorted(usage_counts.items())),
+        )
+    log(f"command_usage: {len(usage_counts)} linhas de {usage} usos ({time.perf_counter() - started:.1f}s)")
+    del usage_counts
+
+    started = time.perf_counter()
+    last_warn: Counter = Counter()
+
+    def warn_rows():
+        for _ in range(warns):
+            user = pop.offender(rng)
+            server = pop.guild(rng, user)
+            last_warn[user, server] += 1
+            yield (
+                last_warn[user, server], cast(pop.user_id(user)), cast(server),
+                cast(pop.user_id(pop.user(rng))), rng.choice(REASONS), _timestamp(NOW - rng.randrange(365 * DAY)),
+            )
+
+    with connection:
+        connection.executemany(
+            "INSERT INTO warns(id, user_id, server_id, moderator_id, reason, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            warn_rows(),
+        )
+    log(f"warns: {warns} em {len(last_warn)} (utilizador, servidor) ({time.perf_counter() - started:.1f}s)")
+
+    started = time.perf_counter()
+
+    def session_rows():
+        for _ in range(sessions):
+            user = pop.gamer(rng)
+            duration = pop.duration(rng)
+            started_at = NOW - rng.randrange(90 * DAY)
+            yield (
+                cast(pop.user_id(user)), cast(pop.guild(rng, user)), pop.game(rng),
+                started_at, started_at + duration, duration,
+            )
+
+    with connection:
+        connection.executemany(
+            "INSERT INTO gaming_sessions(user_id, server_id, game_name, started_at, ended_at, duration) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            session_rows(),
+        )
+        connection.execute(
+            """
+            INSERT INTO gaming_totals(user_id, server_id, game_name, total_duration)
+            SELECT user_id, server_id, game_name, SUM(duration)
+            FROM gaming_sessions GROUP BY user_id, server_id, game_name
+            """
+        )
+    log(f"gaming_sessions: {sessions} ({time.perf_counter() - started:.1f}s)")
+
+    counts = {
+        table: connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        for table in ("users", "user_settings", "command_usage", "warns", "gaming_sessions", "gaming_totals")
+    }
+    connection.execute("PRAGMA journal_mode = DELETE")
+    connection.close()
+    return counts
+
+
+def load_population(path: str) -> Population:
+    """A `Population` gravada ao lado de uma base de dados semeada (`<ficheiro>.json`)."""
+    with open(f"{path}.json", encoding="utf-8") as f:
+        return Population(**json.load(f)["population"])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="ficheiro da base de dados a criar")
+    parser.add_argument("--users", type=int, default=200_000)
+    parser.add_argument("--guilds", type=int, default=50)
+    parser.add_argument("--commands", type=int, default=len(COMMANDS), help="comandos diferentes")
+    parser.add_argument("--games", type=int, default=200, help="jogos diferentes")
+    parser.add_argument("--gamers", type=float, default=0.3, help="fração dos utilizadores que joga")
+    parser.add_argument("--zipf", type=float, default=1.1, help="expoente da Zipf (comandos, jogos, servidores)")
+    parser.add_argument("--usage", type=int, default=3_000_000, help="usos de comandos (antes de agregar)")
+    parser.add_argument("--warns", type=int, default=100_000)
+    parser.add_argument("--sessions", type=int, default=1_000_000, help="sessões de jogo")
+    parser.add_argument("--version", type=int, help="versão do esquema (por defeito a mais recente)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--force", action="store_true", help="apagar o ficheiro se já existir")
+    args = parser.parse_args()
+
+    if os.path.exists(args.path):
+        if not args.force:
+            parser.error(f"{args.path} já existe (--force para o substituir)")
+        for suffix in ("", "-wal", "-shm", ".json"):
+            if os.path.exists(args.path + suffix):
+                os.remove(args.path + suffix)
+
+    started = time.perf_counter()
+    population = Population(
+        users=args.users, guilds=args.guilds, commands=args.commands, games=args.games,
+        gamers=args.gamers, zipf=args.zipf, seed=args.seed,
+    )
+    counts = seed(
+        args.path, population, usage=args.usage, warns=args.warns, sessions=args.sessions, version=args.version
+    )
+    with open(f"{args.path}.json", "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "population": population.params,
+                "usage": args.usage, "warns": args.warns, "sessions": args.sessions,
+                "version": args.version, "now": NOW, "rows": counts,
+            },
+            f, ensure_ascii=False, indent=2,
+        )
+    print(
+        f"{args.path}: {os.path.getsize(args.path) / 2**20:.0f} MiB em {time.perf_counter() - started:.1f}s, "
+        + ", ".join(f"{table} {rows}" for table, rows in counts.items())
+    )
+
+
+if __name__ == "__main__":
+    main()
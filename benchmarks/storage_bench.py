@@ -0,0 +1,192 @@
+"""
+Latência das leituras com escritas em simultâneo: ligação única vs Storage (WAL).
+
+    python -m benchmarks.storage_bench
+    python -m benchmarks.storage_bench --write-rate 500 --readers 16 --seconds 10 -o storage.json
+
+"antes" reproduz o DatabaseManager antigo: uma só ligação aiosqlite em modo
+rollback journal, commit a cada escrita e as leituras na mesma ligação.
+"depois" usa o `DatabaseManager` atual (database/storage.py). Nos dois casos
+chegam `--write-rate` escritas (`add_xp_coins`) por segundo, a ritmo
+fixo, e `--readers` tarefas fazem `get_user` (o que o /trocas e o /perfil
+fazem) com uma pausa curta entre pedidos. A base de dados é um ficheiro temporário em disco, com os
+mesmos utilizadores nos dois casos ("antes" no esquema da migração 0001).
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+GET_USER = """
+SELECT u.id, u.discord_id, u.name, u.bio, u.zone, u.position, u.xp, u.is_police, u.reputation,
+       u.gender, u.coins, u.joined_at, u.commands_count, s.language, s.notifications_enabled
+FROM users u LEFT JOIN user_settings s ON s.user_id = u.id
+WHERE u.discord_id = ?
+"""
+
+
+class LegacyDatabase:
+    """O DatabaseManager de antes do Storage, só com os dois métodos usados aqui."""
+
+    def __init__(self, connection) -> None:
+        self.connection = connection
+
+    async def get_user(self, discord_id: int):
+        async with self.connection.execute(GET_USER, (str(discord_id),)) as cursor:
+            return await cursor.fetchone()
+
+    async def add_xp_coins(self, discord_id: int, xp: int = 0, coins: int = 0):
+        async with self.connection.execute(
+            "SELECT id, coins FROM users WHERE discord_id=?", (str(discord_id),)
+        ) as cursor:
+            row = await cursor.fetchone()
+        await self.connection.execute("UPDATE users SET coins = ? WHERE id=?", ((row[1] or 0) + coins, row[0]))
+        await self.connection.execute(
+            "UPDATE users SET commands_count = commands_count + ? WHERE id=?", (xp, row[0])
+        )
+        await self.connection.commit()
+        return True
+
+    async def close(self) -> None:
+        await self.connection.close()
+
+
+def seed(path: str, users: int, version: Optional[int]) -> None:
+    from database.migrations import migrate_sync
+
+    connection = sqlite3.connect(path)
+    migrate_sync(connection, target=version)
+    # no esquema antigo (versão 1) o discord_id era TEXT
+    cast = str if version == 1 else int
+    connection.executemany(
+        "INSERT INTO users(discord_id, name, joined_at) VALUES (?, ?, '2024-01-01T00:00:00')",
+        ((cast(10**17 + i), f"user{i}") for i in range(users)),
+    )
+    connection.execute("INSERT INTO user_settings(user_id) SELECT id FROM users")
+    connection.commit()
+    connection.close()
+
+
+def _summary(values: List[float]) -> Dict[str, float]:
+    ordered = sorted(values) or [0.0]
+    return {
+        "p50_ms": statistics.median(ordered) * 1000,
+        "p99_ms": ordered[min(len(ordered) - 1, int(0.99 * len(ordered)))] * 1000,
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+async def run_mode(mode: str, path: str, args) -> Dict:
+    import aiosqlite
+
+    from database import DatabaseManager
+
+    if mode == "antes":
+        db = LegacyDatabase(await aiosqlite.connect(path))
+        await db.connection.execute("PRAGMA journal_mode = DELETE")
+    else:
+        db = await DatabaseManager.open(path, readers=args.db_readers, user_cache_size=args.user_cache)
+
+    rng = random.Random(0)
+    stop = asyncio.Event()
+    latencies: List[float] = []
+    write_latencies: List[float] = []
+    pending = set()
+
+    async def write() -> None:
+        started = time.perf_counter()
+        await db.add_xp_coins(10**17 + rng.randrange(args.users), xp=1, coins=1)
+        write_latencies.append(time.perf_counter() - started)
+
+    async def writer() -> None:
+        # ritmo fixo, como os comandos a chegar: não espera pela escrita anterior
+        interval = 1 / args.write_rate
+        next_at = time.perf_counter()
+        while not stop.is_set():
+            task = asyncio.create_task(write())
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+            next_at += interval
+            await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+
+    async def reader() -> None:
+        while not stop.is_set():
+            started = time.perf_counter()
+            await db.get_user(10**17 + rng.randrange(args.users))
+            latencies.append(time.perf_counter() - started)
+            await asyncio.sleep(0.002)
+
+    tasks = [asyncio.create_task(writer())]
+    tasks += [asyncio.create_task(reader()) for _ in range(args.readers)]
+    await asyncio.sleep(args.seconds)
+    stop.set()
+    await asyncio.gather(*tasks)
+    backlog = len(pending)
+    await asyncio.gather(*pending)
+    extra = db.storage.stats() if mode == "depois" else {}
+    await db.close()
+
+    return {
+        "reads_per_s": len(latencies) / args.seconds,
+        "writes_per_s": len(write_latencies) / args.seconds,
+        "backlog": backlog,
+        "read": _summary(latencies),
+        "write": _summary(write_latencies),
+        "writes_per_commit": extra.get("writes_per_commit", 1.0),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--write-rate", type=float, default=100, help="escritas por segundo")
+    parser.add_argument("--readers", type=int, default=8, help="tarefas a ler")
+    parser.add_argument("--db-readers", type=int, default=3, help="ligações de leitura do Storage")
+    parser.add_argument("--user-cache", type=int, default=0, help="cache do get_user no modo depois (0 = só o Storage)")
+    parser.add_argument("--seconds", type=float, default=5.0, help="duração de cada modo")
+    parser.add_argument("--dir", help="diretório para a base de dados (por defeito um temporário)")
+    parser.add_argument("-o", "--output", help="gravar o relatório JSON neste ficheiro")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(dir=args.dir)
+    try:
+        report = {}
+        for mode in ("antes", "depois"):
+            path = os.path.join(workdir, f"{mode}.db")
+            seed(path, args.users, version=1 if mode == "antes" else None)
+            report[mode] = asyncio.run(run_mode(mode, path, args))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"{args.write_rate:g} escritas/s, {args.readers} leitores, {args.seconds:g}s por modo")
+    print(
+        f"{'modo':<7} {'leituras/s':>10} {'escritas/s':>10} {'em atraso':>9} {'esc/commit':>10}  "
+        f"{'leitura p50/p99/max (ms)':>26}  {'escrita p50/p99 (ms)':>20}"
+    )
+    for mode, r in report.items():
+        read, write = r["read"], r["write"]
+        print(
+            f"{mode:<7} {r['reads_per_s']:10.0f} {r['writes_per_s']:10.0f} {r['backlog']:9d} {r['writes_per_commit']:10.1f}  "
+            f"{read['p50_ms']:8.2f} {read['p99_ms']:8.2f} {read['max_ms']:8.1f}  {write['p50_ms']:9.2f} {write['p99_ms']:9.2f}"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"Relatório gravado em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
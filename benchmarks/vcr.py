@@ -0,0 +1,226 @@
+"""
+Fixtures HTTP ao estilo VCR para o `HTTPClient` do bot.
+
+`ReplayHTTPClient` tem a mesma interface que `utils.http.HTTPClient`
+(`fetch`, `request`, `get`, `post`, cache incluída), mas responde com as
+respostas gravadas em `benchmarks/fixtures/<cog>.json` sem abrir sockets.
+`RecordingHTTPClient` faz os pedidos a sério e grava as respostas.
+
+Formato de cada entrada de uma fixture:
+
+    {"request": "GET https://api.kanye.rest/",
+     "status": 200, "content_type": "application/json",
+     "encoding": "json" | "text" | "base64", "body": ...}
+
+A chave do pedido junta os params da URL e do `params=` por ordem, sem os
+params com segredos (API keys), para poder ser escrita à mão. Uma chave
+acabada em "*" serve qualquer pedido que comece por ela (ex. URLs com o ano).
+"""
+import asyncio
+import base64
+import json
+import os
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import aiohttp
+
+from utils.http import HTTPClient
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+SECRET_PARAMS = {"appid", "apikey", "api_key", "key", "token", "access_token"}
+
+
+class ReplayMissError(aiohttp.ClientConnectionError):
+    """Pedido sem resposta gravada (para os cogs é igual a uma falha de rede)."""
+
+
+def request_key(method: str, url: str, params: Any = None) -> str:
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    if isinstance(params, dict):
+        params = params.items()
+    for name, value in params or ():
+        if isinstance(value, (list, tuple)):
+            query.extend((name, str(v)) for v in value)
+        else:
+            query.append((name, str(value).lower() if isinstance(value, bool) else str(value)))
+    query = sorted((k, v) for k, v in query if k.lower() not in SECRET_PARAMS)
+    path = parts.path or "/"
+    key = f"{method.upper()} {parts.scheme}://{parts.netloc}{path}"
+    return f"{key}?{urlencode(query)}" if query else key
+
+
+class FakeClientResponse:
+    """O suficiente de `aiohttp.ClientResponse` para os cogs e o `HTTPClient._read`."""
+
+    def __init__(self, url: str, status: int, content_type: str, body: bytes) -> None:
+        self.url = url
+        self.status = status
+        self.content_type = content_type
+        self.headers = {"Content-Type": content_type}
+        self.ok = status < 400
+        self._body = body
+
+    async def read(self) -> bytes:
+        return self._body
+
+    async def text(self, encoding: Optional[str] = None) -> str:
+        return self._body.decode(encoding or "utf-8", errors="replace")
+
+    async def json(self, *, content_type: Optional[str] = None, loads=json.loads) -> Any:
+        return loads(self._body.decode("utf-8"))
+
+    def raise_for_status(self) -> None:
+        if self.status >= 400:
+            raise aiohttp.ClientResponseError(None, (), status=self.status, message="replay")
+
+    def release(self) -> None:
+        pass
+
+
+class _ReplayRequest:
+    def __init__(self, client: "ReplayHTTPClient", method: str, url: str, kwargs: dict) -> None:
+        self.client = client
+        self.method = method
+        self.url = url
+        self.kwargs = kwargs
+
+    async def __aenter__(self) -> FakeClientResponse:
+        return await self.client._respond(self.method, self.url, self.kwargs)
+
+    async def __aexit__(self, *exc) -> None:
+        return None
+
+    def __await__(self):
+        return self.__aenter__().__await__()
+
+
+class ReplayHTTPClient(HTTPClient):
+    def __init__(self, fixtures: Dict[str, List[dict]], *, latency: float = 0.0, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.latency = latency
+        self.calls = 0
+        self.misses: List[str] = []
+        # corpos já codificados: o custo de os gerar não entra nas medições
+        self._fixtures = {
+            key: [(e["status"], e.get("content_type", ""), _encode_body(e)) for e in entries]
+            for key, entries in fixtures.items()
+        }
+        self._prefixes = [
+            (key[:-1], prepared) for key, prepared in self._fixtures.items() if key.endswith("*")
+        ]
+        self._served: Dict[str, int] = defaultdict(int)
+
+    @classmethod
+    def from_dir(cls, path: str = FIXTURES_DIR, **kwargs) -> "ReplayHTTPClient":
+        fixtures: Dict[str, List[dict]] = defaultdict(list)
+        for name in sorted(os.listdir(path)):
+            if name.endswith(".json"):
+                with open(os.path.join(path, name), encoding="utf-8") as f:
+                    for entry in json.load(f):
+                        fixtures[entry["request"]].append(entry)
+        return cls(dict(fixtures), **kwargs)
+
+    async def start(self) -> None:
+        return None
+
+    async def close(self) -> None:
+        for task in list(self._background):
+            task.cancel()
+
+    def reset(self) -> None:
+        """Antes de cada invocação: contadores a zero e cache vazia."""
+        self.calls = 0
+        self.misses.clear()
+        self._served.clear()
+        self.cache.clear()
+
+    def request(self, method: str, url: str, **kwargs) -> _ReplayRequest:
+        return _ReplayRequest(self, method, url, kwargs)
+
+    async def _respond(self, method: str, url: str, kwargs: dict) -> FakeClientResponse:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        key = request_key(method, url, kwargs.get("params"))
+        entries = self._fixtures.get(key)
+        if entries is None:
+            entries = next((prepared for prefix, prepared in self._prefixes if key.startswith(prefix)), None)
+        if not entries:
+            self.misses.append(key)
+            raise ReplayMissError(f"Sem fixture para {key}")
+        # várias respostas para o mesmo pedido são servidas por ordem (a última repete)
+        status, content_type, body = entries[min(self._served[key], len(entries) - 1)]
+        self._served[key] += 1
+        return FakeClientResponse(url, status, content_type, body)
+
+
+class _RecordingRequest:
+    def __init__(self, client: "RecordingHTTPClient", method: str, url: str, kwargs: dict) -> None:
+        self.client = client
+        self.method = method
+        self.url = url
+        self.kwargs = kwargs
+        self._cm = None
+
+    async def __aenter__(self) -> aiohttp.ClientResponse:
+        self._cm = HTTPClient.request(self.client, self.method, self.url, **self.kwargs)
+        resp = await self._cm.__aenter__()
+        body = await resp.read()  # fica em cache na resposta: json()/text() continuam a funcionar
+        self.client.record(self.method, self.url, self.kwargs.get("params"), resp, body)
+        return resp
+
+    async def __aexit__(self, *exc) -> None:
+        await self._cm.__aexit__(*exc)
+
+
+class RecordingHTTPClient(HTTPClient):
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.recorded: List[dict] = []
+        self.calls = 0
+        self.misses: List[str] = []
+
+    def reset(self) -> None:
+        self.calls = 0
+        self.cache.clear()
+
+    def request(self, method: str, url: str, **kwargs) -> _RecordingRequest:
+        self.calls += 1
+        return _RecordingRequest(self, method, url, kwargs)
+
+    def record(self, method: str, url: str, params: Any, resp: aiohttp.ClientResponse, body: bytes) -> None:
+        entry = {
+            "request": request_key(method, url, params),
+            "status": resp.status,
+            "content_type": resp.content_type,
+        }
+        if resp.content_type.endswith("json"):
+            try:
+                entry.update(encoding="json", body=json.loads(body))
+            except ValueError:
+                entry.update(encoding="text", body=body.decode("utf-8", errors="replace"))
+        elif resp.content_type.startswith("text/") or resp.content_type.endswith("xml"):
+            entry.update(encoding="text", body=body.decode(resp.charset or "utf-8", errors="replace"))
+        else:
+            entry.update(encoding="base64", body=base64.b64encode(body).decode("ascii"))
+        self.recorded.append(entry)
+
+
+def _encode_body(entry: dict) -> bytes:
+    encoding = entry.get("encoding", "json")
+    if encoding == "json":
+        return json.dumps(entry["body"], ensure_ascii=False).encode("utf-8")
+    if encoding == "base64":
+        return base64.b64decode(entry["body"])
+    return entry["body"].encode("utf-8")
+
+
+def save_fixtures(path: str, entries: List[dict]) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(entries, f, ensure_ascii=False, indent=2)
+        f.write("\n")
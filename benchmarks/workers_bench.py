@@ -0,0 +1,174 @@
+"""
+Jitter da voz e latência do loop com trabalho pesado em threads vs processos.
+
+    python -m benchmarks.workers_bench
+    python -m benchmarks.workers_bench --seconds 10 --jobs 4 -o workers.json
+
+Simula o que corre no bot enquanto alguém pede um `/mirante` ou uma playlist:
+- uma thread igual ao `AudioPlayer` do discord.py, que tem de mandar um
+  pacote de áudio a cada 20 ms (mede-se o atraso de cada envio);
+- o event loop, com uma sonda de lag (sleep de 5 ms) e comandos leves a
+  cada 50 ms (mede-se o tempo de cada um);
+- `--jobs` trabalhos de parsing de HTML em contínuo (o `parse_news` do
+  cogs/news.py sobre uma página sintética grande), corridos pelo
+  `WorkerPool` em modo threads (como antes) ou em processos.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+FRAME = 0.020  # o discord.py manda um pacote Opus a cada 20 ms
+
+
+def synthetic_page(blocks: int) -> str:
+    items = []
+    for i in range(blocks):
+        items.append(
+            f'<div class="new"><div class="title"><h1>Notícia {i} sobre Santarém e arredores</h1></div>'
+            f'<div class="lead"><h2>{"Lorem ipsum dolor sit amet " * 8}</h2></div>'
+            f'<a href="/noticia-{i}">ler</a><input datetime="2024-05-{i % 28 + 1:02d}T10:00:00">'
+            f'<ul>{"".join(f"<li><span>tag{j}</span></li>" for j in range(10))}</ul></div>'
+        )
+    return f"<html><body><main>{''.join(items)}</main></body></html>"
+
+
+def _summary(values: List[float]) -> Dict[str, float]:
+    ordered = sorted(values) or [0.0]
+    return {
+        "p50_ms": statistics.median(ordered) * 1000,
+        "p99_ms": ordered[min(len(ordered) - 1, int(0.99 * len(ordered)))] * 1000,
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+class VoiceThread(threading.Thread):
+    """O ciclo do `discord.player.AudioPlayer`: preparar um pacote e dormir até ao próximo."""
+
+    def __init__(self) -> None:
+        super().__init__(daemon=True)
+        self.late: List[float] = []
+        self.stop = threading.Event()
+
+    def run(self) -> None:
+        frame = bytes(3840)  # 20 ms de PCM 48 kHz estéreo
+        start = time.perf_counter()
+        loops = 0
+        while not self.stop.is_set():
+            loops += 1
+            bytearray(frame)[::2]  # trabalho de Python por pacote (volume, cópias)
+            target = start + FRAME * loops
+            delay = target - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            self.late.append(max(0.0, time.perf_counter() - target))
+
+
+async def _lag_probe(samples: List[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(0.005)
+        samples.append(time.perf_counter() - started - 0.005)
+
+
+async def _light_commands(samples: List[float], stop: asyncio.Event) -> None:
+    payload = json.dumps({"setup": "piada", "punchline": "resposta", "id": 1} | {str(i): i for i in range(50)})
+
+    async def command() -> None:
+        started = time.perf_counter()
+        await asyncio.sleep(0)  # resposta "instantânea" de um serviço externo
+        json.loads(payload)
+        await asyncio.sleep(0)
+        samples.append(time.perf_counter() - started)
+
+    while not stop.is_set():
+        asyncio.create_task(command())
+        await asyncio.sleep(0.05)
+
+
+async def run_mode(mode: str, seconds: float, jobs: int, page: str, processes: int) -> Dict:
+    from cogs.news import parse_news
+    from utils.workers import WorkerPool
+
+    pool = None
+    if mode != "idle":
+        pool = WorkerPool(processes=processes if mode == "processes" else 0, limits={"html": jobs}, timeout=120)
+        await pool.start()
+
+    voice = VoiceThread()
+    lag: List[float] = []
+    latency: List[float] = []
+    done = 0
+    stop = asyncio.Event()
+
+    async def heavy() -> None:
+        nonlocal done
+        while not stop.is_set():
+            await pool.run("html", parse_news, page, 10)
+            done += 1
+
+    voice.start()
+    tasks = [asyncio.create_task(_lag_probe(lag, stop)), asyncio.create_task(_light_commands(latency, stop))]
+    if pool is not None:
+        tasks += [asyncio.create_task(heavy()) for _ in range(jobs)]
+    await asyncio.sleep(seconds)
+    stop.set()
+    voice.stop.set()
+    await asyncio.gather(*tasks)
+    voice.join()
+    if pool is not None:
+        await pool.close()
+
+    return {
+        "jobs_done": done,
+        "voice_late": _summary(voice.late),
+        "voice_late_over_5ms": sum(1 for v in voice.late if v > 0.005),
+        "loop_lag": _summary(lag),
+        "command": _summary(latency),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=5.0, help="duração de cada modo")
+    parser.add_argument("--jobs", type=int, default=2, help="trabalhos pesados em simultâneo")
+    parser.add_argument("--processes", type=int, default=2, help="processos no modo processes")
+    parser.add_argument("--blocks", type=int, default=1500, help="notícias na página sintética")
+    parser.add_argument("--modes", default="idle,threads,processes")
+    parser.add_argument("-o", "--output", help="gravar o relatório JSON neste ficheiro")
+    args = parser.parse_args()
+
+    os.environ.setdefault("GUILD_ID", "1")
+    page = synthetic_page(args.blocks)
+    print(f"Página sintética: {len(page) / 2**20:.1f} MiB, {args.jobs} trabalhos em simultâneo, {args.seconds:g}s por modo")
+
+    report = {}
+    for mode in args.modes.split(","):
+        report[mode] = asyncio.run(run_mode(mode, args.seconds, args.jobs, page, args.processes))
+
+    print(f"{'modo':<10} {'parses':>6}  {'voz p50/p99/max (ms)':>22} {'>5ms':>5}  {'lag loop p99/max':>17}  {'comando p50/p99':>16}")
+    for mode, r in report.items():
+        v, lag, cmd = r["voice_late"], r["loop_lag"], r["command"]
+        print(
+            f"{mode:<10} {r['jobs_done']:6d}  {v['p50_ms']:6.2f} {v['p99_ms']:7.2f} {v['max_ms']:7.1f} "
+            f"{r['voice_late_over_5ms']:5d}  {lag['p99_ms']:8.2f} {lag['max_ms']:8.1f}  "
+            f"{cmd['p50_ms']:7.2f} {cmd['p99_ms']:8.2f}"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"Relatório gravado em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
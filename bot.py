@@ -0,0 +1,487 @@
+# Tem de ser o primeiro import: mede o custo de todos os outros (ver utils/importtime.py)
+from utils.importtime import profiler as import_profiler, current_rss
+import_profiler.install()
+
+import json
+import os
+import platform
+import random
+import sys
+
+import signal
+import discord
+from discord import app_commands
+from discord.ext import commands, tasks
+from discord.ext.commands import Context
+from discord.ext.commands.hybrid import HybridAppCommand
+from dotenv import load_dotenv
+from cogwatch import watch
+
+from database import DatabaseManager, CommandUsageBuffer
+from database.backup import BackupManager
+from database.querylog import QueryLog
+from config import TOKEN
+from config import PREFIX
+from config import USAGE_FLUSH_INTERVAL, USAGE_FLUSH_MAX_PENDING
+from config import USAGE_HISTORY_HOURLY_DAYS, USAGE_HISTORY_DAILY_DAYS
+from config import BACKUP_DIR, BACKUP_INTERVAL_HOURS, BACKUP_KEEP_LAST, BACKUP_KEEP_DAILY
+from config import BACKUP_STEP_PAGES, BACKUP_STEP_SLEEP
+from config import HTTP_TIMEOUT, HTTP_LIMIT_PER_HOST, HTTP_DNS_TTL
+from config import HTTP_CACHE_MAX_ENTRIES, HTTP_CACHE_FILE
+from config import HTTP_BREAKER_ENABLED, HTTP_BREAKER_FAILURE_RATE, HTTP_BREAKER_MIN_CALLS, HTTP_BREAKER_WINDOW
+from config import HTTP_BREAKER_SLOW_CALL, HTTP_BREAKER_OPEN_SECONDS, HTTP_BREAKER_MAX_OPEN_SECONDS
+from config import HTTP_HEDGE_BUDGET, HTTP_HEDGE_QUANTILE, HTTP_HEDGE_MIN_SAMPLES, HTTP_HEDGE_MIN_DELAY
+from config import LOG_FILE, LOG_MAX_BYTES, LOG_BACKUP_COUNT, LOG_ROTATE_WHEN, LOG_JSON
+from config import METRICS_HOST, METRICS_PORT
+from config import LOOP_LAG_INTERVAL, LOOP_LAG_THRESHOLD
+from config import RUNTIME_PROFILE, RUNTIME_GC_THRESHOLDS
+from config import INTENT_MEMBERS, INTENT_PRESENCES, MEMBER_CACHE, CHUNK_GUILDS_AT_STARTUP
+from config import SHARDED, SHARD_COUNT, SHARD_IDS
+from config import WORKER_PROCESSES, WORKER_LIMITS, WORKER_TIMEOUT
+from config import DB_READERS, DB_SYNCHRONOUS, DB_USER_CACHE_SIZE
+from config import DB_QUERY_LOG, DB_SLOW_QUERY_MS
+from utils.cache import ResponseCache
+from utils.http import HTTPClient
+from utils.logs import setup_logging
+from utils.members import build_cache_policy
+from utils.metrics import CommandMetrics, MetricsRegistry, MetricsServer
+from utils.runtime import Runtime, get_profile
+from utils.scope import COMMAND_GUILD_IDS
+from utils.sharding import ShardMetrics, parse_shard_ids
+from utils.watchdog import LoopWatchdog
+from utils.workers import WorkerPool, parse_limits
+import time
+
+
+load_dotenv()
+
+"""	
+Setup bot intents (events restrictions)
+For more information about intents, please go to the following websites:
+https://discordpy.readthedocs.io/en/latest/intents.html
+https://discordpy.readthedocs.io/en/latest/intents.html#privileged-intents
+
+
+Default Intents:
+intents.bans = True
+intents.dm_messages = True
+intents.dm_reactions = True
+intents.dm_typing = True
+intents.emojis = True
+intents.emojis_and_stickers = True
+intents.guild_messages = True
+intents.guild_reactions = True
+intents.guild_scheduled_events = True
+intents.guild_typing = True
+intents.guilds = True
+intents.integrations = True
+intents.invites = True
+intents.messages = True # `message_content` is required to get the content of the messages
+intents.reactions = True
+intents.typing = True
+intents.voice_states = True
+intents.webhooks = True
+
+Privileged Intents (Needs to be enabled on developer portal of Discord), please use them only if you need them:
+intents.members = True
+intents.message_content = True
+intents.presences = True
+"""
+
+"""
+Os intents privilegiados e a cache de membros vêm do config (utils/members.py).
+message_content fica sempre ligado: é preciso para os comandos de prefixo.
+"""
+cache_policy = build_cache_policy(
+    members=INTENT_MEMBERS,
+    presences=INTENT_PRESENCES,
+    message_content=True,
+    member_cache=MEMBER_CACHE,
+    chunk_guilds_at_startup=CHUNK_GUILDS_AT_STARTUP,
+)
+intents = cache_policy.intents
+
+# Setup do logger: o loop só enfileira, a escrita é feita numa thread (utils/logs.py)
+logger = setup_logging(
+    filename=LOG_FILE,
+    max_bytes=LOG_MAX_BYTES,
+    backup_count=LOG_BACKUP_COUNT,
+    rotate_when=LOG_ROTATE_WHEN or None,
+    json_file=LOG_JSON,
+)
+
+runtime = Runtime(get_profile(RUNTIME_PROFILE, RUNTIME_GC_THRESHOLDS), logger)
+
+
+class InstrumentedCommandTree(app_commands.CommandTree):
+    """
+    Mede os slash commands "puros". Os híbridos são medidos pelos eventos
+    on_command/on_command_completion/on_command_error, tal como os de prefixo.
+    """
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        command = interaction.command
+        if (
+            interaction.type is discord.InteractionType.application_command
+            and command is not None
+            and not isinstance(command, HybridAppCommand)
+        ):
+            cog = getattr(command, "binding", None)
+            self.client.command_metrics.start(
+                interaction.id, cog.qualified_name if cog else None, command.qualified_name, "slash"
+            )
+        return True
+
+    async def on_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError) -> None:
+        self.client.command_metrics.finish(interaction.id, error)
+        await super().on_error(interaction, error)
+
+
+# Com SHARDED=true uma ligação ao gateway por shard (utils/sharding.py)
+BotBase = commands.AutoShardedBot if SHARDED else commands.Bot
+shard_options = {"shard_count": SHARD_COUNT, "shard_ids": parse_shard_ids(SHARD_IDS, SHARD_COUNT)} if SHARDED else {}
+
+
+class DiscordBot(BotBase):
+    def __init__(self) -> None:
+        super().__init__(
+            command_prefix=commands.when_mentioned_or(PREFIX),
+            intents=intents,
+            member_cache_flags=cache_policy.member_cache_flags,
+            chunk_guilds_at_startup=cache_policy.chunk_guilds_at_startup,
+            help_command=None,
+            tree_cls=InstrumentedCommandTree,
+            **shard_options,
+        )
+        """
+        This creates custom bot variables so that we can access these variables in cogs more easily.
+
+        For example, The logger is available using the following code:
+        - self.logger # In this class
+        - bot.logger # In this file
+        - self.bot.logger # In cogs
+        """
+        self.logger = logger
+        self.database = None
+        self.database_path = f"{os.path.realpath(os.path.dirname(__file__))}/database/database.db"
+        self.command_usage = None
+        self.bot_prefix = PREFIX
+        # Métricas (latência, erros, pedidos externos): self.bot.metrics
+        self.metrics = MetricsRegistry()
+        # Cópias de segurança da base de dados (/backup e backup_task)
+        self.backups = BackupManager(
+            self.database_path,
+            BACKUP_DIR,
+            keep_last=BACKUP_KEEP_LAST,
+            keep_daily=BACKUP_KEEP_DAILY,
+            pages=BACKUP_STEP_PAGES,
+            step_sleep=BACKUP_STEP_SLEEP,
+            metrics=self.metrics,
+            logger=logger,
+        )
+        self.command_metrics = CommandMetrics(self.metrics)
+        self.shard_metrics = ShardMetrics(self, self.metrics)
+        self.metrics_server = MetricsServer(self.metrics, host=METRICS_HOST, port=METRICS_PORT)
+        self.loop_watchdog = LoopWatchdog(
+            interval=LOOP_LAG_INTERVAL,
+            threshold=LOOP_LAG_THRESHOLD,
+            metrics=self.metrics,
+            command_metrics=self.command_metrics,
+            logger=logger,
+        )
+        # Pool de processos para yt-dlp e parsing de HTML: self.bot.workers
+        self.workers = WorkerPool(
+            processes=WORKER_PROCESSES,
+            limits=parse_limits(WORKER_LIMITS),
+            timeout=WORKER_TIMEOUT,
+            metrics=self.metrics,
+            logger=logger,
+        )
+        # Cliente HTTP partilhado pelos cogs: self.bot.http_client
+        self.http_client = HTTPClient(
+            timeout=HTTP_TIMEOUT,
+            limit_per_host=HTTP_LIMIT_PER_HOST,
+            dns_ttl=HTTP_DNS_TTL,
+            cache=ResponseCache(
+                max_entries=HTTP_CACHE_MAX_ENTRIES,
+                path=HTTP_CACHE_FILE or None,
+            ),
+            logger=logger,
+            metrics=self.metrics,
+            json_loads=runtime.json_loads,
+            json_dumps=runtime.json_dumps,
+            circuit_breaker=HTTP_BREAKER_ENABLED,
+            breaker_settings={
+                "window": HTTP_BREAKER_WINDOW,
+                "min_calls": HTTP_BREAKER_MIN_CALLS,
+                "failure_rate": HTTP_BREAKER_FAILURE_RATE,
+                "slow_call": HTTP_BREAKER_SLOW_CALL,
+                "open_for": HTTP_BREAKER_OPEN_SECONDS,
+                "max_open_for": HTTP_BREAKER_MAX_OPEN_SECONDS,
+            },
+            hedge_settings={
+                "budget": HTTP_HEDGE_BUDGET,
+                "quantile": HTTP_HEDGE_QUANTILE,
+                "min_samples": HTTP_HEDGE_MIN_SAMPLES,
+                "min_delay": HTTP_HEDGE_MIN_DELAY,
+            },
+        )
+
+    async def load_extension(self, name: str, *, package=None) -> None:
+        started = time.perf_counter()
+        rss = current_rss()
+        await super().load_extension(name, package=package)
+        if import_profiler.installed:
+            import_profiler.record_extension(name, time.perf_counter() - started, current_rss() - rss)
+
+    @watch(path='cogs', preload=True)
+    async def on_ready(self):
+        self.logger.info('Bot ready.')
+        # Os cogs já foram todos carregados pelo cogwatch (preload): fecha o relatório
+        if import_profiler.installed:
+            import_profiler.uninstall()
+            self.logger.info(import_profiler.report())
+        runtime.freeze()
+
+    async def on_shard_ready(self, shard_id: int) -> None:
+        self.logger.info(f"Shard {shard_id} pronto.")
+
+    async def on_shard_disconnect(self, shard_id: int) -> None:
+        self.logger.warning(f"Shard {shard_id} desligado do gateway.")
+
+    async def on_shard_resumed(self, shard_id: int) -> None:
+        self.logger.info(f"Shard {shard_id} retomou a sessão.")
+
+    @tasks.loop(minutes=4.0)
+    async def status_task(self) -> None:
+        estados = [
+            "Empregado do mes: King Nothing👋",
+            "Pior chefe: Born This Way 💩",
+            "A fazer cenas fixes 😎",
+        ]
+        await self.change_presence(
+            activity=discord.Game(random.choice(estados))
+        )
+
+    @status_task.before_loop
+    async def before_status_task(self) -> None:
+        """
+        Before starting the status changing task, we make sure the bot is ready
+        """
+        await self.wait_until_ready()
+
+    @tasks.loop(hours=1.0)
+    async def usage_history_task(self) -> None:
+        """Passa o histórico por hora dos comandos a diário (e apaga o mais antigo)."""
+        try:
+            rolled, dropped = await self.database.rollup_command_history(
+                USAGE_HISTORY_HOURLY_DAYS, USAGE_HISTORY_DAILY_DAYS
+            )
+        except Exception as e:
+            self.logger.error(f"Falha ao agregar o histórico de comandos: {e}")
+            return
+        if rolled or dropped:
+            self.logger.info(f"Histórico de comandos: {rolled} hora(s) agregadas por dia, {dropped} dia(s) apagados")
+
+    @tasks.loop(hours=1.0)
+    async def backup_task(self) -> None:
+        """Cópia de segurança da base de dados, se a última tiver mais de BACKUP_INTERVAL_HOURS."""
+        age = self.backups.age()
+        if self.backups.running or (age is not None and age < BACKUP_INTERVAL_HOURS * 3600 - 60):
+            return
+        try:
+            await self.backups.run()
+        except Exception as e:
+            self.logger.error(f"Falha na cópia de segurança da base de dados: {e}")
+
+    async def setup_hook(self) -> None:
+        """
+        This will just be executed when the bot starts the first time.
+        """
+        self.logger.info(f"Logged in as {self.user.name}")
+        self.logger.info(f"discord.py API version: {discord.__version__}")
+        self.logger.info(f"Python version: {platform.python_version()}")
+        self.logger.info(
+            f"Running on: {platform.system()} {platform.release()} ({os.name})"
+        )
+        self.logger.info(f"Runtime: {runtime.describe()}")
+        self.logger.info(f"Cache de membros: {cache_policy.describe()}")
+        self.logger.info(
+            f"Shards: {'auto' if SHARDED else 'não'} (total={self.shard_count or 'recomendado'}, "
+            f"ids={self.shard_ids if SHARDED and self.shard_ids else 'todos'}), "
+            f"comandos: {'globais' if COMMAND_GUILD_IDS is None else COMMAND_GUILD_IDS}"
+        )
+        self.logger.info("-------------------")
+        self.loop_watchdog.start()
+        self.shard_metrics.install()
+        await self.http_client.start()
+        await self.workers.start()
+        if METRICS_PORT:
+            try:
+                await self.metrics_server.start()
+                self.logger.info(f"Métricas em http://{METRICS_HOST}:{METRICS_PORT}/metrics")
+            except OSError as e:
+                self.logger.warning(f"Não foi possível abrir o endpoint de métricas: {e}")
+        # await self.load_cogs()
+        
+        try:
+            await self.load_extension("jishaku")
+            self.logger.info("Loaded extension 'jishaku'")
+        except Exception as e:
+            self.logger.warning(f"Não foi possível carregar jishaku: {e}")
+            
+        
+        self.database = await DatabaseManager.open(
+            self.database_path,
+            readers=DB_READERS,
+            synchronous=DB_SYNCHRONOUS,
+            user_cache_size=DB_USER_CACHE_SIZE,
+            metrics=self.metrics,
+            logger=self.logger,
+            query_log=QueryLog(
+                threshold=DB_SLOW_QUERY_MS / 1000, metrics=self.metrics, logger=self.logger
+            ) if DB_QUERY_LOG else None,
+        )
+        self.command_usage = CommandUsageBuffer(
+            self.database,
+            flush_interval=USAGE_FLUSH_INTERVAL,
+            max_pending=USAGE_FLUSH_MAX_PENDING,
+            logger=self.logger,
+        )
+        self.command_usage.start()
+        
+        self.status_task.start()
+        self.usage_history_task.start()
+        if BACKUP_INTERVAL_HOURS > 0:
+            self.backup_task.start()
+
+    async def on_message(self, message):
+        if message.author.bot:
+            return
+
+        await self.process_commands(message)
+
+    async def on_command(self, context: Context) -> None:
+        self.command_metrics.start(
+            id(context),
+            context.cog.qualified_name if context.cog else None,
+            context.command.qualified_name,
+            "slash" if context.interaction else "prefix",
+        )
+
+    async def on_app_command_completion(self, interaction: discord.Interaction, command) -> None:
+        # Os híbridos já foram medidos no on_command_completion
+        if not isinstance(command, HybridAppCommand):
+            self.command_metrics.finish(interaction.id)
+
+    async def on_command_completion(self, context: Context) -> None:
+        self.command_metrics.finish(id(context))
+        full_command_name = context.command.qualified_name
+        executed_command = full_command_name.split(" ")[0]
+        
+        # incrementa os counters (global e por comando) em memória;
+        # o CommandUsageBuffer grava-os em lote na base de dados
+        self.command_usage.add(
+            context.author.id, executed_command, guild_id=context.guild.id if context.guild else None
+        )
+
+        if context.guild:
+            self.logger.info(
+                f"Executed {executed_command} in {context.guild.name} by {context.author}"
+            )
+        else:
+            self.logger.info(f"Executed {executed_command} by {context.author} in DMs")
+        
+    async def on_command_error(self, context: Context, error) -> None:
+        """
+        The code in this event is executed every time a normal valid command catches an error.
+
+        :param context: The context of the normal command that failed executing.
+        :param error: The error that has been faced.
+        """
+        self.command_metrics.finish(id(context), error)
+        if isinstance(error, commands.CommandOnCooldown):
+            minutes, seconds = divmod(error.retry_after, 60)
+            hours, minutes = divmod(minutes, 60)
+            hours = hours % 24
+            embed = discord.Embed(
+                description=f"**Please slow down** - You can use this command again in {f'{round(hours)} hours' if round(hours) > 0 else ''} {f'{round(minutes)} minutes' if round(minutes) > 0 else ''} {f'{round(seconds)} seconds' if round(seconds) > 0 else ''}.",
+                color=0xE02B2B,
+            )
+            await context.send(embed=embed)
+        elif isinstance(error, commands.NotOwner):
+            embed = discord.Embed(
+                description="You are not the owner of the bot!", color=0xE02B2B
+            )
+            await context.send(embed=embed)
+            if context.guild:
+                self.logger.warning(
+                    f"{context.author} (ID: {context.author.id}) tried to execute an owner only command in the guild {context.guild.name} (ID: {context.guild.id}), but the user is not an owner of the bot."
+                )
+            else:
+                self.logger.warning(
+                    f"{context.author} (ID: {context.author.id}) tried to execute an owner only command in the bot's DMs, but the user is not an owner of the bot."
+                )
+        elif isinstance(error, commands.MissingPermissions):
+            embed = discord.Embed(
+                description="You are missing the permission(s) `"
+                + ", ".join(error.missing_permissions)
+                + "` to execute this command!",
+                color=0xE02B2B,
+            )
+            await context.send(embed=embed)
+        elif isinstance(error, commands.BotMissingPermissions):
+            embed = discord.Embed(
+                description="I am missing the permission(s) `"
+                + ", ".join(error.missing_permissions)
+                + "` to fully perform this command!",
+                color=0xE02B2B,
+            )
+            await context.send(embed=embed)
+        elif isinstance(error, commands.MissingRequiredArgument):
+            embed = discord.Embed(
+                title="Error!",
+                # We need to capitalize because the command arguments have no capital letter in the code and they are the first word in the error message.
+                description=str(error).capitalize(),
+                color=0xE02B2B,
+            )
+            await context.send(embed=embed)
+        else:
+            raise error
+        
+    async def close(self):
+        self.logger.info("A encerrar bot...")
+
+        if self.status_task.is_running():
+            self.status_task.cancel()
+        if self.usage_history_task.is_running():
+            self.usage_history_task.cancel()
+        if self.backup_task.is_running():
+            self.backup_task.cancel()
+
+        if self.command_usage:
+            try:
+                await self.command_usage.close()
+            except Exception as e:
+                self.logger.error(f"Não foi possível gravar os contadores de comandos: {e}")
+
+        if self.database:
+            await self.database.close()
+
+        await self.http_client.close()
+        await self.workers.close()
+        await self.metrics_server.close()
+        await self.loop_watchdog.stop()
+
+        await super().close()
+
+async def main():
+    bot = DiscordBot()
+
+    try:
+        await bot.start(TOKEN)
+    except KeyboardInterrupt:
+        print("Ctrl+C recebido — a encerrar bot...")
+    finally:
+        await bot.close()
+
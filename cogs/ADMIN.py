@@ -1,11 +1,18 @@
+import io
 import os
 from datetime import datetime
+from typing import Literal
 
 import discord
 from discord import app_commands
 from discord.ext import commands
 from discord.ext.commands import Context
-from config import GUILD_ID
+from utils.scope import COMMAND_GUILD_IDS, command_guilds
+from utils.members import get_or_fetch_member
+from utils.charts import heatmap_png, sparkline
+
+# Opções do /stats e quantas horas cada uma conta
+STATS_PERIODS = {"24h": 24, "7d": 7 * 24, "30d": 30 * 24}
 
 
 def format_joined_at(value: str | None) -> str:
@@ -123,16 +130,28 @@ class ADMIN(commands.Cog, name="admin"):
         self.bot = bot
         # Estrutura de avisos em memória: {guild_id: {user_id: [warn_entry, ...]}}
         self.warnings_db = {}
-        self.next_warn_id = 1  # ID sequencial dos avisos
+        self.next_warn_id = {}  # ID sequencial dos avisos, por servidor: {guild_id: próximo_id}
 
     # ---------- SYNC ----------
     @app_commands.command(name="sync", description="Sincroniza todos os comandos de aplicação com o servidor.")
-    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    @command_guilds()
     async def sync_tree(self, interaction: discord.Interaction):
         await interaction.response.defer(thinking=True, ephemeral=True)
         try:
-            synced = await self.bot.tree.sync(guild=discord.Object(id=GUILD_ID))
-            await interaction.followup.send(f"✅ Sincronizados {len(synced)} comandos para este servidor.")
+            if COMMAND_GUILD_IDS is None:
+                # COMMAND_GUILDS=global: os comandos são globais e chegam a todos os servidores
+                synced = await self.bot.tree.sync()
+                await interaction.followup.send(f"✅ Sincronizados {len(synced)} comandos globais.")
+            else:
+                # Todos os servidores do COMMAND_GUILDS, não só aquele onde o /sync foi usado
+                lines = []
+                for guild_id in COMMAND_GUILD_IDS:
+                    try:
+                        synced = await self.bot.tree.sync(guild=discord.Object(id=guild_id))
+                        lines.append(f"✅ `{guild_id}`: {len(synced)} comandos")
+                    except discord.HTTPException as e:
+                        lines.append(f"❌ `{guild_id}`: {e}")
+                await interaction.followup.send("\n".join(lines))
         except Exception as e:
             await interaction.followup.send(f"❌ Erro ao sincronizar comandos:\n`{e}`")
 
@@ -146,13 +165,17 @@ class ADMIN(commands.Cog, name="admin"):
         user="O utilizador que deverá ter um novo nickname.",
         nickname="O novo nickname a definir.",
     )
-    @app_commands.guilds(discord.Object(GUILD_ID))
+    @command_guilds()
     async def nick(
         self, context: Context, user: discord.User, *, nickname: str = None
     ) -> None:
-        member = context.guild.get_member(user.id) or await context.guild.fetch_member(
-            user.id
-        )
+        member = await get_or_fetch_member(context.guild, user.id)
+        if member is None:
+            embed = discord.Embed(
+                description=f"**{user}** não está neste servidor.", color=0xE02B2B
+            )
+            await context.send(embed=embed)
+            return
         try:
             await member.edit(nick=nickname)
             embed = discord.Embed(
@@ -172,7 +195,7 @@ class ADMIN(commands.Cog, name="admin"):
         description="Gerir avisos de um utilizador no servidor.",
     )
     @commands.has_permissions(manage_messages=True)
-    @app_commands.guilds(discord.Object(GUILD_ID))
+    @command_guilds()
     async def aviso(self, context: Context) -> None:
         if context.invoked_subcommand is None:
             embed = discord.Embed(
@@ -190,7 +213,7 @@ class ADMIN(commands.Cog, name="admin"):
         user="O utilizador que deverá receber um aviso.",
         reason="O motivo do aviso.",
     )
-    @app_commands.guilds(discord.Object(GUILD_ID))
+    @command_guilds()
     async def aviso_adicionar(
         self, context: Context, user: discord.User, *, reason: str = "Não especificado"
     ) -> None:
@@ -202,13 +225,13 @@ class ADMIN(commands.Cog, name="admin"):
 
         # Criar aviso
         warn_entry = {
-            "warn_id": self.next_warn_id,
+            "warn_id": self.next_warn_id.get(guild_id, 1),
             "author_id": context.author.id,
             "reason": reason,
             "timestamp": int(datetime.now().timestamp()),
         }
         self.warnings_db[guild_id][user_id].append(warn_entry)
-        self.next_warn_id += 1
+        self.next_warn_id[guild_id] = warn_entry["warn_id"] + 1
         total = len(self.warnings_db[guild_id][user_id])
 
         embed = discord.Embed(
@@ -236,7 +259,7 @@ class ADMIN(commands.Cog, name="admin"):
         user="O utilizador que deverá ter o aviso removido.",
         warn_id="O ID do aviso que deverá ser removido.",
     )
-    @app_commands.guilds(discord.Object(GUILD_ID))
+    @command_guilds()
     async def aviso_remover(
         self, context: Context, user: discord.User, warn_id: int
     ) -> None:
@@ -270,7 +293,7 @@ class ADMIN(commands.Cog, name="admin"):
     )
     @commands.has_guild_permissions(manage_messages=True)
     @app_commands.describe(user="O utilizador do qual queres ver os avisos.")
-    @app_commands.guilds(discord.Object(GUILD_ID))
+    @command_guilds()
     async def aviso_listar(self, context: Context, user: discord.User) -> None:
         guild_id = context.guild.id
         user_id = user.id
@@ -293,7 +316,7 @@ class ADMIN(commands.Cog, name="admin"):
     @commands.has_guild_permissions(manage_messages=True)
     @commands.bot_has_permissions(manage_messages=True)
     @app_commands.describe(amount="O número de mensagens a apagar.")
-    @app_commands.guilds(discord.Object(GUILD_ID))
+    @command_guilds()
     async def purge(self, context: Context, amount: int) -> None:
         await context.send("A apagar mensagens...")
         purged_messages = await context.channel.purge(limit=amount + 1)
@@ -311,7 +334,7 @@ class ADMIN(commands.Cog, name="admin"):
     @app_commands.describe(
         limit="O limite de mensagens a arquivar.",
     )
-    @app_commands.guilds(discord.Object(GUILD_ID))
+    @command_guilds()
     async def arquivo(self, context: Context, limit: int = 10) -> None:
         log_file = f"{context.channel.id}.log"
         with open(log_file, "w", encoding="UTF-8") as f:
@@ -339,32 +362,65 @@ class ADMIN(commands.Cog, name="admin"):
         description="Mostra estatísticas de uso dos comandos"
     )
     @app_commands.describe(
-        least="Mostrar os comandos menos usados em vez dos mais usados"
+        least="Mostrar os comandos menos usados em vez dos mais usados",
+        periodo="Contar só os usos das últimas 24h / 7 dias / 30 dias"
     )
-    @app_commands.guilds(discord.Object(GUILD_ID))
-    async def stats(self, interaction: discord.Interaction, least: bool = False):
+    @command_guilds()
+    async def stats(
+        self,
+        interaction: discord.Interaction,
+        least: bool = False,
+        periodo: Literal["sempre", "24h", "7d", "30d"] = "sempre",
+    ):
         await interaction.response.defer()
-        top_commands = await self.bot.database.get_command_stats(limit=20, ascending=least)
+        database = self.bot.database
+        if periodo == "sempre":
+            top_commands = await database.get_command_stats(limit=20, ascending=least)
+        else:
+            top_commands = await database.get_command_window(STATS_PERIODS[periodo], limit=20, ascending=least)
 
         if not top_commands:
             return await interaction.followup.send("Nenhum comando registado ainda.")
 
         description = "\n".join(f"**{name}** → {count} usos" for name, count in top_commands)
         title = "Comandos menos usados" if least else "Comandos mais usados"
+        if periodo != "sempre":
+            title += f" ({periodo})"
 
         embed = discord.Embed(
             title=title,
             description=description,
             color=0x00FF00
         )
-        await interaction.followup.send(embed=embed)
+        if periodo == "sempre":
+            return await interaction.followup.send(embed=embed)
+
+        # 24h: uma barra por hora; 7d e 30d: uma por dia, e o mapa dia da semana × hora
+        hours = STATS_PERIODS[periodo]
+        if periodo == "24h":
+            series = await database.get_command_series(hours, step="hour")
+        else:
+            series = await database.get_command_series(hours // 24, step="day")
+        embed.add_field(
+            name=f"Uso total: {sum(series)}",
+            value=f"`{sparkline(series)}`",
+            inline=False,
+        )
+        if periodo == "24h":
+            return await interaction.followup.send(embed=embed)
+
+        grid = await database.get_command_heatmap(hours // 24)
+        file = discord.File(io.BytesIO(heatmap_png(grid)), filename="uso.png")
+        embed.set_image(url="attachment://uso.png")
+        embed.set_footer(text="Linhas: segunda a domingo · colunas: 0h a 23h (UTC)")
+        await interaction.followup.send(embed=embed, file=file)
 
     async def setup(bot: commands.Bot):
         await bot.add_cog(Stats(bot))
         
     @app_commands.command(name="perfil", description="Mostra ou edita o perfil de alguém")
     @app_commands.describe(editar="Mostra botões para editar o teu perfil", user="Outro utilizador")
-    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    @command_guilds()
     async def profile(self, interaction: discord.Interaction, editar: bool = False, user: discord.User | None = None):
         db = self.bot.database
         target = user or interaction.user
@@ -1,8 +1,7 @@
-import os
 import discord
 from discord.ext import commands
 from discord import app_commands
-import aiohttp
+from utils.scope import command_guilds
 
 HISCORES_URL = "https://secure.runescape.com/m=hiscore_oldschool/index_lite.ws?player={}"
 
@@ -26,19 +25,17 @@ class OSRS(commands.Cog):
     @app_commands.describe(
         username="Nome do jogador Old School RuneScape."
     )
-    @app_commands.guilds(discord.Object(id=int(os.getenv("GUILD_ID"))))
+    @command_guilds()
     async def osrs(self, interaction: discord.Interaction, username: str):
         """Slash command /osrs para buscar hiscores."""
         await interaction.response.defer(thinking=True)
 
         try:
-            async with aiohttp.ClientSession() as session:
-                url = HISCORES_URL.format(username.replace(" ", "+"))
-                async with session.get(url) as resp:
-                    if resp.status != 200:
-                        return await interaction.followup.send(f"❌ Jogador **{username}** não encontrado.")
-                    data = await resp.text()
-                    rows = data.splitlines()
+            url = HISCORES_URL.format(username.replace(" ", "+"))
+            resp = await self.bot.http_client.fetch(url, read="text")
+            if resp.status != 200:
+                return await interaction.followup.send(f"❌ Jogador **{username}** não encontrado.")
+            rows = resp.body.splitlines()
 
             embed = discord.Embed(
                 title=f"{username} Hiscores",
@@ -1,11 +1,12 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import aiohttp
-from typing import Dict, List, Final
-from selectolax.parser import HTMLParser
+from typing import Dict, List, Final, TYPE_CHECKING
 from contextlib import suppress
-from config import GUILD_ID
+from utils.scope import command_guilds
+
+if TYPE_CHECKING:
+    from selectolax.parser import HTMLParser
 
 BASE_URL: Final[str] = "https://www3.gogoanimes.fi/"
 
@@ -14,18 +15,19 @@ BASE_URL: Final[str] = "https://www3.gogoanimes.fi/"
 # Scraper helpers
 # =====================
 
-async def get_request(url: str) -> str:
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url) as response:
-            return await response.text()
+async def get_request(http, url: str) -> str:
+    resp = await http.fetch(url, read="text")
+    return resp.body
+
 
+def html_parser(html: str) -> "HTMLParser":
+    from selectolax.parser import HTMLParser  # só é importado no primeiro /anime
 
-def html_parser(html: str) -> HTMLParser:
     return HTMLParser(html)
 
 
-async def search_anime(query: str) -> List[Dict[str, str]]:
-    html = await get_request(f"{BASE_URL}/search.html?keyword={query}")
+async def search_anime(http, query: str) -> List[Dict[str, str]]:
+    html = await get_request(http, f"{BASE_URL}/search.html?keyword={query}")
     parser = html_parser(html)
 
     results = []
@@ -43,8 +45,8 @@ async def search_anime(query: str) -> List[Dict[str, str]]:
     return results
 
 
-async def get_streaming_links(anime_id: str, episode: int) -> Dict[str, str]:
-    html = await get_request(f"{BASE_URL}/{anime_id}-episode-{episode}")
+async def get_streaming_links(http, anime_id: str, episode: int) -> Dict[str, str]:
+    html = await get_request(http, f"{BASE_URL}/{anime_id}-episode-{episode}")
     parser = html_parser(html)
 
     servers = parser.css(".anime_muti_link > ul > li")[1:]
@@ -63,8 +65,9 @@ async def get_streaming_links(anime_id: str, episode: int) -> Dict[str, str]:
 # =====================
 
 class AnimeResultView(discord.ui.View):
-    def __init__(self, anime_id: str):
+    def __init__(self, http, anime_id: str):
         super().__init__(timeout=120)
+        self.http = http
         self.anime_id = anime_id
 
     @discord.ui.button(label="▶️ Get Episode 1 Links", style=discord.ButtonStyle.primary)
@@ -75,7 +78,7 @@ class AnimeResultView(discord.ui.View):
     ):
         await interaction.response.defer(thinking=True)
 
-        links = await get_streaming_links(self.anime_id, 1)
+        links = await get_streaming_links(self.http, self.anime_id, 1)
 
         if not links:
             await interaction.followup.send("❌ No streaming links found.")
@@ -99,7 +102,7 @@ class AnimeCog(commands.Cog):
         self.bot = bot
 
     @app_commands.command(name="anime", description="Search for an anime")
-    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    @command_guilds()
     @app_commands.describe(query="Anime name")
     async def anime_search(
         self,
@@ -108,7 +111,7 @@ class AnimeCog(commands.Cog):
     ):
         await interaction.response.defer(thinking=True)
 
-        results = await search_anime(query)
+        results = await search_anime(self.bot.http_client, query)
 
         if not results:
             await interaction.followup.send("❌ No results found.")
@@ -123,7 +126,7 @@ class AnimeCog(commands.Cog):
             )
             embed.set_thumbnail(url=BASE_URL + anime["img"])
 
-            view = AnimeResultView(anime["id"])
+            view = AnimeResultView(self.bot.http_client, anime["id"])
 
             await interaction.followup.send(
                 embed=embed,
@@ -1,7 +1,6 @@
 import discord
 from discord.ext import commands
 from discord.ext.commands import Context
-import aiohttp
 import random
 
 
@@ -10,8 +9,6 @@ class AnimeQuote(commands.Cog):
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        if not hasattr(bot, "session"):
-            self.bot.session = aiohttp.ClientSession()
 
     @commands.hybrid_command(
         name="anime_quote",
@@ -22,10 +19,12 @@ class AnimeQuote(commands.Cog):
         await ctx.defer()  # permite responder mais tarde
 
         try:
-            async with self.bot.session.get("https://api.animechan.io/v1/quotes/random") as r:
-                if r.status != 200:
-                    raise Exception(f"API retornou status {r.message}")
-                info = await r.json()
+            r = await self.bot.http_client.fetch(
+                "https://api.animechan.io/v1/quotes/random", hedge=True
+            )
+            if r.status != 200:
+                raise Exception(f"API retornou status {r.status}")
+            info = r.body
 
             # Cria embed
             data = info.get("data")
@@ -8,7 +8,7 @@ import discord
 from discord import app_commands
 from discord.ext import commands, tasks
 from discord.ext.commands import Context
-from config import GUILD_ID
+from utils.scope import command_guilds
 
 DATA_FILE = "quem_joga_hoje.json"
 
@@ -69,7 +69,7 @@ class Bg3Utility(commands.Cog, name="bg3_utilities"):
         start_time="Hora de início (HH:MM)",
         end_time="Hora de fim (HH:MM)"
     )
-    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    @command_guilds()
     async def quem_joga(
         self, context: Context,
         nome_jogo: str = None,
@@ -169,7 +169,7 @@ class Bg3Utility(commands.Cog, name="bg3_utilities"):
         name="reset_jogo",
         description="Limpa a lista de quem joga hoje"
     )
-    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    @command_guilds()
     async def reset_jogo(self, context: Context) -> None:
         save_players([])
         # Cancel scheduled reminders
@@ -187,7 +187,7 @@ class Bg3Utility(commands.Cog, name="bg3_utilities"):
         name="d20",
         description="Rola um d20 para decisões rápidas"
     )
-    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    @command_guilds()
     async def d20(self, context: Context) -> None:
         value = random.randint(1, 20)
         embed = discord.Embed(
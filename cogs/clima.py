@@ -46,8 +46,6 @@ class Weather(commands.Cog):
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        if not hasattr(bot, "session"):
-            self.bot.session = aiohttp.ClientSession()
 
     @commands.hybrid_command(
         name="clima",
@@ -88,10 +86,16 @@ class Weather(commands.Cog):
         }
 
         try:
-            async with self.bot.session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=20)) as r:
-                if r.status != 200:
-                    raise Exception(f"Erro da API ({r.status})")
-                data = await r.json()
+            r = await self.bot.http_client.fetch(
+                url,
+                params=params,
+                timeout=aiohttp.ClientTimeout(total=20),
+                cache_ttl=10 * 60,
+                stale_ttl=20 * 60,
+            )
+            if r.status != 200:
+                raise Exception(f"Erro da API ({r.status})")
+            data = r.body
 
             # ---- Dados corretos ----
             main = data["main"]
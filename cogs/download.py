@@ -1,11 +1,40 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import yt_dlp
 import os
-import asyncio
 import aiohttp
-from config import GUILD_ID
+from utils.scope import command_guilds
+
+def download_media(url: str, audio: bool = False) -> str:
+    """Corre no pool de processos (utils/workers.py). Devolve o caminho do ficheiro."""
+    import yt_dlp  # já vem importado nos processos do pool
+
+    outtmpl = "downloads/%(title).50s.%(ext)s"
+    ydl_opts = {
+        "outtmpl": outtmpl,
+        "quiet": True,
+        "noplaylist": True,
+    }
+
+    if audio:
+        ydl_opts.update({
+            "format": "bestaudio/best",
+            "postprocessors": [{
+                "key": "FFmpegExtractAudio",
+                "preferredcodec": "mp3",
+                "preferredquality": "192",
+            }],
+        })
+    else:
+        ydl_opts.update({"format": "mp4"})
+
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(url, download=True)
+        filepath = ydl.prepare_filename(info)
+        if audio:
+            filepath = os.path.splitext(filepath)[0] + ".mp3"
+    return filepath
+
 
 class DownloaderCog(commands.Cog):
     """Download videos or audio (mp3) from URLs"""
@@ -15,39 +44,11 @@ class DownloaderCog(commands.Cog):
 
     async def run_yt_dlp(self, url: str, audio: bool = False) -> str | None:
         """Download video/audio with yt-dlp. Returns filepath or None if fail."""
-        outtmpl = "downloads/%(title).50s.%(ext)s"
-        ydl_opts = {
-            "outtmpl": outtmpl,
-            "quiet": True,
-            "noplaylist": True,
-        }
-
-        if audio:
-            ydl_opts.update({
-                "format": "bestaudio/best",
-                "postprocessors": [{
-                    "key": "FFmpegExtractAudio",
-                    "preferredcodec": "mp3",
-                    "preferredquality": "192",
-                }],
-            })
-        else:
-            ydl_opts.update({"format": "mp4"})
-
         os.makedirs("downloads", exist_ok=True)
 
-        loop = asyncio.get_event_loop()
         try:
-            filepath = None
-            def _dl():
-                nonlocal filepath
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    info = ydl.extract_info(url, download=True)
-                    filepath = ydl.prepare_filename(info)
-                    if audio:
-                        filepath = os.path.splitext(filepath)[0] + ".mp3"
-            await loop.run_in_executor(None, _dl)
-            return filepath
+            # downloads grandes (e a conversão para mp3) passam do limite por defeito do pool
+            return await self.bot.workers.run("download", download_media, url, audio, timeout=600)
         except Exception as e:
             print("yt-dlp error:", e)
             return None
@@ -57,22 +58,24 @@ class DownloaderCog(commands.Cog):
         filename = os.path.basename(filepath)
         url = "https://temp.sh/upload"
         try:
-            async with aiohttp.ClientSession() as session:
-                with open(filepath, "rb") as f:
-                    data = {"file": f}
-                    async with session.post(url, data=data) as resp:
-                        if resp.status == 200:
-                            text = await resp.text()
-                            return text.strip()
-                        else:
-                            print("temp.sh error:", resp.status)
-                            return None
+            with open(filepath, "rb") as f:
+                data = {"file": f}
+                # uploads grandes podem demorar bem mais que o timeout por defeito
+                async with self.bot.http_client.post(
+                    url, data=data, timeout=aiohttp.ClientTimeout(total=300)
+                ) as resp:
+                    if resp.status == 200:
+                        text = await resp.text()
+                        return text.strip()
+                    else:
+                        print("temp.sh error:", resp.status)
+                        return None
         except Exception as e:
             print("Upload error:", e)
             return None
 
     @app_commands.command(name="download", description="Baixar vídeo ou áudio de um URL")
-    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    @command_guilds()
     @app_commands.describe(url="Link do vídeo/música", audio="Baixar apenas áudio (mp3)?")
     async def download(self, interaction: discord.Interaction, url: str, audio: bool = False):
         await interaction.response.defer(thinking=True)
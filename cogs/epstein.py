@@ -1,10 +1,14 @@
+import asyncio
 import random
+import aiohttp
 import discord
 from discord.ext import commands
 from discord import app_commands
-import aiohttp
-from selectolax.parser import HTMLParser
-from config import GUILD_ID
+from typing import TYPE_CHECKING
+from utils.scope import command_guilds
+
+if TYPE_CHECKING:
+    from selectolax.parser import HTMLParser
 
 BASE = "https://epstein-docs.github.io"
 
@@ -13,18 +17,19 @@ BASE = "https://epstein-docs.github.io"
 # Scraping helpers
 # =====================
 
-async def fetch(url: str) -> str:
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url) as r:
-            return await r.text()
+async def fetch(http, url: str) -> str:
+    r = await http.fetch(url, read="text")
+    return r.body
+
 
+def parse(html: str) -> "HTMLParser":
+    from selectolax.parser import HTMLParser  # só é importado no primeiro /epstein
 
-def parse(html: str) -> HTMLParser:
     return HTMLParser(html)
 
 
-async def get_all_documents() -> list[str]:
-    html = await fetch(f"{BASE}/all-documents/")
+async def get_all_documents(http) -> list[str]:
+    html = await fetch(http, f"{BASE}/all-documents/")
     parser = parse(html)
 
     doc_ids = []
@@ -37,8 +42,8 @@ async def get_all_documents() -> list[str]:
     return list(set(doc_ids))
 
 
-async def get_document(doc_id: str) -> dict:
-    html = await fetch(f"{BASE}/document/{doc_id}/")
+async def get_document(http, doc_id: str) -> dict:
+    html = await fetch(http, f"{BASE}/document/{doc_id}/")
     parser = parse(html)
 
     # ---------------------
@@ -92,17 +97,28 @@ class EpsteinDocsCog(commands.Cog):
         name="epstein",
         description="Get a random Epstein document"
     )
-    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    @command_guilds()
     async def random_doc(self, interaction: discord.Interaction):
         await interaction.response.defer(thinking=True)
 
-        doc_ids = await get_all_documents()
+        # vários /epstein ao mesmo tempo partilham o download e o parsing da lista
+        http = self.bot.http_client
+        try:
+            doc_ids = await http.flights.do(
+                "epstein:all-documents", lambda: get_all_documents(http), label="epstein/all-documents"
+            )
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            doc_ids = []
         if not doc_ids:
             await interaction.followup.send("❌ Could not fetch documents.")
             return
 
         doc_id = random.choice(doc_ids)
-        doc = await get_document(doc_id)
+        try:
+            doc = await get_document(http, doc_id)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            await interaction.followup.send("❌ Could not fetch documents.")
+            return
 
         embed = discord.Embed(
             title=doc["title"],
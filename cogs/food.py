@@ -2,10 +2,10 @@ import aiohttp
 import discord
 from discord import app_commands
 from discord.ext import commands
-from typing import List, Dict, Optional
+from typing import List, Dict
 
 COCKTAIL_API = "https://www.thecocktaildb.com/api/json/v1/1/search.php"
-from config import GUILD_ID
+from utils.scope import command_guilds
 
 
 # =========================
@@ -13,26 +13,20 @@ from config import GUILD_ID
 # =========================
 
 class CocktailClient:
-    def __init__(self):
-        self.session: Optional[aiohttp.ClientSession] = None
-
-    async def start(self):
-        if not self.session:
-            self.session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10))
-
-    async def close(self):
-        if self.session:
-            await self.session.close()
+    def __init__(self, http):
+        self.http = http
 
     async def search(self, name: str) -> List[Dict]:
         params = {"s": name}
 
-        async with self.session.get(COCKTAIL_API, params=params) as resp:
-            if resp.status != 200:
-                return []
+        resp = await self.http.fetch(
+            COCKTAIL_API, params=params, timeout=aiohttp.ClientTimeout(total=10)
+        )
+        if resp.status != 200:
+            return []
 
-            data = await resp.json()
-            return data.get("drinks") or []
+        data = resp.body
+        return data.get("drinks") or []
 
 
 # =========================
@@ -132,19 +126,13 @@ def build_drink_embed(drink: Dict) -> discord.Embed:
 class Cocktails(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.client = CocktailClient()
-
-    async def cog_load(self):
-        await self.client.start()
-
-    async def cog_unload(self):
-        await self.client.close()
+        self.client = CocktailClient(bot.http_client)
 
     @app_commands.command(
         name="cocktail",
         description="Pesquisar cocktails pelo nome 🍸",
     )
-    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    @command_guilds()
     async def cocktail(self, interaction: discord.Interaction, nome: str):
         await interaction.response.defer(thinking=True)
 
@@ -7,7 +7,7 @@ from discord.ext import commands
 from discord import app_commands
 from discord.ext.commands import Context
 
-from config import GUILD_ID
+from utils.scope import command_guilds
 
 
 # ======================
@@ -128,16 +128,17 @@ class Fun(commands.Cog):
 
     # ---------- FACTO ----------
     @commands.hybrid_command(name="facto", description="Obtem um facto aleatório.")
-    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    @command_guilds()
     async def facto(self, ctx: Context):
-        async with aiohttp.ClientSession() as session:
-            async with session.get("https://uselessfacts.jsph.pl/random.json?language=pt") as r:
-                data = await r.json()
+        r = await self.bot.http_client.fetch(
+            "https://uselessfacts.jsph.pl/random.json?language=pt", hedge=True
+        )
+        data = r.body
         await ctx.send(embed=discord.Embed(description=data["text"], color=0x9B59B6))
 
     # ---------- MOEDA ----------
     @commands.hybrid_command(name="moeda", description="Cara ou coroa")
-    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    @command_guilds()
     async def moeda(self, ctx: Context):
         view = CoinFlipView()
         msg = await ctx.send("🪙 **Escolhe:**", view=view)
@@ -157,13 +158,13 @@ class Fun(commands.Cog):
 
     # ---------- RPS ----------
     @commands.hybrid_command(name="rps", description="Pedra papel tesoura")
-    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    @command_guilds()
     async def rps(self, ctx: Context):
         await ctx.send("🎮 Escolhe a jogada:", view=RPSView())
 
     # ---------- BOLACHA ----------
     @commands.hybrid_command(name="bolacha", description="Jogo de reação 🍪")
-    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    @command_guilds()
     async def bolacha(self, ctx: Context):
         msg = await ctx.send("🍪 A bolacha vai cair... fica atento!")
 
@@ -188,7 +189,7 @@ class Fun(commands.Cog):
 
     # ---------- PENIS ----------
     @commands.hybrid_command(name="penis", description="Tamanho totalmente científico™")
-    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    @command_guilds()
     async def penis(self, ctx: Context, membro: discord.Member = None):
         membro = membro or ctx.author
         size = random.randint(0, 30)
@@ -211,7 +212,7 @@ class Fun(commands.Cog):
 
     # ---------- BOLA ----------
     @commands.hybrid_command(name="bola", description="Bola de cristal 🎱")
-    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    @command_guilds()
     async def bola(self, ctx: Context, pergunta: str):
         respostas = [
             "Sim.", "Não.", "Talvez.", "Pergunta depois.",
@@ -226,17 +227,15 @@ class Fun(commands.Cog):
         )
     async def fetch_gif(self, answer: str) -> str:
         url = f"https://yesno.wtf/api?force={answer}"
-        async with aiohttp.ClientSession(
-            timeout=aiohttp.ClientTimeout(total=5)
-        ) as session:
-            async with session.get(url) as resp:
-                if resp.status != 200:
-                    raise RuntimeError("API yesno.wtf falhou")
-                data = await resp.json()
-                return data["image"]
+        resp = await self.bot.http_client.fetch(
+            url, timeout=aiohttp.ClientTimeout(total=5), hedge=True
+        )
+        if resp.status != 200:
+            raise RuntimeError("API yesno.wtf falhou")
+        return resp.body["image"]
 
     @commands.hybrid_command(name="sim", description="Resposta SIM (GIF)")
-    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    @command_guilds()
     async def sim(self, ctx: commands.Context):
         try:
             gif_url = await self.fetch_gif("yes")
@@ -245,7 +244,7 @@ class Fun(commands.Cog):
             await ctx.send("❌ O universo não conseguiu decidir (sim).")
 
     @commands.hybrid_command(name="nao", description="Resposta NÃO (GIF)")
-    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    @command_guilds()
     async def nao(self, ctx: commands.Context):
         try:
             gif_url = await self.fetch_gif("no")
@@ -254,15 +253,17 @@ class Fun(commands.Cog):
             await ctx.send("❌ O universo não conseguiu decidir (não).")
 
     @commands.hybrid_command(name="owen_wilson")
-    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    @command_guilds()
     async def owen_wilson(self, ctx: commands.Context):
         url = "https://owen-wilson-wow-api.onrender.com/wows/random"
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as resp:
-                if resp.status != 200:
-                    return await ctx.send("Failed to fetch a wow 😢")
-                data = await resp.json()
-        
+        try:
+            resp = await self.bot.http_client.fetch(url, hedge=True)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return await ctx.send("Failed to fetch a wow 😢")
+        if resp.status != 200:
+            return await ctx.send("Failed to fetch a wow 😢")
+        data = resp.body
+
         if not data or len(data) == 0:
             return await ctx.send("No wow found 😢")
 
@@ -282,16 +283,18 @@ class Fun(commands.Cog):
         await ctx.send(embed=embed)
         
     @app_commands.command(name="shrek", description="Get a random Shrek quote")
-    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    @command_guilds()
     async def shrek(self, interaction: discord.Interaction):
         url = "https://shrekofficial.com/quotes/random"
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as resp:
-                if resp.status != 200:
-                    await interaction.response.send_message("Failed to fetch a Shrek quote 😢", ephemeral=True)
-                    return
-                text = await resp.text()
-        
+        try:
+            resp = await self.bot.http_client.fetch(url, read="text")
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            resp = None
+        if resp is None or resp.status != 200:
+            await interaction.response.send_message("Failed to fetch a Shrek quote 😢", ephemeral=True)
+            return
+        text = resp.body
+
         # Format the text in a code block to preserve line breaks
         embed = discord.Embed(
             title="🟢 Random Shrek Quote",
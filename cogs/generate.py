@@ -1,18 +1,14 @@
-import discord
 from discord.ext import commands
-from discord import app_commands
 import aiohttp
 import os
 import glob
-from config import GUILD_ID
+from utils.scope import command_guilds
 
 class CogGenerator(commands.Cog):
     """Cria novos cogs automaticamente usando AI local, replicando o estilo do bot."""
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        if not hasattr(bot, "session"):
-            bot.session = aiohttp.ClientSession()
 
         # Pasta dos cogs
         self.cogs_folder = "cogs"
@@ -30,7 +26,7 @@ class CogGenerator(commands.Cog):
         name="create_cog",
         description="Cria um cog automaticamente replicando a estrutura atual"
     )
-    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    @command_guilds()
     async def create_cog(self, ctx: commands.Context, *, description: str):
         await ctx.defer()
 
@@ -53,19 +49,21 @@ class CogGenerator(commands.Cog):
           - Make it ready to save as a .py file.
           """
         # Chamada à AI local
-        async with self.bot.session.post(
+        resp = await self.bot.http_client.fetch(
             "http://localhost:11434/api/generate",
+            method="POST",
             json={
                 "prompt": prompt,
                 "model": "qwen3:8b",
                 "stream": False,
                 "options": {"temperature": 0.7}
-            }
-        ) as resp:
-            if resp.status != 200:
-                return await ctx.send(f"Erro AI: {resp.status}")
-            data = await resp.json()
-            code = data.get("response")
+            },
+            # gerar um cog inteiro num modelo local demora bem mais que o timeout por defeito
+            timeout=aiohttp.ClientTimeout(total=300),
+        )
+        if resp.status != 200:
+            return await ctx.send(f"Erro AI: {resp.status}")
+        code = resp.body.get("response")
 
         # Gera nome único
         filename = os.path.join(
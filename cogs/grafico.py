@@ -2,8 +2,7 @@ import io
 import aiohttp
 import discord
 from discord.ext import commands
-from discord import app_commands
-from config import GUILD_ID
+from utils.scope import command_guilds
 
 class Grafico(commands.Cog):
     """Gera gráficos custom via QuickChart"""
@@ -14,19 +13,18 @@ class Grafico(commands.Cog):
     async def fetch_chart(self, chart_config: str) -> bytes:
         """Recebe o chart config (JSON-like) e retorna PNG"""
         url = f"https://quickchart.io/chart?c={chart_config}"
-        async with aiohttp.ClientSession(
-            timeout=aiohttp.ClientTimeout(total=10)
-        ) as session:
-            async with session.get(url) as resp:
-                if resp.status != 200:
-                    raise RuntimeError("QuickChart API falhou")
-                return await resp.read()
+        resp = await self.bot.http_client.fetch(
+            url, read="bytes", timeout=aiohttp.ClientTimeout(total=10)
+        )
+        if resp.status != 200:
+            raise RuntimeError("QuickChart API falhou")
+        return resp.body
 
     @commands.hybrid_command(
         name="grafico",
         description="Gera um gráfico custom: /grafico tipo=bar labels=2019,2020 valores=10,20"
     )
-    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    @command_guilds()
     async def grafico(
         self,
         ctx: commands.Context,
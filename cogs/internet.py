@@ -1,9 +1,12 @@
+import datetime
+from io import BytesIO
+
 import aiohttp
 
 import discord
 from discord.ext import commands
 from discord import app_commands
-from config import GUILD_ID
+from utils.scope import command_guilds
 
 XKCD_LATEST_API = "https://xkcd.com/info.0.json"
 
@@ -15,19 +18,18 @@ class Internet(commands.Cog):
         self.bot = bot
 
     async def fetch_latest_comic(self) -> dict:
-        async with aiohttp.ClientSession(
-            timeout=aiohttp.ClientTimeout(total=5)
-        ) as session:
-            async with session.get(XKCD_LATEST_API) as resp:
-                if resp.status != 200:
-                    raise RuntimeError("XKCD API falhou")
-                return await resp.json()
+        resp = await self.bot.http_client.fetch(
+            XKCD_LATEST_API, timeout=aiohttp.ClientTimeout(total=5)
+        )
+        if resp.status != 200:
+            raise RuntimeError("XKCD API falhou")
+        return resp.body
 
     @commands.hybrid_command(
         name="xkcd",
         description="Mostra o comic diário do XKCD"
     )
-    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    @command_guilds()
     async def xkcd(self, ctx: commands.Context):
         try:
             comic = await self.fetch_latest_comic()
@@ -54,7 +56,7 @@ class Internet(commands.Cog):
         name="ss",
         description="Tira uma screenshot de um website"
     )
-    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    @command_guilds()
     async def ss(self, interaction: discord.Interaction, website: str):
         """Envia a screenshot de um website"""
         await interaction.response.defer()
@@ -68,13 +70,12 @@ class Internet(commands.Cog):
         try:
             # Fetch image from thum.io
             headers = {"User-Agent": "DebocheBot/1.0.0"}
-            async with self.bot.session.get(url, headers=headers) as r:
-                if r.status != 200:
-                    body = await r.text()
-                    return await interaction.followup.send(
-                        f"❌ Erro ao gerar screenshot (HTTP {r.status}):\n{body[:500]}"
-                    )
-                image_data = await r.read()
+            r = await self.bot.http_client.fetch(url, read="bytes", headers=headers)
+            if r.status != 200:
+                return await interaction.followup.send(
+                    f"❌ Erro ao gerar screenshot (HTTP {r.status}):\n{r.body[:500]}"
+                )
+            image_data = r.body
 
             # Send image as attachment
             file = discord.File(BytesIO(image_data), filename="screenshot.png")
@@ -95,18 +96,18 @@ class Internet(commands.Cog):
         description="Cria um paste no Hastebin com o texto fornecido."
     )
     @app_commands.describe(texto="O texto que queres colar no Hastebin")
-    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    @command_guilds()
     @app_commands.checks.cooldown(1, 15.0)  # 1 utilização a cada 15s por utilizador
     async def hastebin(self, interaction: discord.Interaction, texto: str):
         await interaction.response.defer(thinking=True)
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post("https://hastebin.com/documents", data=texto.encode("utf-8")) as resp:
-                if resp.status != 200:
-                    return await interaction.followup.send(f"❌ Erro ao contactar o Hastebin (HTTP {resp.status})")
+        resp = await self.bot.http_client.fetch(
+            "https://hastebin.com/documents", method="POST", data=texto.encode("utf-8")
+        )
+        if resp.status != 200:
+            return await interaction.followup.send(f"❌ Erro ao contactar o Hastebin (HTTP {resp.status})")
 
-                data = await resp.json()
-                url = f"https://hastebin.com/{data['key']}"
+        url = f"https://hastebin.com/{resp.body['key']}"
 
         embed = discord.Embed(
             title="📌 Paste criado com sucesso!",
@@ -122,7 +123,7 @@ class Internet(commands.Cog):
         name="pokedex",
         description="Mostra informações sobre um Pokémon"
     )
-    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    @command_guilds()
     async def pokedex(self, interaction: discord.Interaction, pokemon: str):
         """Mostra informações de um Pokémon da PokeAPI"""
         await interaction.response.defer()
@@ -131,11 +132,11 @@ class Internet(commands.Cog):
         url = f"https://pokeapi.co/api/v2/pokemon/{pokemon}"
 
         try:
-            async with self.bot.session.get(url) as r:
-                if r.status == 404:
-                    await interaction.followup.send(f"❌ Pokémon '{pokemon}' não encontrado.")
-                    return
-                data = await r.json()
+            r = await self.bot.http_client.fetch(url)
+            if r.status == 404:
+                await interaction.followup.send(f"❌ Pokémon '{pokemon}' não encontrado.")
+                return
+            data = r.body
 
             # Informações básicas
             nome = data["name"].capitalize()
@@ -1,10 +1,8 @@
 import discord
 from discord.ext import commands
-from discord import app_commands
 from discord.ext.commands import Context
-import aiohttp
 from datetime import datetime
-from config import GUILD_ID
+from utils.scope import command_guilds
 from paginator import EmbedPaginator
 
 
@@ -50,14 +48,14 @@ class IPMA(commands.Cog):
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        if not hasattr(bot, "session"):
-            self.bot.session = aiohttp.ClientSession()
-            
 
     async def fetch_areas(self) -> dict:
         """Retorna um mapa idAreaAviso -> Local"""
-        async with self.bot.session.get(IPMA_AREAS_URL, ssl=False) as r:
-            data = await r.json()
+        # lista estática de áreas: basta ir buscá-la uma vez por dia
+        r = await self.bot.http_client.fetch(
+            IPMA_AREAS_URL, ssl=False, cache_ttl=24 * 3600, stale_ttl=7 * 24 * 3600, coalesce=True
+        )
+        data = r.body
 
         return {
             item["idAreaAviso"]: item["local"]
@@ -68,15 +66,15 @@ class IPMA(commands.Cog):
         name="ipma",
         description="Mostra avisos meteorológicos ativos do IPMA"
     )
-    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    @command_guilds()
     async def ipma(self, ctx: Context):
         await ctx.defer()
 
         try:
-            async with self.bot.session.get(IPMA_WARNINGS_URL, ssl=False) as r:
-                if r.status != 200:
-                    raise Exception("Erro ao contactar IPMA")
-                warnings = await r.json()
+            r = await self.bot.http_client.fetch(IPMA_WARNINGS_URL, ssl=False, coalesce=True)
+            if r.status != 200:
+                raise Exception("Erro ao contactar IPMA")
+            warnings = r.body
 
             areas = await self.fetch_areas()
 
@@ -1,10 +1,11 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import asyncio, random, aiohttp
+import asyncio, random
+import aiohttp
 from dataclasses import dataclass
 from typing import List, Optional
-from config import GUILD_ID
+from utils.scope import command_guilds
 
 # -------------------- Game Data --------------------
 
@@ -105,9 +106,8 @@ class JokerCog(commands.Cog):
 
     async def fetch_question(self, em_portugues: bool) -> Question:
         url = "https://the-trivia-api.com/v2/questions/"
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as resp:
-                data = await resp.json()
+        resp = await self.bot.http_client.fetch(url)
+        data = resp.body
 
         q = Question.from_api(data[0])
 
@@ -121,17 +121,18 @@ class JokerCog(commands.Cog):
     async def translate(self, text: str) -> str:
         """Use LibreTranslate to translate"""
         url = "https://api.mymemory.translated.net/get?q="+text+"&langpair=en|pt"
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as resp:
-                if resp.status == 200:
-                    data = await resp.json()
-                    return data.get("translatedText", text)
+        try:
+            resp = await self.bot.http_client.fetch(url)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return text  # sem tradução, o jogo continua em inglês
+        if resp.status == 200:
+            return resp.body.get("translatedText", text)
         return text
 
     # -------------------- Commands --------------------
 
     @app_commands.command(name="joker", description="Inicia o jogo JOKER")
-    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    @command_guilds()
     async def start(self, interaction: discord.Interaction, em_portugues: bool = False):
         state = GameState(user_id=interaction.user.id, em_portugues=em_portugues)
         self.states[state.user_id] = state
@@ -157,7 +158,16 @@ class JokerCog(commands.Cog):
         )
 
     async def next_question(self, target, state: GameState):
-        q = await self.fetch_question(state.em_portugues)
+        try:
+            q = await self.fetch_question(state.em_portugues)
+        except (aiohttp.ClientError, asyncio.TimeoutError, KeyError, IndexError):
+            self.states.pop(state.user_id, None)
+            message = "❌ Não foi possível obter uma pergunta. Tenta outra vez daqui a pouco."
+            if isinstance(target, discord.Interaction):
+                await target.response.send_message(message, ephemeral=True)
+            else:
+                await target.send(message)
+            return
         state.active_question = q
         self.hidden_options[state.user_id] = []
 
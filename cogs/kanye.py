@@ -1,9 +1,8 @@
 import aiohttp
 
 import discord
-from discord import app_commands
 from discord.ext import commands
-from config import GUILD_ID
+from utils.scope import command_guilds
 KANYE_API = "https://api.kanye.rest/"
 
 
@@ -14,20 +13,18 @@ class KanyeSays(commands.Cog):
         self.bot = bot
 
     async def fetch_quote(self) -> str:
-        async with aiohttp.ClientSession(
-            timeout=aiohttp.ClientTimeout(total=5)
-        ) as session:
-            async with session.get(KANYE_API) as resp:
-                if resp.status != 200:
-                    raise RuntimeError("Kanye API falhou")
-                data = await resp.json()
-                return data["quote"]
+        resp = await self.bot.http_client.fetch(
+            KANYE_API, timeout=aiohttp.ClientTimeout(total=5), hedge=True
+        )
+        if resp.status != 200:
+            raise RuntimeError("Kanye API falhou")
+        return resp.body["quote"]
 
     @commands.hybrid_command(
         name="ye",
         description="Kanye says something profundamente Kanye"
     )
-    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    @command_guilds()
     async def kanye(self, ctx: commands.Context):
         try:
             quote = await self.fetch_quote()
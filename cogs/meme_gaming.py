@@ -2,10 +2,10 @@ import aiohttp
 import discord
 from discord import app_commands
 from discord.ext import commands
-from typing import Optional, Dict
+from typing import Dict
 
 MEME_API = "https://meme-api.com/gimme/gaming"
-from config import GUILD_ID
+from utils.scope import command_guilds
 
 
 # =========================
@@ -13,22 +13,14 @@ from config import GUILD_ID
 # =========================
 
 class MemeClient:
-    def __init__(self):
-        self.session: Optional[aiohttp.ClientSession] = None
-
-    async def start(self):
-        if not self.session:
-            self.session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=2))
-
-    async def close(self):
-        if self.session:
-            await self.session.close()
+    def __init__(self, http):
+        self.http = http
 
     async def random_meme(self) -> Dict:
-        async with self.session.get(MEME_API) as resp:
-            if resp.status != 200:
-                return {}
-            return await resp.json()
+        resp = await self.http.fetch(MEME_API, timeout=aiohttp.ClientTimeout(total=2))
+        if resp.status != 200:
+            return {}
+        return resp.body
 
 
 # =========================
@@ -54,19 +46,13 @@ def build_meme_embed(data: Dict) -> discord.Embed:
 class GamingMemes(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.client = MemeClient()
-
-    async def cog_load(self):
-        await self.client.start()
-
-    async def cog_unload(self):
-        await self.client.close()
+        self.client = MemeClient(bot.http_client)
 
     @app_commands.command(
         name="meme_gaming",
         description="Mostrar um meme aleatório de gaming 🕹️",
     )
-    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    @command_guilds()
     async def meme(self, interaction: discord.Interaction):
         await interaction.response.defer(thinking=True)
         data = await self.client.random_meme()
@@ -1,10 +1,9 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import yt_dlp
 import asyncio
 from typing import Optional
-from config import GUILD_ID
+from utils.scope import command_guilds
 
 
 YTDL_OPTIONS = {
@@ -24,6 +23,27 @@ FFMPEG_OPTIONS = {
 }
 
 
+def extract_audio(url: str, download: bool = False) -> dict:
+    """
+    Corre no pool de processos (utils/workers.py): devolve só o que o player
+    precisa, não o info dict inteiro do yt-dlp.
+    """
+    import yt_dlp  # já vem importado nos processos do pool
+
+    with yt_dlp.YoutubeDL(YTDL_OPTIONS) as ydl:
+        info = ydl.extract_info(url, download=download)
+        # playlists → pega cada entrada
+        if "entries" in info:
+            info = info["entries"][0]
+        return {
+            "url": info.get("url"),
+            "title": info.get("title"),
+            "webpage_url": info.get("webpage_url"),
+            "duration": info.get("duration"),
+            "filename": ydl.prepare_filename(info) if download else None,
+        }
+
+
 class YTDLSource(discord.PCMVolumeTransformer):
     """Wrapper que usa yt-dlp para criar um stream válido para FFmpeg"""
 
@@ -33,18 +53,8 @@ class YTDLSource(discord.PCMVolumeTransformer):
         self.title = data.get("title")
 
     @classmethod
-    async def from_url(cls, url, loop=None, stream=True):
-        loop = loop or asyncio.get_event_loop()
-
-        def extract():
-            with yt_dlp.YoutubeDL(YTDL_OPTIONS) as ydl:
-                return ydl.extract_info(url, download=not stream)
-
-        data = await loop.run_in_executor(None, extract)
-
-        # playlists → pega cada entrada
-        if "entries" in data:
-            data = data["entries"][0]
+    async def from_url(cls, url, *, workers, stream=True):
+        data = await workers.run("ytdlp", extract_audio, url, not stream)
 
         if stream:
             # yt-dlp fornece o stream diretamente → evita 403
@@ -57,8 +67,7 @@ class YTDLSource(discord.PCMVolumeTransformer):
                 data=data
             )
         else:
-            filename = ydl.prepare_filename(data)
-            return cls(discord.FFmpegPCMAudio(filename), data=data)
+            return cls(discord.FFmpegPCMAudio(data["filename"]), data=data)
 
 
 class Music(commands.Cog):
@@ -80,7 +89,7 @@ class Music(commands.Cog):
         song = await queue.get()
 
         # yt-dlp → create stream
-        player = await YTDLSource.from_url(song, loop=self.bot.loop, stream=True)
+        player = await YTDLSource.from_url(song, workers=self.bot.workers, stream=True)
 
         def after_playing(error):
             if error:
@@ -95,7 +104,7 @@ class Music(commands.Cog):
         self.guild_playing[guild_id] = True
 
     @app_commands.command(name="musica", description="Toca música ou playlist")
-    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    @command_guilds()
     async def musica(self, interaction: discord.Interaction, canal: discord.VoiceChannel, link: str):
 
         await interaction.response.defer()
@@ -119,7 +128,7 @@ class Music(commands.Cog):
 
     # CONTROLES
     @app_commands.command(name="pause")
-    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    @command_guilds()
     async def pause(self, interaction: discord.Interaction):
         vc = interaction.guild.voice_client
         if vc and vc.is_playing():
@@ -129,7 +138,7 @@ class Music(commands.Cog):
             await interaction.response.send_message("❌ Nada está tocando.", ephemeral=True)
 
     @app_commands.command(name="resume")
-    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    @command_guilds()
     async def resume(self, interaction: discord.Interaction):
         vc = interaction.guild.voice_client
         if vc and vc.is_paused():
@@ -139,7 +148,7 @@ class Music(commands.Cog):
             await interaction.response.send_message("❌ Não está pausado.", ephemeral=True)
 
     @app_commands.command(name="stop")
-    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    @command_guilds()
     async def stop(self, interaction: discord.Interaction):
         vc = interaction.guild.voice_client
         queue = self.guild_queues.get(interaction.guild.id)
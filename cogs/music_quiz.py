@@ -1,12 +1,35 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import yt_dlp
 import asyncio
 from typing import Optional
-from config import GUILD_ID
+from utils.scope import command_guilds
 import random
 
+QUIZ_YTDL_OPTIONS = {
+    "format": "bestaudio/best",
+    "quiet": True,
+    "extract_flat": True,
+}
+
+
+def extract_entries(urls: list[str]) -> list[dict]:
+    """Corre no pool de processos (utils/workers.py)."""
+    import yt_dlp  # já vem importado nos processos do pool
+
+    entries = []
+    with yt_dlp.YoutubeDL(QUIZ_YTDL_OPTIONS) as ydl:
+        for url in urls:
+            info = ydl.extract_info(url, download=False)
+            if "entries" in info:  # playlist
+                for e in info["entries"]:
+                    full_info = ydl.extract_info(e["url"], download=False)
+                    entries.append({"url": full_info["url"], "title": full_info["title"]})
+            else:
+                entries.append({"url": info["url"], "title": info["title"]})
+    return entries
+
+
 class MusicQuiz(commands.Cog):
     """Cog de quiz de música usando YouTube"""
 
@@ -18,28 +41,8 @@ class MusicQuiz(commands.Cog):
 
     async def get_yt_info(self, urls: list[str]) -> list[dict]:
         """Retorna lista de dicionários com 'url' e 'title'"""
-        ydl_opts = {
-            "format": "bestaudio/best",
-            "quiet": True,
-            "extract_flat": True,
-        }
-
-        loop = asyncio.get_event_loop()
-
-        def _extract():
-            entries = []
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                for url in urls:
-                    info = ydl.extract_info(url, download=False)
-                    if "entries" in info:  # playlist
-                        for e in info["entries"]:
-                            full_info = ydl.extract_info(e["url"], download=False)
-                            entries.append({"url": full_info["url"], "title": full_info["title"]})
-                    else:
-                        entries.append({"url": info["url"], "title": info["title"]})
-            return entries
-
-        return await loop.run_in_executor(None, _extract)
+        # uma playlist faz um extract_info por música: mais tempo que o limite por defeito
+        return await self.bot.workers.run("ytdlp", extract_entries, urls, timeout=300)
 
     async def play_quiz(self, guild_id: int, vc: discord.VoiceClient):
         """Toca a próxima música do quiz"""
@@ -75,7 +78,7 @@ class MusicQuiz(commands.Cog):
         canal="Canal de voz onde tocar",
         urls="Links do YouTube separados por espaço"
     )
-    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    @command_guilds()
     async def music_quiz(self, interaction: discord.Interaction, canal: discord.VoiceChannel, urls: str):
         await interaction.response.defer(thinking=True)
         url_list = urls.split()
@@ -1,11 +1,9 @@
-import os
 import discord
 from discord.ext import commands
 from discord import app_commands
-from bs4 import BeautifulSoup
 from datetime import datetime
-from playwright.async_api import async_playwright
 from discord.ext import commands
+from utils.scope import command_guilds
 
 # Mapear categorias para os seus URLs
 CATEGORIES = {
@@ -19,6 +17,34 @@ CATEGORIES = {
 }
 
 
+def parse_news(html: str, n_resultados: int) -> list[dict]:
+    """Corre no pool de processos (utils/workers.py): extrai as notícias do HTML."""
+    from bs4 import BeautifulSoup  # já vem importado nos processos do pool
+
+    soup = BeautifulSoup(html, "html.parser")
+
+    # Encontrar blocos de notícias
+    blocks = soup.select("div.newList, div.new")  # classe usada pelo site
+    noticias = []
+    for block in blocks[:n_resultados]:
+        title_tag = block.select_one(".title h1")
+        lead_tag = block.select_one(".lead h2, .body")
+        link_tag = block.select_one("a[href]")
+        date_tag = block.select_one("input[datetime]")
+
+        link = link_tag["href"] if link_tag else "#"
+        if not link.startswith("http"):
+            link = "https://omirante.pt" + link
+
+        noticias.append({
+            "title": title_tag.get_text(strip=True) if title_tag else "Sem título",
+            "lead": lead_tag.get_text(strip=True) if lead_tag else "",
+            "link": link,
+            "datetime": date_tag.get("datetime") if date_tag else "",
+        })
+    return noticias
+
+
 class News(commands.Cog):
     """Comando para buscar notícias do O Mirante."""
 
@@ -33,7 +59,7 @@ class News(commands.Cog):
         n_resultados="Número de notícias a mostrar (1 a 10, default 5).",
         categoria="Categoria: opiniao, cultura-e-lazer, desporto, economia, politica, sociedade, ultimas"
     )
-    @app_commands.guilds(discord.Object(id=int(os.getenv("GUILD_ID"))))
+    @command_guilds()
     async def mirante(
         self,
         interaction: discord.Interaction,
@@ -48,6 +74,9 @@ class News(commands.Cog):
         n_resultados = max(1, min(n_resultados, 10))
 
         try:
+            # Playwright é pesado: só é importado no primeiro /mirante
+            from playwright.async_api import async_playwright
+
             # Iniciar Playwright
             async with async_playwright() as p:
                 browser = await p.chromium.launch(headless=True)
@@ -56,28 +85,14 @@ class News(commands.Cog):
                 html = await page.content()
                 await browser.close()
 
-            # Parse HTML com BeautifulSoup
-            soup = BeautifulSoup(html, "html.parser")
-
-            # Encontrar blocos de notícias
-            blocks = soup.select("div.newList, div.new")  # classe usada pelo site
+            # Parse HTML com BeautifulSoup no pool de processos (é lento e segura o GIL)
+            blocks = await self.bot.workers.run("html", parse_news, html, n_resultados)
             if not blocks:
                 return await interaction.followup.send("⚠️ Nenhuma notícia encontrada.")
 
             noticias = []
-            for block in blocks[:n_resultados]:
-                title_tag = block.select_one(".title h1")
-                lead_tag = block.select_one(".lead h2, .body")
-                link_tag = block.select_one("a[href]")
-                date_tag = block.select_one("input[datetime]")
-
-                titulo = title_tag.get_text(strip=True) if title_tag else "Sem título"
-                desc = lead_tag.get_text(strip=True) if lead_tag else ""
-                link = link_tag["href"] if link_tag else "#"
-                if not link.startswith("http"):
-                    link = "https://omirante.pt" + link
-
-                data_pub = date_tag.get("datetime") if date_tag else ""
+            for block in blocks:
+                titulo, desc, link, data_pub = block["title"], block["lead"], block["link"], block["datetime"]
                 try:
                     data_fmt = (
                         datetime.fromisoformat(data_pub)
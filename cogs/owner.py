@@ -0,0 +1,309 @@
+import asyncio
+import io
+import os
+import time
+from typing import Literal
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+from discord.ext.commands import Context
+
+from utils.scope import command_guilds
+from utils.profiler import SamplingProfiler
+
+
+class Owner(commands.Cog, name="owner"):
+    """Comandos de diagnóstico, só para o dono do bot."""
+
+    def __init__(self, bot) -> None:
+        self.bot = bot
+        self.sampler = SamplingProfiler()
+
+    def cog_unload(self) -> None:
+        if self.sampler.running:
+            self.sampler.stop()
+
+    @commands.hybrid_command(
+        name="cache",
+        description="Mostra as estatísticas da cache HTTP (hits/misses por endpoint).",
+    )
+    @app_commands.describe(limpar="Esvaziar a cache depois de mostrar as estatísticas")
+    @command_guilds()
+    @commands.is_owner()
+    async def cache(self, context: Context, limpar: bool = False) -> None:
+        cache = self.bot.http_client.cache
+        stats = sorted(
+            cache.stats.items(),
+            key=lambda item: item[1].hits + item[1].stale_hits + item[1].misses,
+            reverse=True,
+        )
+
+        lines = [
+            f"`{endpoint}` — ✅ {s.hits} · ♻️ {s.stale_hits} · ❌ {s.misses} ({s.ratio:.0%})"
+            for endpoint, s in stats
+        ]
+        embed = discord.Embed(
+            title="Cache HTTP",
+            description="\n".join(lines)[:4000] or "Ainda sem pedidos em cache.",
+            color=0xBEBEFE,
+        )
+        embed.set_footer(
+            text=f"{len(cache)}/{cache.max_entries} entradas · ✅ hit · ♻️ stale · ❌ miss"
+        )
+
+        flights = sorted(
+            self.bot.http_client.flights.stats.items(), key=lambda item: item[1].coalesced, reverse=True
+        )
+        coalesced = [f"`{label}` — {s.coalesced}/{s.leaders + s.coalesced}" for label, s in flights if s.coalesced]
+        if coalesced:
+            embed.add_field(name="Pedidos agrupados", value="\n".join(coalesced[:10])[:1024], inline=False)
+
+        if limpar:
+            cache.clear()
+            embed.add_field(name="Limpeza", value="Cache esvaziada.")
+
+        await context.send(embed=embed, ephemeral=True)
+
+    @commands.hybrid_command(
+        name="metricas",
+        description="Latência (p50/p95/p99) e erros dos comandos mais lentos e dos serviços externos.",
+    )
+    @app_commands.describe(top="Quantos comandos/hosts mostrar")
+    @command_guilds()
+    @commands.is_owner()
+    async def metricas(self, context: Context, top: int = 10) -> None:
+        commands_metrics = self.bot.command_metrics
+        errors = {}
+        for (cog, command, source, _), count in commands_metrics.errors.values.items():
+            errors[(cog, command, source)] = errors.get((cog, command, source), 0) + count
+
+        rows = []
+        for labels, series in commands_metrics.duration.series.items():
+            p50, p95, p99 = series.quantiles(0.5, 0.95, 0.99)
+            rows.append((p95, labels, series.count, p50, p99))
+        rows.sort(reverse=True)
+
+        lines = [
+            f"`{cog}/{command}` ({source}) — {count}× · {p50 * 1000:.0f}/{p95 * 1000:.0f}/{p99 * 1000:.0f} ms"
+            + (f" · ⚠️ {errors[(cog, command, source)]}" if errors.get((cog, command, source)) else "")
+            for p95, (cog, command, source), count, p50, p99 in rows[:top]
+        ]
+        embed = discord.Embed(
+            title="Métricas",
+            description="\n".join(lines)[:4000] or "Ainda sem comandos medidos.",
+            color=0xBEBEFE,
+        )
+
+        upstream = getattr(self.bot.http_client, "upstream_duration", None)
+        if upstream is not None:
+            hosts = {}
+            for (host, _), series in upstream.series.items():
+                hosts.setdefault(host, []).append(series)
+            host_rows = []
+            for host, all_series in hosts.items():
+                samples = sorted(v for series in all_series for v in series.window)
+                p95 = samples[min(len(samples) - 1, int(0.95 * len(samples)))] if samples else 0.0
+                host_rows.append((p95, host, sum(series.count for series in all_series)))
+            host_rows.sort(reverse=True)
+            breakers = self.bot.http_client.breakers
+            circuit = {"open": " · 🔴 circuito aberto", "half_open": " · 🟡 a testar"}
+            value = "\n".join(
+                f"`{host}` — {count}× · p95 {p95 * 1000:.0f} ms"
+                + (circuit.get(breakers[host].state, "") if host in breakers else "")
+                for p95, host, count in host_rows[:top]
+            )
+            embed.add_field(name="Serviços externos", value=value[:1024] or "Sem pedidos.", inline=False)
+
+        running = commands_metrics.running()
+        embed.set_footer(text=f"p50/p95/p99 das últimas amostras · ⚠️ erros · {len(running)} comando(s) a correr")
+        await context.send(embed=embed, ephemeral=True)
+
+    @commands.hybrid_command(
+        name="profiler",
+        description="Corre o profiler por amostragem durante N segundos e envia o flamegraph (collapsed).",
+    )
+    @app_commands.describe(segundos="Duração da amostragem (1-120)", top="Quantas funções mostrar na tabela")
+    @command_guilds()
+    @commands.is_owner()
+    async def profiler(self, context: Context, segundos: int = 10, top: int = 15) -> None:
+        if self.sampler.running:
+            await context.send("Já está a correr um perfil.", ephemeral=True)
+            return
+
+        segundos = max(1, min(segundos, 120))
+        await context.defer(ephemeral=True)
+        self.sampler.start()
+        try:
+            await asyncio.sleep(segundos)
+        finally:
+            self.sampler.stop()
+
+        profiler = self.sampler
+        rows = profiler.top(top)
+        width = max((len(frame) for frame, _, _ in rows), default=0)
+        table = "\n".join(
+            f"{frame[:60]:<{min(width, 60)}} {own / max(profiler.samples, 1):6.1%} {total / max(profiler.samples, 1):6.1%}"
+            for frame, own, total in rows
+        )
+        embed = discord.Embed(
+            title=f"Perfil ({profiler.elapsed:.1f}s, {profiler.samples} amostras)",
+            description=f"```\n{'função':<{min(width, 60)}}  próprio  total\n{table}\n```"[:4000]
+            if rows
+            else "Sem amostras.",
+            color=0xBEBEFE,
+        )
+        embed.set_footer(text="% das amostras · abrir o ficheiro em speedscope.app ou flamegraph.pl")
+        file = discord.File(
+            io.BytesIO(profiler.collapsed().encode("utf-8")),
+            filename=f"perfil-{int(time.time())}.folded",
+        )
+        await context.send(embed=embed, file=file, ephemeral=True)
+
+    @commands.hybrid_command(
+        name="bloqueios",
+        description="Sítios do código que mais bloquearam o event loop (e os comandos a correr).",
+    )
+    @app_commands.describe(top="Quantos mostrar")
+    @command_guilds()
+    @commands.is_owner()
+    async def bloqueios(self, context: Context, top: int = 10) -> None:
+        watchdog = self.bot.loop_watchdog
+        embed = discord.Embed(title="Bloqueios do event loop", color=0xBEBEFE)
+        offenders = watchdog.worst(top)
+        if not offenders:
+            embed.description = f"Nenhum bloqueio acima de {watchdog.threshold * 1000:.0f} ms até agora."
+        for offender in offenders[:25]:
+            commands_running = ", ".join(f"{name} ({count}×)" for name, count in offender.commands.most_common(3))
+            embed.add_field(
+                name=f"{offender.where}"[:256],
+                value=(
+                    f"{offender.count}× · total {offender.total:.2f}s · máx {offender.max * 1000:.0f} ms\n"
+                    f"{commands_running or 'sem comandos a correr'}\n"
+                    f"```\n" + "\n".join(offender.stack[-4:])[-800:] + "\n```"
+                )[:1024],
+                inline=False,
+            )
+        series = watchdog.lag.series.get(())
+        if series is not None:
+            p50, p99 = series.quantiles(0.5, 0.99)
+            embed.set_footer(
+                text=f"lag p50 {p50 * 1000:.1f} ms · p99 {p99 * 1000:.1f} ms · máx {watchdog.max_lag * 1000:.0f} ms"
+            )
+        await context.send(embed=embed, ephemeral=True)
+
+    @commands.hybrid_command(
+        name="totais",
+        description="Confere os totais por comando do /stats com o command_usage e refá-los se preciso.",
+    )
+    @app_commands.describe(reconstruir="Refazer os totais a partir do command_usage")
+    @command_guilds()
+    @commands.is_owner()
+    async def totais(self, context: Context, reconstruir: bool = False) -> None:
+        await context.defer(ephemeral=True)
+        database = self.bot.database
+        started = time.perf_counter()
+        differences = await database.check_command_totals()
+        elapsed = time.perf_counter() - started
+
+        lines = [
+            f"`{command_name}` — guardado {stored} · esperado {expected}"
+            for command_name, expected, stored in differences[:30]
+        ]
+        embed = discord.Embed(
+            title="Totais por comando",
+            description="\n".join(lines)[:4000] or "Os totais batem certo com o command_usage.",
+            color=0xBEBEFE if not differences else 0xE02B2B,
+        )
+        if reconstruir:
+            count = await database.rebuild_command_totals()
+            embed.add_field(name="Reconstrução", value=f"{count} comando(s) recalculados.")
+        embed.set_footer(text=f"{len(differences)} diferença(s) · verificação em {elapsed * 1000:.0f} ms")
+        await context.send(embed=embed, ephemeral=True)
+
+    @commands.hybrid_command(
+        name="backup",
+        description="Faz agora uma cópia de segurança da base de dados e mostra as que existem.",
+    )
+    @command_guilds()
+    @commands.is_owner()
+    async def backup(self, context: Context) -> None:
+        backups = self.bot.backups
+        if backups.running:
+            await context.send("Já está a correr uma cópia de segurança.", ephemeral=True)
+            return
+
+        await context.defer(ephemeral=True)
+        try:
+            result = await backups.run()
+        except Exception as e:
+            embed = discord.Embed(title="Cópia de segurança falhou", description=str(e)[:4000], color=0xE02B2B)
+            await context.send(embed=embed, ephemeral=True)
+            return
+
+        embed = discord.Embed(
+            title="Cópia de segurança",
+            description=(
+                f"`{os.path.basename(result.path)}`\n"
+                f"{result.pages} páginas · {result.size_bytes / 2**20:.1f} MiB → "
+                f"{result.compressed_bytes / 2**20:.1f} MiB em {result.seconds:.2f}s"
+            ),
+            color=0xBEBEFE,
+        )
+        existing = backups.backups()
+        embed.add_field(
+            name=f"Guardadas ({len(existing)})",
+            value="\n".join(
+                f"`{os.path.basename(path)}` — {os.path.getsize(path) / 2**20:.1f} MiB" for path in existing[-10:]
+            )[:1024],
+            inline=False,
+        )
+        if result.removed:
+            embed.add_field(name="Apagadas pela retenção", value=str(len(result.removed)))
+        await context.send(embed=embed, ephemeral=True)
+
+    @commands.hybrid_command(
+        name="sql",
+        description="Instruções SQL com mais tempo gasto (ou mais lentas), com o plano das lentas.",
+    )
+    @app_commands.describe(
+        top="Quantas instruções mostrar",
+        ordem="total = tempo somado · max = pior execução · slow = vezes acima do limite",
+        limpar="Esvaziar as estatísticas depois de mostrar",
+    )
+    @command_guilds()
+    @commands.is_owner()
+    async def sql(
+        self, context: Context, top: int = 10, ordem: Literal["total", "max", "slow"] = "total", limpar: bool = False
+    ) -> None:
+        query_log = self.bot.database.storage.query_log
+        if query_log is None:
+            await context.send("O registo de SQL está desligado (DB_QUERY_LOG=0).", ephemeral=True)
+            return
+
+        embed = discord.Embed(title=f"SQL por {ordem}", color=0xBEBEFE)
+        statements = query_log.top(min(max(top, 1), 25), by=ordem)
+        if not statements:
+            embed.description = "Ainda sem instruções medidas."
+        for statement, stats in statements:
+            p50, p95 = stats.quantiles(0.5, 0.95)
+            value = (
+                f"{stats.count}× · total {stats.total:.2f}s · p50 {p50 * 1000:.1f} ms · p95 {p95 * 1000:.1f} ms · "
+                f"máx {stats.max * 1000:.0f} ms"
+                + (f" · 🐢 {stats.slow}" if stats.slow else "")
+            )
+            if stats.plan:
+                value += "\n```\n" + "\n".join(stats.plan)[:600] + "\n```"
+            embed.add_field(name=statement[:256], value=value[:1024], inline=False)
+        embed.set_footer(
+            text=f"🐢 acima de {query_log.threshold * 1000:.0f} ms · {len(query_log.recent)} lenta(s) recentes "
+            f"· {len(query_log.statements)} instruções distintas"
+        )
+
+        if limpar:
+            query_log.clear()
+        await context.send(embed=embed, ephemeral=True)
+
+
+async def setup(bot) -> None:
+    await bot.add_cog(Owner(bot))
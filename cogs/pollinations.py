@@ -5,7 +5,7 @@ from discord import app_commands
 import aiohttp
 import urllib.parse
 from config import POLLINATIONS_API_KEY
-from config import GUILD_ID
+from utils.scope import command_guilds
 
 
 POLLINATIONS_BASE_URL = "https://gen.pollinations.ai/image"
@@ -21,11 +21,6 @@ class Pollinations(commands.Cog):
         if not self.api_key:
             raise RuntimeError("❌ POLLINATIONS_API_KEY não definido no ambiente")
 
-        self.session = aiohttp.ClientSession()
-
-    async def cog_unload(self):
-        await self.session.close()
-
     @app_commands.command(
         name="bob_ross",
         description="Gera uma imagem com IA (Pollinations)"
@@ -33,7 +28,7 @@ class Pollinations(commands.Cog):
     @app_commands.describe(
         prompt="Descrição da imagem a gerar"
     )
-    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    @command_guilds()
     async def image(self, interaction: discord.Interaction, prompt: str):
         await interaction.response.defer()
 
@@ -48,7 +43,10 @@ class Pollinations(commands.Cog):
 
         try:
             # Apenas para validar se a imagem é acessível
-            async with self.session.get(image_url, headers=headers) as r:
+            # a geração da imagem pode demorar bem mais que o timeout por defeito
+            async with self.bot.http_client.get(
+                image_url, headers=headers, timeout=aiohttp.ClientTimeout(total=120)
+            ) as r:
                 if r.status != 200:
                     raise Exception(f"Pollinations retornou {r.status}")
 
@@ -6,9 +6,8 @@ import random
 import json
 from datetime import datetime, timedelta
 from typing import Optional
-import xml.etree.ElementTree as ET
 
-from config import GUILD_ID
+from utils.scope import command_guilds
 
 # --------------------------
 # Todos os concelhos de Portugal
@@ -26,8 +25,6 @@ class Portugal(commands.Cog):
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        if not hasattr(bot, "session"):
-            self.bot.session = aiohttp.ClientSession()
 
     # --------------------------
     # Concelhos
@@ -36,7 +33,7 @@ class Portugal(commands.Cog):
         name="concelho",
         description="Lista todos os concelhos de Portugal"
     )
-    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    @command_guilds()
     async def concelho(self, interaction: discord.Interaction):
         """Retorna todos os concelhos de Portugal organizados por distrito"""
         await interaction.response.defer()
@@ -56,7 +53,7 @@ class Portugal(commands.Cog):
         name="fogos",
         description="Lista todos os fogos ativos em Portugal"
     )
-    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    @command_guilds()
     async def fogos(self, interaction: discord.Interaction):
         """Mostra fogos ativos em Portugal"""
         await interaction.response.defer()
@@ -64,11 +61,10 @@ class Portugal(commands.Cog):
         headers = {"User-Agent": "DebocheBot/1.0.0"}
 
         try:
-            async with self.bot.session.get(url, headers=headers) as resp:
-                if resp.status != 200:
-                    body = await resp.text()
-                    return await interaction.followup.send(f"❌ Erro ao buscar fogos (HTTP {resp.status}):\n{body[:500]}")
-                data = await resp.json()
+            resp = await self.bot.http_client.fetch(url, headers=headers, coalesce=True)
+            if resp.status != 200:
+                return await interaction.followup.send(f"❌ Erro ao buscar fogos (HTTP {resp.status}):\n{resp.body[:500]}")
+            data = resp.body
 
             fires = data.get("data", [])
             if not fires:
@@ -107,17 +103,21 @@ class Portugal(commands.Cog):
         name="feriados",
         description="Mostra todos os feriados de Portugal para o ano atual"
     )
-    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    @command_guilds()
     async def feriados(self, interaction: discord.Interaction):
         await interaction.response.defer()
         year = datetime.now().year
         url = f"https://services.sapo.pt/Holiday/GetAllHolidays?year={year}"
 
         try:
-            async with self.bot.session.get(url) as resp:
-                if resp.status != 200:
-                    return await interaction.followup.send(f"❌ Erro ao buscar feriados (HTTP {resp.status})")
-                text = await resp.text()
+            resp = await self.bot.http_client.fetch(
+                url, read="text", cache_ttl=24 * 3600, stale_ttl=7 * 24 * 3600, coalesce=True
+            )
+            if resp.status != 200:
+                return await interaction.followup.send(f"❌ Erro ao buscar feriados (HTTP {resp.status})")
+            text = resp.body
+
+            import xml.etree.ElementTree as ET  # só é preciso no /feriados
 
             root = ET.fromstring(text)
             holidays = [
@@ -147,17 +147,18 @@ class Portugal(commands.Cog):
         description="Mostra os próximos jogos da Primeira Liga (TheSportsDB)."
     )
     @app_commands.describe(limite="Número máximo de jogos a mostrar (1-10).")
-    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    @command_guilds()
     async def futebol(self, interaction: discord.Interaction, limite: int = 5):
         await interaction.response.defer(thinking=True)
         limite = max(1, min(limite, 10))
         url = "https://www.thesportsdb.com/api/v1/json/123/eventsseason.php?id=4344&s=2025-2026"
 
         try:
-            async with self.bot.session.get(url) as resp:
-                if resp.status != 200:
-                    return await interaction.followup.send(f"❌ Falha ao aceder à API (HTTP {resp.status}).")
-                payload = await resp.json()
+            # a época inteira: muda pouco entre chamadas
+            resp = await self.bot.http_client.fetch(url, cache_ttl=15 * 60, stale_ttl=60 * 60, coalesce=True)
+            if resp.status != 200:
+                return await interaction.followup.send(f"❌ Falha ao aceder à API (HTTP {resp.status}).")
+            payload = resp.body
 
             eventos = payload.get("events", [])
             if not eventos:
@@ -202,7 +203,7 @@ class Portugal(commands.Cog):
         start="Data inicial no formato YYYY-MM-DD (opcional)",
         end="Data final no formato YYYY-MM-DD (opcional)"
     )
-    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    @command_guilds()
     async def santarem(
         self,
         interaction: discord.Interaction,
@@ -219,9 +220,8 @@ class Portugal(commands.Cog):
         headers = {"User-Agent": "Mozilla/5.0 (DiscordBot/1.0)"}
 
         try:
-            async with self.bot.session.get(url, params=params, headers=headers) as resp:
-                text = await resp.text()
-                data = json.loads(text)
+            resp = await self.bot.http_client.fetch(url, read="text", params=params, headers=headers, coalesce=True)
+            data = json.loads(resp.body)
         except Exception:
             return await interaction.followup.send("❌ Não foi possível ler os eventos de Santarém.")
 
@@ -258,15 +258,18 @@ class Portugal(commands.Cog):
         name="feriado_pt",
         description="Mostra o próximo feriado nacional em Portugal"
     )
-    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    @command_guilds()
     async def feriado_pt(self, interaction: discord.Interaction):
         await interaction.response.defer()
 
         try:
-            async with self.bot.session.get(
-                "https://date.nager.at/api/v3/NextPublicHolidays/PT"
-            ) as r:
-                data = await r.json()
+            r = await self.bot.http_client.fetch(
+                "https://date.nager.at/api/v3/NextPublicHolidays/PT",
+                cache_ttl=6 * 3600,
+                stale_ttl=24 * 3600,
+                coalesce=True,
+            )
+            data = r.body
 
             feriado = data[0]
 
@@ -286,13 +289,13 @@ class Portugal(commands.Cog):
 
     async def fetch_insulto(self) -> str:
         try:
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=5)) as session:
-                async with session.get(EVIL_INSULT_API) as resp:
-                    if resp.status != 200:
-                        raise RuntimeError("API não respondeu 200")
+            resp = await self.bot.http_client.fetch(
+                EVIL_INSULT_API, timeout=aiohttp.ClientTimeout(total=5)
+            )
+            if resp.status != 200:
+                raise RuntimeError("API não respondeu 200")
 
-                    data = await resp.json()
-                    return data.get("insult", "Hoje não há insultos, só desilusão.")
+            return resp.body.get("insult", "Hoje não há insultos, só desilusão.")
         except Exception:
             return "A API falhou… tal como tu nesse jogo."
 
@@ -300,7 +303,7 @@ class Portugal(commands.Cog):
         name="insulto_tuga",
         description="Recebe um insulto à tuga (sem chorar)"
     )
-    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    @command_guilds()
     async def insulto_tuga(self, interaction: discord.Interaction):
         await interaction.response.defer(thinking=True)
 
@@ -1,8 +1,7 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-import aiohttp
-from config import GUILD_ID
+from utils.scope import command_guilds
 import random
 
 class Reddit(commands.Cog):
@@ -19,7 +18,7 @@ class Reddit(commands.Cog):
         sort="Como ordenar os posts (hot, new, top, rising)",
         limit="Número máximo de posts para escolher aleatoriamente (1-50)"
     )
-    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    @command_guilds()
     async def reddit(
         self,
         interaction: discord.Interaction,
@@ -39,14 +38,12 @@ class Reddit(commands.Cog):
         url = f"https://www.reddit.com/r/PORTUGALCARALHO/{sort}.json?limit={limit}"
         headers = {"User-Agent": "DebocheBot/1.0.0"}
 
-        async with aiohttp.ClientSession(headers=headers) as session:
-            async with session.get(url) as resp:
-                if resp.status != 200:
-                    body = await resp.text()
-                    return await interaction.followup.send(
-                        f"❌ Erro ao acessar Reddit (HTTP {resp.status}):\n{body[:500]}"
-                    )
-                data = await resp.json()
+        resp = await self.bot.http_client.fetch(url, headers=headers)
+        if resp.status != 200:
+            return await interaction.followup.send(
+                f"❌ Erro ao acessar Reddit (HTTP {resp.status}):\n{resp.body[:500]}"
+            )
+        data = resp.body
 
         posts = data.get("data", {}).get("children", [])
         if not posts:
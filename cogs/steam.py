@@ -1,9 +1,10 @@
+import asyncio
+import aiohttp
 import discord
 from discord.ext import commands
 from discord import app_commands
-import aiohttp
 import os
-from config import GUILD_ID
+from utils.scope import command_guilds
 from paginator import EmbedPaginator
 
 
@@ -19,29 +20,40 @@ class SteamStocksCog(commands.Cog):
         """Pesquisa jogos na Steam Store."""
         url = f"https://store.steampowered.com/api/storesearch?term={query}&l=en&cc=EU"
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as resp:
-                if resp.status != 200:
-                    return None
-                return await resp.json()
+        try:
+            resp = await self.bot.http_client.fetch(url, coalesce=True)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return None
+        if resp.status != 200:
+            return None
+        return resp.body
 
     async def steam_details(self, appid: int) -> dict | None:
         """Obtém detalhes completos de um jogo pelo appid."""
         url = f"https://store.steampowered.com/api/appdetails?appids={appid}"
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as resp:
-                if resp.status != 200:
-                    return None
-                data = await resp.json()
-                return data.get(str(appid), {}).get("data", None)
+        try:
+            resp = await self.bot.http_client.fetch(url, coalesce=True)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return None
+        if resp.status != 200:
+            return None
+        return resp.body.get(str(appid), {}).get("data", None)
 
     async def steam_discounts(self) -> list[dict]:
+        # Pedidos simultâneos partilham a mesma lista (já filtrada e ordenada): não a alterar
+        try:
+            return await self.bot.http_client.flights.do(
+                "steam:discounts", self._load_discounts, label="steam/discounts"
+            )
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return []
+
+    async def _load_discounts(self) -> list[dict]:
         url = "https://store.steampowered.com/api/featuredcategories/?cc=EU"
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as resp:
-                data = await resp.json()
+        resp = await self.bot.http_client.fetch(url, cache_ttl=10 * 60, stale_ttl=60 * 60, coalesce=True)
+        data = resp.body
 
         discounted_items = []
 
@@ -61,7 +73,7 @@ class SteamStocksCog(commands.Cog):
     # =======================================================================
 
     @app_commands.command(name="steamgame", description="Pesquisar jogos ou ver descontos da Steam.")
-    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    @command_guilds()
     @app_commands.describe(
         mode="pesquisar = procurar jogo | descontos = listar descontos",
         query="Nome do jogo (modo pesquisar)"
@@ -1,9 +1,8 @@
 import os
-import aiohttp
 import discord
 from discord.ext import commands
 from discord import app_commands
-from config import GUILD_ID
+from utils.scope import command_guilds
 from paginator import EmbedPaginator
 
 GROQ_KEY = os.getenv("GROQ_API_KEY")
@@ -49,7 +48,7 @@ class StrategyCog(commands.Cog):
         recursos="Recursos disponíveis",
         tempo="Tempo disponível"
     )
-    @app_commands.guilds(discord.Object(GUILD_ID))
+    @command_guilds()
     async def estrategia(
         self,
         interaction: discord.Interaction,
@@ -87,18 +86,17 @@ Tempo: {tempo}
         }
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    GROQ_URL,
-                    headers=headers,
-                    json=payload
-                ) as resp:
-                    if resp.status != 200:
-                        text = await resp.text()
-                        return await interaction.followup.send(
-                            f"❌ Erro {resp.status} da API:\n{text[:400]}"
-                        )
-                    data = await resp.json()
+            resp = await self.bot.http_client.fetch(
+                GROQ_URL,
+                method="POST",
+                headers=headers,
+                json=payload
+            )
+            if resp.status != 200:
+                return await interaction.followup.send(
+                    f"❌ Erro {resp.status} da API:\n{str(resp.body)[:400]}"
+                )
+            data = resp.body
         except Exception as e:
             return await interaction.followup.send(
                 f"❌ Falha na requisição: `{e}`"
@@ -5,7 +5,8 @@ from typing import Optional
 from datetime import datetime
 import itertools
 
-from config import GUILD_ID
+from utils.scope import command_guilds
+from utils.members import get_or_fetch_user
 
 
 class TradeSelect(discord.ui.Select):
@@ -62,7 +63,7 @@ class Trades(commands.Cog):
         cancelar="ID da trade para cancelar",
         listar="Mostrar todas as trocas"
     )
-    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    @command_guilds()
     async def trocas(
         self,
         interaction: discord.Interaction,
@@ -133,8 +134,9 @@ class Trades(commands.Cog):
 
             if trade["accepted_by_creator"] and trade["accepted_by_participant"]:
                 trades.pop(aceitar)
-                creator = interaction.guild.get_member(trade["creator_id"])
-                participant = interaction.guild.get_member(trade["participant"])
+                # sem chunking os membros podem não estar em cache: para a DM chega o User
+                creator = await get_or_fetch_user(self.bot, trade["creator_id"])
+                participant = await get_or_fetch_user(self.bot, trade["participant"])
                 content = trade["content"]
                 msg = f"✅ A trade `{aceitar}` foi completada! Conteúdo: {content}"
                 if creator:
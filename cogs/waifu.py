@@ -1,7 +1,6 @@
 import discord
 from discord.ext import commands
 from discord.ext.commands import Context
-import aiohttp
 from typing import Optional, List
 
 GUILD_ID = 123456789  # replace with your env if needed
@@ -14,8 +13,6 @@ class Waifu(commands.Cog):
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        if not hasattr(bot, "session"):
-            self.bot.session = aiohttp.ClientSession(headers={"User-Agent": "DebocheBot/1.0.0"})
 
     @commands.hybrid_command(
         name="waifu",
@@ -72,11 +69,10 @@ class Waifu(commands.Cog):
             params["byte_size"] = byte_size
 
         try:
-            async with self.bot.session.get(self.BASE_URL, params=params) as r:
-                if r.status != 200:
-                    text = await r.text()
-                    return await ctx.send(f"❌ Erro ao buscar waifu (HTTP {r.status}):\n{text[:500]}")
-                data = await r.json()
+            r = await self.bot.http_client.fetch(self.BASE_URL, params=params)
+            if r.status != 200:
+                return await ctx.send(f"❌ Erro ao buscar waifu (HTTP {r.status}):\n{r.body[:500]}")
+            data = r.body
 
             images = data.get("images", [])
             if not images:
@@ -7,4 +7,87 @@ TOKEN = os.getenv("DISCORD_TOKEN")
 GUILD_ID = int(os.getenv("GUILD_ID", 328240164621254656))  # 328240164621254656 = Deboche
 PREFIX = os.getenv("PREFIX")
 ALPHA_VANTAGE_API_KEY = os.getenv("ALPHA_VANTAGE_API_KEY")
-POLLINATIONS_API_KEY = os.getenv("POLLINATIONS_API_KEY")
\ No newline at end of file
+POLLINATIONS_API_KEY = os.getenv("POLLINATIONS_API_KEY")
+# Write-behind dos contadores de uso de comandos
+USAGE_FLUSH_INTERVAL = float(os.getenv("USAGE_FLUSH_INTERVAL", 30))  # segundos
+USAGE_FLUSH_MAX_PENDING = int(os.getenv("USAGE_FLUSH_MAX_PENDING", 500))  # pares (user, comando)
+# Histórico por hora dos comandos (/stats 24h/7d/30d): passa a diário ao fim de N dias
+USAGE_HISTORY_HOURLY_DAYS = int(os.getenv("USAGE_HISTORY_HOURLY_DAYS", 35))  # cobre o mapa dos 30 dias
+USAGE_HISTORY_DAILY_DAYS = int(os.getenv("USAGE_HISTORY_DAILY_DAYS", 0))  # dias guardados por dia; 0 = sempre
+
+# Cliente HTTP partilhado (bot.http_client)
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", 30))  # segundos, por pedido
+HTTP_LIMIT_PER_HOST = int(os.getenv("HTTP_LIMIT_PER_HOST", 10))  # ligações keep-alive por host
+HTTP_DNS_TTL = int(os.getenv("HTTP_DNS_TTL", 300))  # segundos
+HTTP_CACHE_MAX_ENTRIES = int(os.getenv("HTTP_CACHE_MAX_ENTRIES", 512))
+HTTP_CACHE_FILE = os.getenv("HTTP_CACHE_FILE", "http_cache.json")  # vazio = não persistir
+
+# Logging (utils/logs.py)
+LOG_FILE = os.getenv("LOG_FILE", "discord.log")
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", 10 * 1024 * 1024))  # roda o ficheiro a partir deste tamanho
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", 5))  # ficheiros antigos a manter
+LOG_ROTATE_WHEN = os.getenv("LOG_ROTATE_WHEN", "")  # ex. "midnight" = rodar por tempo; vazio = por tamanho
+LOG_JSON = os.getenv("LOG_JSON", "false").lower() in ("1", "true", "yes")  # ficheiro em JSON lines
+
+# Métricas (utils/metrics.py): GET http://METRICS_HOST:METRICS_PORT/metrics
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", 9108))  # 0 = sem endpoint
+
+# Watchdog do event loop (utils/watchdog.py)
+LOOP_LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL", 0.1))  # segundos entre heartbeats
+LOOP_LAG_THRESHOLD = float(os.getenv("LOOP_LAG_THRESHOLD", 0.25))  # bloqueio a partir de quantos segundos
+
+# Perfil de runtime (utils/runtime.py): "default" ou "performance" (uvloop, eager tasks, gc.freeze, orjson)
+RUNTIME_PROFILE = os.getenv("RUNTIME_PROFILE", "default")
+RUNTIME_GC_THRESHOLDS = os.getenv("RUNTIME_GC_THRESHOLDS", "")  # "g0,g1,g2"; vazio = os do perfil
+
+# Circuit breaker por host externo (utils/breaker.py)
+HTTP_BREAKER_ENABLED = os.getenv("HTTP_BREAKER_ENABLED", "true").lower() in ("1", "true", "yes")
+HTTP_BREAKER_FAILURE_RATE = float(os.getenv("HTTP_BREAKER_FAILURE_RATE", 0.5))  # abre a partir desta proporção de falhas
+HTTP_BREAKER_MIN_CALLS = int(os.getenv("HTTP_BREAKER_MIN_CALLS", 5))  # pedidos mínimos na janela para decidir
+HTTP_BREAKER_WINDOW = int(os.getenv("HTTP_BREAKER_WINDOW", 20))  # últimos N pedidos por host
+HTTP_BREAKER_SLOW_CALL = float(os.getenv("HTTP_BREAKER_SLOW_CALL", 10))  # segundos; mais lento conta como falha
+HTTP_BREAKER_OPEN_SECONDS = float(os.getenv("HTTP_BREAKER_OPEN_SECONDS", 30))  # duplica a cada teste falhado
+HTTP_BREAKER_MAX_OPEN_SECONDS = float(os.getenv("HTTP_BREAKER_MAX_OPEN_SECONDS", 300))
+
+# Hedging (utils/hedging.py): fetch(hedge=True) nos comandos de conteúdo aleatório
+HTTP_HEDGE_BUDGET = float(os.getenv("HTTP_HEDGE_BUDGET", 0.1))  # máximo de pedidos extra (0.1 = +10%)
+HTTP_HEDGE_QUANTILE = float(os.getenv("HTTP_HEDGE_QUANTILE", 0.9))  # hedge a partir deste percentil da latência
+HTTP_HEDGE_MIN_SAMPLES = int(os.getenv("HTTP_HEDGE_MIN_SAMPLES", 20))  # pedidos medidos antes de começar
+HTTP_HEDGE_MIN_DELAY = float(os.getenv("HTTP_HEDGE_MIN_DELAY", 0.05))  # segundos
+
+# Cache de membros/presenças (utils/members.py). Nenhum cog usa presenças: ligar só se algum precisar
+INTENT_MEMBERS = os.getenv("INTENT_MEMBERS", "true").lower() in ("1", "true", "yes")
+INTENT_PRESENCES = os.getenv("INTENT_PRESENCES", "false").lower() in ("1", "true", "yes")
+MEMBER_CACHE = os.getenv("MEMBER_CACHE", "default")  # all | none | default | lista de voice,joined
+CHUNK_GUILDS_AT_STARTUP = os.getenv("CHUNK_GUILDS_AT_STARTUP", "false").lower() in ("1", "true", "yes")
+
+# Servidores onde os slash commands são registados: IDs separados por vírgulas,
+# ou "global" para todos os servidores (o Discord pode demorar até 1h a propagar)
+COMMAND_GUILDS = os.getenv("COMMAND_GUILDS") or str(GUILD_ID)
+
+# Sharding (AutoShardedBot). SHARD_IDS permite dividir os shards por vários processos:
+# ex. SHARD_COUNT=4 e SHARD_IDS=0-1 num processo, SHARD_IDS=2-3 noutro
+SHARDED = os.getenv("SHARDED", "false").lower() in ("1", "true", "yes")
+SHARD_COUNT = int(os.getenv("SHARD_COUNT", 0)) or None  # vazio/0 = o número recomendado pelo Discord
+SHARD_IDS = os.getenv("SHARD_IDS", "")  # ex. "0-3" ou "0,2,4"; vazio = todos
+
+# Pool de processos para yt-dlp e parsing de HTML (utils/workers.py); 0 = threads, como antes
+WORKER_PROCESSES = int(os.getenv("WORKER_PROCESSES", 2))
+WORKER_LIMITS = os.getenv("WORKER_LIMITS", "ytdlp=2,download=1,html=2")  # trabalhos em simultâneo por tipo
+WORKER_TIMEOUT = float(os.getenv("WORKER_TIMEOUT", 60))  # segundos por trabalho (os downloads têm 600)
+
+# Base de dados (database/storage.py): WAL, um escritor com group commit e leitores só de leitura
+DB_READERS = int(os.getenv("DB_READERS", 3))  # ligações de leitura
+DB_SYNCHRONOUS = os.getenv("DB_SYNCHRONOUS", "NORMAL")  # NORMAL em WAL só arrisca os últimos commits num corte de energia
+DB_USER_CACHE_SIZE = int(os.getenv("DB_USER_CACHE_SIZE", 4096))  # utilizadores na cache do get_user; 0 = sem cache
+# Tempo de cada instrução SQL e registo das lentas com o plano (database/querylog.py, /sql)
+DB_QUERY_LOG = os.getenv("DB_QUERY_LOG", "1") != "0"  # ~7 µs por instrução
+DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", 100))  # acima disto vai para o log, com EXPLAIN QUERY PLAN
+# Cópias de segurança (database/backup.py): API de backup do SQLite, comprimidas com gzip
+BACKUP_DIR = os.getenv("BACKUP_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "database", "backups"))
+BACKUP_INTERVAL_HOURS = float(os.getenv("BACKUP_INTERVAL_HOURS", 6))  # 0 = sem cópias automáticas
+BACKUP_KEEP_LAST = int(os.getenv("BACKUP_KEEP_LAST", 8))  # cópias mais recentes que ficam sempre
+BACKUP_KEEP_DAILY = int(os.getenv("BACKUP_KEEP_DAILY", 14))  # e uma por dia durante N dias
+BACKUP_STEP_PAGES = int(os.getenv("BACKUP_STEP_PAGES", 256))  # páginas copiadas em cada passo
+BACKUP_STEP_SLEEP = float(os.getenv("BACKUP_STEP_SLEEP", 0.01))  # pausa entre passos (segundos)
@@ -1,89 +1,168 @@
-import aiosqlite
 import datetime
-from typing import Optional, Dict
+import random
+import sqlite3
+import time
+from array import array
+from typing import Any, Optional, Dict, List, Tuple
+
+from database.buffer import CommandUsageBuffer
+from database.cache import NOT_FOUND, UserCache, UserRecord
+from database.migrations import migrate
+from database.storage import Storage
+from utils.metrics import MetricsRegistry
+
+
+GET_USER = """
+SELECT
+    u.id,
+    u.discord_id,
+    u.name,
+    u.bio,
+    u.zone,
+    u.position,
+    u.xp,
+    u.is_police,
+    u.reputation,
+    u.gender,
+    u.coins,
+    u.joined_at,
+    u.commands_count,
+    s.language,
+    s.notifications_enabled,
+    s.sound_enabled,
+    s.dark_mode,
+    s.auto_reply_enabled,
+    s.daily_reminder_enabled,
+    s.trade_alerts_enabled
+FROM users u
+LEFT JOIN user_settings s ON s.user_id = u.id
+WHERE u.discord_id = ?
+"""
 
 
 class DatabaseManager:
-    def __init__(self, *, connection: aiosqlite.Connection) -> None:
-        self.connection = connection
-        
-        
-        
+    """
+    Leituras vão para o pool de ligações só de leitura do `Storage`; cada
+    escrita (uma ou mais instruções) é uma operação na fila do escritor e
+    fica gravada num único commit, possivelmente junto com outras.
+
+    Cada operação é uma só ida ao escritor e um só commit: uma instrução
+    (UPSERT/`RETURNING`, com as contas feitas pelo SQLite) ou, quando são
+    precisas várias, uma função síncrona passada a `storage.write()`.
+    `transaction()` fica para quando há lógica em Python entre as instruções.
+
+    O `get_user` passa pela `UserCache`: todos os métodos que alteram um
+    utilizador invalidam a entrada dele depois do commit.
+    """
+
+    def __init__(
+        self,
+        *,
+        storage: Storage,
+        user_cache: Optional[UserCache] = None,
+        metrics: Optional[MetricsRegistry] = None,
+    ) -> None:
+        self.storage = storage
+        self.user_cache = user_cache
+        if metrics is not None and user_cache is not None:
+            requests = metrics.counter(
+                "db_user_cache_requests_total", "Pedidos ao get_user, por resultado na cache (hit/miss).", ("outcome",)
+            )
+            requests.set_function(
+                lambda: {("hit",): user_cache.stats.hits, ("miss",): user_cache.stats.misses}
+            )
+            ratio = metrics.gauge("db_user_cache_hit_ratio", "Proporção de get_user servidos pela cache.")
+            ratio.set_function(lambda: {(): user_cache.stats.ratio})
+            entries = metrics.gauge("db_user_cache_entries", "Utilizadores na cache (incluindo os que não existem).")
+            entries.set_function(lambda: {(): float(len(user_cache))})
+
+    @classmethod
+    async def open(
+        cls,
+        path: str,
+        *,
+        migrate_to: Optional[int] = None,
+        user_cache_size: int = 4096,
+        metrics: Optional[MetricsRegistry] = None,
+        **kwargs,
+    ) -> "DatabaseManager":
+        """
+        Abre o `Storage` (WAL, escritor, leitores), aplica as migrações em falta
+        e devolve o manager pronto a usar.
+
+        :param migrate_to: Parar as migrações nesta versão (benchmarks); por defeito a mais recente.
+        :param user_cache_size: Utilizadores na cache do get_user; 0 desliga a cache.
+        """
+        if sqlite3.sqlite_version_info < (3, 35, 0):
+            raise RuntimeError(f"É preciso SQLite 3.35 ou mais recente (RETURNING); este Python tem {sqlite3.sqlite_version}")
+        storage = await Storage(path, metrics=metrics, **kwargs).open()
+        try:
+            await migrate(storage, target=migrate_to, logger=storage.logger)
+        except BaseException:
+            await storage.close()
+            raise
+        user_cache = UserCache(max_entries=user_cache_size) if user_cache_size > 0 else None
+        return cls(storage=storage, user_cache=user_cache, metrics=metrics)
+
+    def _invalidate(self, *discord_ids: int) -> None:
+        if self.user_cache is not None:
+            self.user_cache.invalidate_many(int(discord_id) for discord_id in discord_ids)
+
+    def transaction(self):
+        """
+        `async with db.transaction() as tx:` várias instruções num só commit
+        (ver `Storage.transaction`). Quem alterar a tabela users aqui dentro
+        tem de invalidar a cache depois: os métodos deste manager já o fazem.
+        """
+        return self.storage.transaction()
+
+    async def close(self) -> None:
+        await self.storage.close()
+
     # ===============================
     # USERS & PROFILE
     # ===============================
-    async def get_user(self, discord_id: int) -> Optional[Dict]:
-        query = """
-        SELECT
-            u.id,
-            u.discord_id,
-            u.name,
-            u.bio,
-            u.zone,
-            u.position,
-            u.xp,
-            u.is_police,
-            u.reputation,
-            u.gender,
-            u.coins,
-            u.joined_at,
-            u.commands_count,
-            s.language,
-            s.notifications_enabled,
-            s.sound_enabled,
-            s.dark_mode,
-            s.auto_reply_enabled,
-            s.daily_reminder_enabled,
-            s.trade_alerts_enabled
-        FROM users u
-        LEFT JOIN user_settings s ON s.user_id = u.id
-        WHERE u.discord_id = ?
-        """
-        async with self.connection.execute(query, (str(discord_id),)) as cursor:
-            row = await cursor.fetchone()
-            if not row:
-                return None
-
-            keys = [
-                "id", "discord_id", "name", "bio", "zone", "position",
-                "xp", "is_police", "reputation", "gender",
-                "coins", "joined_at", "commands_count",
-                "language", "notifications_enabled", "sound_enabled", "dark_mode",
-                "auto_reply_enabled", "daily_reminder_enabled", "trade_alerts_enabled"
-            ]
-            return dict(zip(keys, row))
-
-    async def create_user(self, discord_id: int, name: str):
+    async def get_user(self, discord_id: int) -> Optional[UserRecord]:
+        discord_id = int(discord_id)
+        cache = self.user_cache
+        if cache is not None:
+            cached = cache.get(discord_id)
+            if cached is not None:
+                return None if cached is NOT_FOUND else cached
+            generation = cache.generation
+
+        row = await self.storage.fetchone(GET_USER, (discord_id,))
+        record = UserRecord(row) if row else None
+        if cache is not None:
+            cache.set(discord_id, record or NOT_FOUND, generation)
+        return record
+
+    async def create_user(self, discord_id: int, name: str) -> Optional[UserRecord]:
+        discord_id = int(discord_id)
         joined_at = datetime.datetime.utcnow().isoformat()
-        await self.connection.execute(
-            "INSERT OR IGNORE INTO users(discord_id, name, joined_at) VALUES (?, ?, ?)",
-            (str(discord_id), name, joined_at)
-        )
-        await self.connection.commit()
-        # Create default settings
-        user = await self.connection.execute("SELECT id FROM users WHERE discord_id=?", (str(discord_id),))
-        async with user as cursor:
-            row = await cursor.fetchone()
-            if row:
-                user_id = row[0]
-                await self.connection.execute(
-                    "INSERT OR IGNORE INTO user_settings(user_id) VALUES(?)",
-                    (user_id,)
-                )
-                await self.connection.commit()
-        return await self.get_user(discord_id)
 
-    async def update_profile(self, discord_id: str, **kwargs):
-        # First, find the user ID in the table
-        user = await self.connection.execute(
-            "SELECT id FROM users WHERE discord_id=?", (discord_id,)
-        )
-        async with user as cursor:
-            row = await cursor.fetchone()
-            if not row:
-                return False
-            user_id = row[0]
+        def op(connection: sqlite3.Connection) -> Optional[Tuple]:
+            connection.execute(
+                "INSERT INTO users(discord_id, name, joined_at) VALUES (?, ?, ?) ON CONFLICT(discord_id) DO NOTHING",
+                (discord_id, name, joined_at)
+            )
+            # Create default settings
+            connection.execute(
+                "INSERT OR IGNORE INTO user_settings(user_id) SELECT id FROM users WHERE discord_id = ?",
+                (discord_id,)
+            )
+            return connection.execute(GET_USER, (discord_id,)).fetchone()
+
+        row = await self.storage.write(op)
+
+        # a linha lida na transação já é a que ficou gravada: vai diretamente para a cache
+        record = UserRecord(row) if row else None
+        self._invalidate(discord_id)
+        if self.user_cache is not None:
+            self.user_cache.set(discord_id, record or NOT_FOUND, self.user_cache.generation)
+        return record
 
+    async def update_profile(self, discord_id: str, **kwargs) -> bool:
         # Only allow these fields to be updated
         allowed_fields = ["name", "bio", "zone", "gender", "position", "is_police"]
         fields = []
@@ -97,38 +176,29 @@ class DatabaseManager:
         if not fields:
             return False  # nothing to update
 
-        query = f"UPDATE users SET {', '.join(fields)} WHERE id=?"
-        values.append(user_id)
-
-        await self.connection.execute(query, tuple(values))
-        await self.connection.commit()
-        return True
+        query = f"UPDATE users SET {', '.join(fields)} WHERE discord_id=?"
+        updated = await self.storage.execute(query, (*values, int(discord_id)))
+        self._invalidate(discord_id)
+        return updated > 0
 
     # ===============================
     # LEVELING & ECONOMY
     # ===============================
 
-    async def add_xp_coins(self, discord_id: int, xp: int = 0, coins: int = 0):
-        user = await self.connection.execute("SELECT id, coins FROM users WHERE discord_id=?", (str(discord_id),))
-        async with user as cursor:
-            row = await cursor.fetchone()
-            if not row:
-                return False
-            user_id = row[0]
-            current_coins = row[1] or 0
-
-        # Update coins
-        await self.connection.execute(
-            "UPDATE users SET coins = ? WHERE id=?",
-            (current_coins + coins, user_id)
-        )
-        # For leveling, store XP in a virtual field: commands_count used as XP proxy or extend schema if needed
-        await self.connection.execute(
-            "UPDATE users SET commands_count = commands_count + ? WHERE id=?",
-            (xp, user_id)
+    async def add_xp_coins(self, discord_id: int, xp: int = 0, coins: int = 0) -> bool:
+        # Um só UPDATE: o saldo é somado pelo SQLite, nunca lido e reescrito (sem updates perdidos).
+        # For leveling, XP is stored in commands_count (used as XP proxy)
+        rows = await self.storage.execute_returning(
+            """
+            UPDATE users
+            SET coins = COALESCE(coins, 0) + ?, commands_count = commands_count + ?
+            WHERE discord_id = ?
+            RETURNING coins
+            """,
+            (coins, xp, int(discord_id))
         )
-        await self.connection.commit()
-        return True
+        self._invalidate(discord_id)
+        return bool(rows)
       
     async def increment_commands_count(self, discord_id: int) -> None:
         """Increase commands_count by 1 for a user"""
@@ -137,14 +207,12 @@ class DatabaseManager:
         SET commands_count = commands_count + 1
         WHERE discord_id = ?
         """
-        async with self.connection.execute(query, (str(discord_id),)):
-            await self.connection.commit()
+        await self.storage.execute(query, (int(discord_id),))
+        self._invalidate(discord_id)
 
     async def get_level(self, discord_id: int) -> int:
-        user = await self.connection.execute("SELECT commands_count FROM users WHERE discord_id=?", (str(discord_id),))
-        async with user as cursor:
-            row = await cursor.fetchone()
-            xp = row[0] if row else 0
+        row = await self.storage.fetchone("SELECT commands_count FROM users WHERE discord_id=?", (int(discord_id),))
+        xp = row[0] if row else 0
         level = int((xp / 10) ** 0.5)
         return level
 
@@ -156,26 +224,275 @@ class DatabaseManager:
         ON CONFLICT(discord_id, command_name)
         DO UPDATE SET usage_count = usage_count + 1
         """
-        async with self.connection.execute(query, (str(discord_id), command_name)):
-            await self.connection.commit()
-            
+        await self.storage.execute(query, (int(discord_id), command_name))
+
+    async def flush_command_usage(
+        self,
+        usage: Dict[Tuple[int, str], int],
+        history: Optional[Dict[Tuple[int, str, int], int]] = None,
+    ) -> None:
+        """
+        Grava numa só transação os contadores acumulados pelo CommandUsageBuffer.
+
+        :param usage: {(discord_id, command_name): número de usos}
+        :param history: {(hora, command_name, guild_id): número de usos}, para command_usage_hourly
+        """
+        if not usage and not history:
+            return
+
+        per_user: Dict[int, int] = {}
+        for (discord_id, _), count in usage.items():
+            per_user[discord_id] = per_user.get(discord_id, 0) + count
+
+        def op(connection: sqlite3.Connection) -> None:
+            connection.executemany(
+                "UPDATE users SET commands_count = commands_count + ? WHERE discord_id = ?",
+                [(count, int(discord_id)) for discord_id, count in per_user.items()],
+            )
+            connection.executemany(
+                """
+                INSERT INTO command_usage (discord_id, command_name, usage_count)
+                VALUES (?, ?, ?)
+                ON CONFLICT(discord_id, command_name)
+                DO UPDATE SET usage_count = usage_count + excluded.usage_count
+                """,
+                [
+                    (int(discord_id), command_name, count)
+                    for (discord_id, command_name), count in usage.items()
+                ],
+            )
+            if history:
+                connection.executemany(
+                    "INSERT OR IGNORE INTO command_names (name) VALUES (?)",
+                    [(command_name,) for command_name in {command_name for _, command_name, _ in history}],
+                )
+                connection.executemany(
+                    """
+                    INSERT INTO command_usage_hourly (hour, command_id, guild_id, count)
+                    SELECT ?, id, ?, ? FROM command_names WHERE name = ?
+                    ON CONFLICT (hour, command_id, guild_id) DO UPDATE SET count = count + excluded.count
+                    """,
+                    [
+                        (hour, int(guild_id), count, command_name)
+                        for (hour, command_name, guild_id), count in history.items()
+                    ],
+                )
+
+        await self.storage.write(op)
+        self._invalidate(*per_user)
+
     async def get_command_stats(self, limit: int = 20, ascending: bool = False):
         """
         Retorna estatísticas de todos os comandos, agregados por comando.
+        Lê os totais materializados em command_totals (índice por total).
         :param limit: top N comandos
         :param ascending: True = menos usados primeiro
         """
         order = "ASC" if ascending else "DESC"
         query = f"""
-        SELECT command_name, SUM(usage_count) as total
-        FROM command_usage
+        SELECT command_name, total
+        FROM command_totals
+        WHERE total > 0
+        ORDER BY total {order}, command_name {order}
+        LIMIT ?
+        """
+        return await self.storage.fetchall(query, (limit,))  # [(command_name, total), ...]
+
+    async def check_command_totals(self) -> List[Tuple[str, int, int]]:
+        """
+        Compara command_totals com a soma do command_usage.
+
+        :return: [(command_name, total esperado, total guardado), ...] dos que diferem
+        """
+        query = """
+        SELECT command_name, SUM(expected), SUM(stored)
+        FROM (
+            SELECT command_name, usage_count AS expected, 0 AS stored FROM command_usage
+            UNION ALL
+            SELECT command_name, 0, total FROM command_totals
+        )
         GROUP BY command_name
-        ORDER BY total {order}
+        HAVING SUM(expected) != SUM(stored)
+        ORDER BY command_name
+        """
+        return [tuple(row) for row in await self.storage.fetchall(query)]
+
+    async def rebuild_command_totals(self) -> int:
+        """Refaz command_totals a partir do command_usage. Retorna o número de comandos."""
+
+        def op(connection: sqlite3.Connection) -> int:
+            connection.execute("DELETE FROM command_totals")
+            return connection.execute(
+                """
+                INSERT INTO command_totals (command_name, total)
+                SELECT command_name, SUM(usage_count) FROM command_usage GROUP BY command_name
+                """
+            ).rowcount
+
+        return await self.storage.write(op)
+
+    # ===============================
+    # HISTÓRICO DE USO DOS COMANDOS
+    # ===============================
+    # Horas e dias contam-se em UTC desde 1970: hora = segundos // 3600,
+    # dia = hora // 24. As séries vêm em `array("q")`, uma posição por hora
+    # (ou dia), da mais antiga para a atual, com zeros onde não houve uso.
+
+    @staticmethod
+    def _history_filter(command_name: Optional[str], guild_id: Optional[int]) -> Tuple[str, List[Any]]:
+        sql, params = "", []
+        if command_name is not None:
+            sql += " AND command_id = (SELECT id FROM command_names WHERE name = ?)"
+            params.append(command_name)
+        if guild_id is not None:
+            sql += " AND guild_id = ?"
+            params.append(int(guild_id))
+        return sql, params
+
+    async def get_command_series(
+        self,
+        periods: int,
+        *,
+        step: str = "hour",
+        command_name: Optional[str] = None,
+        guild_id: Optional[int] = None,
+        now: Optional[float] = None,
+    ) -> array:
+        """
+        Usos por hora ou por dia nos últimos `periods` períodos (o último é o atual).
+
+        :param step: "hour" (só command_usage_hourly) ou "day" (também os dias já agregados)
+        :param command_name: Só este comando (por defeito todos)
+        :param guild_id: Só este servidor, 0 para DMs (por defeito todos)
+        """
+        if step not in ("hour", "day"):
+            raise ValueError(f"step inválido: {step!r}")
+        hour_now = int(time.time() if now is None else now) // 3600
+        width = 1 if step == "hour" else 24
+        end = hour_now // width
+        start = end - periods + 1
+        where, params = self._history_filter(command_name, guild_id)
+
+        query = f"""
+        SELECT hour / {width}, SUM(count) FROM command_usage_hourly
+        WHERE hour >= ? AND hour <= ?{where}
+        GROUP BY 1
+        """
+        rows = list(await self.storage.fetchall(query, (start * width, hour_now, *params)))
+        if step == "day":
+            rows += await self.storage.fetchall(
+                f"""
+                SELECT day, SUM(count) FROM command_usage_daily
+                WHERE day >= ? AND day <= ?{where}
+                GROUP BY day
+                """,
+                (start, end, *params),
+            )
+
+        series = array("q", [0]) * periods
+        for bucket, count in rows:
+            series[bucket - start] += count
+        return series
+
+    async def get_command_heatmap(
+        self,
+        days: int = 7,
+        *,
+        command_name: Optional[str] = None,
+        guild_id: Optional[int] = None,
+        now: Optional[float] = None,
+    ) -> List[array]:
+        """
+        Usos por dia da semana e hora (UTC) nos últimos `days` dias: 7 linhas
+        (segunda a domingo) de 24 posições. Só conta o que ainda está por hora.
+        """
+        hour_now = int(time.time() if now is None else now) // 3600
+        where, params = self._history_filter(command_name, guild_id)
+        # 1970-01-01 foi uma quinta-feira: (dia + 3) % 7 dá 0 à segunda
+        rows = await self.storage.fetchall(
+            f"""
+            SELECT (hour / 24 + 3) % 7, hour % 24, SUM(count) FROM command_usage_hourly
+            WHERE hour > ? AND hour <= ?{where}
+            GROUP BY 1, 2
+            """,
+            (hour_now - days * 24, hour_now, *params),
+        )
+        grid = [array("q", [0]) * 24 for _ in range(7)]
+        for weekday, hour, count in rows:
+            grid[weekday][hour] = count
+        return grid
+
+    async def get_command_window(
+        self,
+        hours: int,
+        limit: int = 20,
+        ascending: bool = False,
+        *,
+        guild_id: Optional[int] = None,
+        now: Optional[float] = None,
+    ) -> List[Tuple[str, int]]:
+        """
+        Como o get_command_stats, mas só com os usos das últimas `hours` horas.
+        Antes do corte do rollup só há dias inteiros: entram os que começam
+        dentro da janela.
+        """
+        hour_now = int(time.time() if now is None else now) // 3600
+        start = hour_now - hours + 1
+        where, params = self._history_filter(None, guild_id)
+        order = "ASC" if ascending else "DESC"
+        query = f"""
+        SELECT n.name, SUM(t.count) AS total
+        FROM (
+            SELECT command_id, count FROM command_usage_hourly
+            WHERE hour >= ? AND hour <= ?{where}
+            UNION ALL
+            SELECT command_id, count FROM command_usage_daily
+            WHERE day >= ? AND day <= ?{where}
+        ) AS t
+        JOIN command_names n ON n.id = t.command_id
+        GROUP BY t.command_id
+        ORDER BY total {order}, n.name {order}
         LIMIT ?
         """
-        rows = await self.connection.execute(query, (limit,))
-        async with rows as cursor:
-            return await cursor.fetchall()  # [(command_name, total), ...]
+        day_start = -(-start // 24)
+        return await self.storage.fetchall(
+            query, (start, hour_now, *params, day_start, hour_now // 24, *params, limit)
+        )
+
+    async def rollup_command_history(
+        self, hourly_days: int, daily_days: int = 0, *, now: Optional[float] = None
+    ) -> Tuple[int, int]:
+        """
+        Soma em command_usage_daily as horas com mais de `hourly_days` dias
+        (dias inteiros) e apaga-as; com `daily_days` apaga também os dias mais
+        antigos do que isso.
+
+        :return: (horas agregadas, dias apagados)
+        """
+        day_now = int(time.time() if now is None else now) // 86400
+        cutoff = (day_now - hourly_days) * 24
+
+        def op(connection: sqlite3.Connection) -> Tuple[int, int]:
+            connection.execute(
+                """
+                INSERT INTO command_usage_daily (day, command_id, guild_id, count)
+                SELECT hour / 24, command_id, guild_id, SUM(count) FROM command_usage_hourly
+                WHERE hour < ?
+                GROUP BY 1, 2, 3
+                ON CONFLICT (day, command_id, guild_id) DO UPDATE SET count = count + excluded.count
+                """,
+                (cutoff,),
+            )
+            rolled = connection.execute("DELETE FROM command_usage_hourly WHERE hour < ?", (cutoff,)).rowcount
+            dropped = 0
+            if daily_days:
+                dropped = connection.execute(
+                    "DELETE FROM command_usage_daily WHERE day < ?", (day_now - daily_days,)
+                ).rowcount
+            return rolled, dropped
+
+        return await self.storage.write(op)
+
     # ===============================
     # QUESTS
     # ===============================
@@ -188,33 +505,39 @@ class DatabaseManager:
     # ===============================
 
     async def pvp_battle(self, user1_id: int, user2_id: int) -> Dict:
-        # Get players coins + xp
-        rows = await self.connection.execute(
-            "SELECT discord_id, commands_count, coins FROM users WHERE discord_id IN (?, ?)",
-            (str(user1_id), str(user2_id))
-        )
-        async with rows as cursor:
-            players = await cursor.fetchall()
+        reward_coins = random.randint(5, 25)
+        reward_xp = random.randint(5, 20)
+
+        # Ler os jogadores e pagar ao vencedor na mesma transação
+        async with self.storage.transaction() as tx:
+            # Get players coins + xp
+            players = await tx.fetchall(
+                "SELECT discord_id, commands_count, coins FROM users WHERE discord_id IN (?, ?)",
+                (int(user1_id), int(user2_id))
+            )
             if len(players) < 2:
                 return {"error": "Um ou ambos os jogadores não encontrados"}
 
-        # Battle logic
-        stats = {p[0]: {"xp": p[1], "coins": p[2]} for p in players}
-        attack1 = stats[str(user1_id)]["xp"] // 2 + random.randint(1, 10)
-        attack2 = stats[str(user2_id)]["xp"] // 2 + random.randint(1, 10)
-
-        if attack1 > attack2:
-            winner, loser = str(user1_id), str(user2_id)
-        elif attack2 > attack1:
-            winner, loser = str(user2_id), str(user1_id)
-        else:
-            winner = loser = None  # draw
-
-        reward_coins = random.randint(5, 25)
-        reward_xp = random.randint(5, 20)
+            # Battle logic
+            stats = {p[0]: {"xp": p[1], "coins": p[2]} for p in players}
+            attack1 = stats[int(user1_id)]["xp"] // 2 + random.randint(1, 10)
+            attack2 = stats[int(user2_id)]["xp"] // 2 + random.randint(1, 10)
+
+            if attack1 > attack2:
+                winner, loser = str(user1_id), str(user2_id)
+            elif attack2 > attack1:
+                winner, loser = str(user2_id), str(user1_id)
+            else:
+                winner = loser = None  # draw
+
+            if winner:
+                await tx.execute(
+                    "UPDATE users SET coins = COALESCE(coins, 0) + ?, commands_count = commands_count + ? WHERE discord_id = ?",
+                    (reward_coins, reward_xp, int(winner))
+                )
 
         if winner:
-            await self.add_xp_coins(int(winner), xp=reward_xp, coins=reward_coins)
+            self._invalidate(winner)
 
         return {
             "winner": winner,
@@ -233,29 +556,25 @@ class DatabaseManager:
 
         :param user_id: The ID of the user that should be warned.
         :param reason: The reason why the user should be warned.
+        :return: The ID of the new warn (sequential per user and server).
         """
-        rows = await self.connection.execute(
-            "SELECT id FROM warns WHERE user_id=? AND server_id=? ORDER BY id DESC LIMIT 1",
+        rows = await self.storage.execute_returning(
+            """
+            INSERT INTO warns(id, user_id, server_id, moderator_id, reason)
+            SELECT COALESCE(MAX(id), 0) + 1, ?, ?, ?, ?
+            FROM warns WHERE user_id=? AND server_id=?
+            RETURNING id
+            """,
             (
                 user_id,
                 server_id,
+                moderator_id,
+                reason,
+                user_id,
+                server_id,
             ),
         )
-        async with rows as cursor:
-            result = await cursor.fetchone()
-            warn_id = result[0] + 1 if result is not None else 1
-            await self.connection.execute(
-                "INSERT INTO warns(id, user_id, server_id, moderator_id, reason) VALUES (?, ?, ?, ?, ?)",
-                (
-                    warn_id,
-                    user_id,
-                    server_id,
-                    moderator_id,
-                    reason,
-                ),
-            )
-            await self.connection.commit()
-            return warn_id
+        return rows[0][0]
 
     async def remove_warn(self, warn_id: int, user_id: int, server_id: int) -> int:
         """
@@ -264,27 +583,28 @@ class DatabaseManager:
         :param warn_id: The ID of the warn.
         :param user_id: The ID of the user that was warned.
         :param server_id: The ID of the server where the user has been warned
+        :return: The number of warns the user still has.
         """
-        await self.connection.execute(
-            "DELETE FROM warns WHERE id=? AND user_id=? AND server_id=?",
-            (
-                warn_id,
-                user_id,
-                server_id,
-            ),
-        )
-        await self.connection.commit()
-        rows = await self.connection.execute(
-            "SELECT COUNT(*) FROM warns WHERE user_id=? AND server_id=?",
-            (
-                user_id,
-                server_id,
-            ),
-        )
-        async with rows as cursor:
-            result = await cursor.fetchone()
+        def op(connection: sqlite3.Connection) -> int:
+            connection.execute(
+                "DELETE FROM warns WHERE id=? AND user_id=? AND server_id=?",
+                (
+                    warn_id,
+                    user_id,
+                    server_id,
+                ),
+            )
+            result = connection.execute(
+                "SELECT COUNT(*) FROM warns WHERE user_id=? AND server_id=?",
+                (
+                    user_id,
+                    server_id,
+                ),
+            ).fetchone()
             return result[0] if result is not None else 0
 
+        return await self.storage.write(op)
+
     async def get_warnings(self, user_id: int, server_id: int) -> list:
         """
         This function will get all the warnings of a user.
@@ -293,19 +613,13 @@ class DatabaseManager:
         :param server_id: The ID of the server that should be checked.
         :return: A list of all the warnings of the user.
         """
-        rows = await self.connection.execute(
+        return await self.storage.fetchall(
             "SELECT user_id, server_id, moderator_id, reason, strftime('%s', created_at), id FROM warns WHERE user_id=? AND server_id=?",
             (
                 user_id,
                 server_id,
             ),
         )
-        async with rows as cursor:
-            result = await cursor.fetchall()
-            result_list = []
-            for row in result:
-                result_list.append(row)
-            return result_list
           
     # ---------- GAMING STATS ----------
     async def add_gaming_session(
@@ -318,29 +632,30 @@ class DatabaseManager:
     ):
         duration = max(0, ended_at - started_at)
 
-        await self.connection.execute(
-            """
-            INSERT INTO gaming_sessions
-            (user_id, server_id, game_name, started_at, ended_at, duration)
-            VALUES (?, ?, ?, ?, ?, ?)
-            """,
-            (user_id, server_id, game_name, started_at, ended_at, duration),
-        )
+        def op(connection: sqlite3.Connection) -> None:
+            connection.execute(
+                """
+                INSERT INTO gaming_sessions
+                (user_id, server_id, game_name, started_at, ended_at, duration)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (user_id, server_id, game_name, started_at, ended_at, duration),
+            )
 
-        await self.connection.execute(
-            """
-            INSERT INTO gaming_totals (user_id, server_id, game_name, total_duration)
-            VALUES (?, ?, ?, ?)
-            ON CONFLICT(user_id, server_id, game_name)
-            DO UPDATE SET total_duration = total_duration + excluded.total_duration
-            """,
-            (user_id, server_id, game_name, duration),
-        )
+            connection.execute(
+                """
+                INSERT INTO gaming_totals (user_id, server_id, game_name, total_duration)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(user_id, server_id, game_name)
+                DO UPDATE SET total_duration = total_duration + excluded.total_duration
+                """,
+                (user_id, server_id, game_name, duration),
+            )
 
-        await self.connection.commit()
+        await self.storage.write(op)
 
     async def get_user_stats(self, user_id: int, server_id: int):
-        rows = await self.connection.execute(
+        return await self.storage.fetchall(
             """
             SELECT game_name, total_duration
             FROM gaming_totals
@@ -349,6 +664,3 @@ class DatabaseManager:
             """,
             (user_id, server_id),
         )
-
-        async with rows as cursor:
-            return await cursor.fetchall()
\ No newline at end of file
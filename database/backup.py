@@ -0,0 +1,344 @@
+"""
+Cópias de segurança da base de dados, com o bot a correr.
+
+Copiar o database.db com `cp` enquanto o bot escreve pode dar uma cópia
+rasgada (metade antes e metade depois de um commit, sem o WAL). Aqui a
+cópia usa a API de backup do SQLite, `pages` páginas de cada vez, a partir
+de uma ligação só de leitura com uma transação aberta: em WAL isso fixa um
+snapshot, por isso o escritor nunca espera pela cópia e a cópia não
+recomeça a cada commit (sem o snapshot recomeçaria sempre que o bot
+escrevesse a meio). Enquanto a cópia dura o checkpoint não passa do
+snapshot e o WAL pode crescer um pouco.
+
+A cópia é verificada (`PRAGMA quick_check`), comprimida com gzip e guardada
+como `database-AAAAMMDD-HHMMSS-ffffff.db.gz` (nunca por cima de uma que já
+exista). A retenção guarda as `keep_last`
+mais recentes e a mais recente de cada um dos últimos `keep_daily` dias.
+
+    python -m database.backup create [--db database/database.db] [--dir database/backups]
+    python -m database.backup list
+    python -m database.backup verify database/backups/database-20250101-120000-000000.db.gz
+    python -m database.backup restore database/backups/database-20250101-120000-000000.db.gz  # com o bot parado
+
+Para testar o ciclo completo (cópia durante escritas e restauro):
+`python -m benchmarks.backup_bench`.
+"""
+import argparse
+import asyncio
+import datetime
+import gzip
+import logging
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+from typing import Dict, List, NamedTuple, Optional
+
+from utils.metrics import MetricsRegistry
+
+PREFIX = "database-"
+SUFFIX = ".db.gz"
+_STAMP = "%Y%m%d-%H%M%S-%f"
+_STAMPS = (_STAMP, "%Y%m%d-%H%M%S")  # os nomes antigos eram só ao segundo
+
+
+class BackupResult(NamedTuple):
+    path: str
+    pages: int
+    size_bytes: int  # a base de dados copiada, sem compressão
+    compressed_bytes: int
+    seconds: float
+    removed: List[str]  # cópias antigas apagadas pela retenção
+
+
+class BackupInfo(NamedTuple):
+    user_version: int
+    pages: int
+    tables: Dict[str, int]  # linhas por tabela
+
+
+def backup_name(when: datetime.datetime) -> str:
+    return f"{PREFIX}{when.strftime(_STAMP)}{SUFFIX}"
+
+
+def backup_time(name: str) -> Optional[datetime.datetime]:
+    if not (name.startswith(PREFIX) and name.endswith(SUFFIX)):
+        return None
+    for stamp in _STAMPS:
+        try:
+            return datetime.datetime.strptime(name[len(PREFIX):-len(SUFFIX)], stamp)
+        except ValueError:
+            pass
+    return None
+
+
+def list_backups(directory: str) -> List[str]:
+    """Os caminhos das cópias em `directory`, da mais antiga para a mais recente."""
+    if not os.path.isdir(directory):
+        return []
+    dated = sorted((when, name) for name in os.listdir(directory) if (when := backup_time(name)) is not None)
+    return [os.path.join(directory, name) for _, name in dated]
+
+
+def expired(names: List[str], *, keep_last: int, keep_daily: int) -> List[str]:
+    """As cópias que a retenção apaga: fora das `keep_last` e das diárias dos últimos `keep_daily` dias."""
+    dated = sorted(((backup_time(os.path.basename(name)), name) for name in names), reverse=True)
+    keep = {name for _, name in dated[:keep_last]}
+    days = set()
+    for when, name in dated:
+        if len(days) >= keep_daily:
+            break
+        if when.date() not in days:
+            days.add(when.date())
+            keep.add(name)
+    return [name for _, name in reversed(dated) if name not in keep]
+
+
+def snapshot(source_path: str, target_path: str, *, pages: int = 256, step_sleep: float = 0.0) -> int:
+    """
+    Copia `source_path` para `target_path` com a API de backup, `pages` páginas
+    por passo e uma pausa de `step_sleep` segundos entre passos.
+
+    :return: O número de páginas copiadas.
+    """
+    source = sqlite3.connect(f"file:{source_path}?mode=ro", uri=True, isolation_level=None)
+    try:
+        # Transação de leitura aberta durante toda a cópia: fixa o snapshot do WAL
+        source.execute("BEGIN")
+        source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+        target = sqlite3.connect(target_path)
+        copied = 0
+
+        def progress(status: int, remaining: int, total: int) -> None:
+            nonlocal copied
+            copied = total
+            if remaining and step_sleep:
+                time.sleep(step_sleep)
+
+        try:
+            source.backup(target, pages=pages, progress=progress)
+            result = target.execute("PRAGMA quick_check").fetchone()[0]
+            if result != "ok":
+                raise sqlite3.DatabaseError(f"A cópia não passou no quick_check: {result}")
+        finally:
+            target.close()
+        source.execute("COMMIT")
+    finally:
+        source.close()
+    return copied
+
+
+def _compress(source: str, target: str) -> None:
+    with open(source, "rb") as raw, gzip.open(target, "wb", compresslevel=6) as packed:
+        shutil.copyfileobj(raw, packed, 1024 * 1024)
+
+
+def _decompress(source: str, target: str) -> None:
+    with gzip.open(source, "rb") as packed, open(target, "wb") as raw:
+        shutil.copyfileobj(packed, raw, 1024 * 1024)
+
+
+def inspect(path: str) -> BackupInfo:
+    """Abre uma base de dados (não comprimida) só para leitura e conta as linhas de cada tabela."""
+    connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        result = connection.execute("PRAGMA quick_check").fetchone()[0]
+        if result != "ok":
+            raise sqlite3.DatabaseError(f"{path}: quick_check falhou: {result}")
+        tables = [
+            row[0]
+            for row in connection.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+            )
+        ]
+        return BackupInfo(
+            user_version=connection.execute("PRAGMA user_version").fetchone()[0],
+            pages=connection.execute("PRAGMA page_count").fetchone()[0],
+            tables={table: connection.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0] for table in tables},
+        )
+    finally:
+        connection.close()
+
+
+def verify(archive: str) -> BackupInfo:
+    """Descomprime uma cópia para um temporário e verifica-a (`inspect`)."""
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "verify.db")
+        _decompress(archive, path)
+        return inspect(path)
+
+
+def restore(archive: str, database_path: str) -> BackupInfo:
+    """
+    Substitui o conteúdo de `database_path` pelo de uma cópia. Só com o bot
+    parado: usa a API de backup no sentido inverso, por isso o ficheiro
+    (e o WAL dele) fica consistente, mas quem o tiver aberto perde o que
+    estava a fazer.
+    """
+    from database.migrations import LATEST_VERSION
+
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(database_path))) as workdir:
+        path = os.path.join(workdir, "restore.db")
+        _decompress(archive, path)
+        info = inspect(path)
+        if info.user_version > LATEST_VERSION:
+            raise RuntimeError(
+                f"A cópia está na versão {info.user_version}, mais recente do que este código ({LATEST_VERSION})"
+            )
+        source = sqlite3.connect(path)
+        target = sqlite3.connect(database_path)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+    return info
+
+
+class BackupManager:
+    """
+    Faz cópias de `database_path` para `directory`, numa thread, e aplica a
+    retenção. Só corre uma cópia de cada vez.
+    """
+
+    def __init__(
+        self,
+        database_path: str,
+        directory: str,
+        *,
+        keep_last: int = 8,
+        keep_daily: int = 14,
+        pages: int = 256,
+        step_sleep: float = 0.01,
+        metrics: Optional[MetricsRegistry] = None,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        self.database_path = database_path
+        self.directory = directory
+        self.keep_last = keep_last
+        self.keep_daily = keep_daily
+        self.pages = pages
+        self.step_sleep = step_sleep
+        self.logger = logger or logging.getLogger("discord_bot")
+        self.last: Optional[BackupResult] = None
+        self._lock = asyncio.Lock()
+
+        self._duration = self._failures = None
+        if metrics is not None:
+            self._duration = metrics.histogram(
+                "db_backup_duration_seconds",
+                "Duração das cópias de segurança (cópia, verificação e compressão).",
+                buckets=(0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0),
+            )
+            self._failures = metrics.counter("db_backup_failures_total", "Cópias de segurança que falharam.")
+            last_success = metrics.gauge(
+                "db_backup_last_success_timestamp", "Hora (unix) da última cópia de segurança bem-sucedida."
+            )
+            last_success.set_function(lambda: {(): self._latest_timestamp()})
+            size = metrics.gauge("db_backup_size_bytes", "Tamanho da última cópia, comprimida.")
+            size.set_function(lambda: {(): float(self.last.compressed_bytes if self.last else 0)})
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    def backups(self) -> List[str]:
+        return list_backups(self.directory)
+
+    def _latest_timestamp(self) -> float:
+        backups = self.backups()
+        return os.path.getmtime(backups[-1]) if backups else 0.0
+
+    def age(self) -> Optional[float]:
+        """Segundos desde a última cópia em disco (None se não houver nenhuma)."""
+        latest = self._latest_timestamp()
+        return time.time() - latest if latest else None
+
+    async def run(self) -> BackupResult:
+        async with self._lock:
+            started = time.perf_counter()
+            try:
+                result = await asyncio.to_thread(self._run_sync)
+            except Exception:
+                if self._failures is not None:
+                    self._failures.inc()
+                raise
+            if self._duration is not None:
+                self._duration.observe(time.perf_counter() - started)
+            self.last = result
+            self.logger.info(
+                f"Cópia de segurança {os.path.basename(result.path)}: {result.size_bytes / 2**20:.1f} MiB -> "
+                f"{result.compressed_bytes / 2**20:.1f} MiB em {result.seconds:.1f}s"
+                + (f", {len(result.removed)} antiga(s) apagada(s)" if result.removed else "")
+            )
+            return result
+
+    def _run_sync(self) -> BackupResult:
+        started = time.perf_counter()
+        os.makedirs(self.directory, exist_ok=True)
+        target = os.path.join(self.directory, backup_name(datetime.datetime.now()))
+        with tempfile.TemporaryDirectory(dir=self.directory) as workdir:
+            copy = os.path.join(workdir, "snapshot.db")
+            pages = snapshot(self.database_path, copy, pages=self.pages, step_sleep=self.step_sleep)
+            size = os.path.getsize(copy)
+            packed = os.path.join(workdir, "snapshot.db.gz")
+            _compress(copy, packed)
+            # link em vez de replace: se o nome já existir falha (FileExistsError) em vez de apagar essa cópia
+            os.link(packed, target)
+
+        removed = expired(self.backups(), keep_last=self.keep_last, keep_daily=self.keep_daily)
+        for path in removed:
+            os.remove(path)
+        return BackupResult(
+            path=target,
+            pages=pages,
+            size_bytes=size,
+            compressed_bytes=os.path.getsize(target),
+            seconds=time.perf_counter() - started,
+            removed=removed,
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    root = os.path.dirname(os.path.abspath(__file__))
+    parser.add_argument("--db", default=os.path.join(root, "database.db"), help="base de dados do bot")
+    parser.add_argument("--dir", default=None, help="diretório das cópias (por defeito BACKUP_DIR)")
+    sub = parser.add_subparsers(dest="action", required=True)
+    sub.add_parser("create", help="fazer uma cópia agora")
+    sub.add_parser("list", help="listar as cópias")
+    verify_parser = sub.add_parser("verify", help="descomprimir e verificar uma cópia")
+    verify_parser.add_argument("archive")
+    restore_parser = sub.add_parser("restore", help="repor uma cópia (com o bot parado)")
+    restore_parser.add_argument("archive")
+    args = parser.parse_args()
+
+    from config import BACKUP_DIR, BACKUP_KEEP_DAILY, BACKUP_KEEP_LAST, BACKUP_STEP_PAGES, BACKUP_STEP_SLEEP
+
+    directory = args.dir or BACKUP_DIR
+    if args.action == "create":
+        manager = BackupManager(
+            args.db,
+            directory,
+            keep_last=BACKUP_KEEP_LAST,
+            keep_daily=BACKUP_KEEP_DAILY,
+            pages=BACKUP_STEP_PAGES,
+            step_sleep=BACKUP_STEP_SLEEP,
+        )
+        result = asyncio.run(manager.run())
+        print(f"{result.path}: {result.pages} páginas, {result.compressed_bytes:,} bytes em {result.seconds:.2f}s")
+    elif args.action == "list":
+        for path in list_backups(directory):
+            print(f"{path}  {os.path.getsize(path):>12,} bytes")
+    else:
+        info = verify(args.archive) if args.action == "verify" else restore(args.archive, args.db)
+        print(f"versão do esquema {info.user_version}, {info.pages} páginas")
+        for table, count in info.tables.items():
+            print(f"  {table:<24} {count:>10,}")
+        if args.action == "restore":
+            print(f"Reposta em {args.db}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import asyncio
+import functools
+import logging
+import time
+from typing import Dict, Optional, Set, Tuple
+
+
+class CommandUsageBuffer:
+    """
+    Acumula em memória os incrementos de uso de comandos e grava-os em lote.
+
+    Cada comando executado só mexe num dicionário; a escrita na base de dados
+    acontece de `flush_interval` em `flush_interval` segundos, ou assim que
+    existam `max_pending` pares (user, comando) por gravar, sempre numa única
+    transação.
+
+    Junto com os contadores acumula o histórico por hora (hora, comando,
+    servidor), que vai na mesma transação.
+
+    Uma escrita começada vai sempre até ao fim, mesmo que o `flush` seja
+    cancelado: os contadores já saíram do buffer e, se fossem cancelados
+    com ela, perdiam-se. Se a escrita falhar voltam para o buffer.
+    """
+
+    def __init__(
+        self,
+        database,
+        *,
+        flush_interval: float = 30.0,
+        max_pending: int = 500,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        self.database = database
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.logger = logger or logging.getLogger("discord_bot")
+        self._pending: Dict[Tuple[int, str], int] = {}
+        self._history: Dict[Tuple[int, str, int], int] = {}
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+        self._writes: Set[asyncio.Future] = set()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._stopping.clear()
+            self._task = asyncio.create_task(self._run())
+
+    def add(self, discord_id: int, command_name: str, count: int = 1, guild_id: Optional[int] = None) -> None:
+        """Regista `count` usos de `command_name` por `discord_id` (em `guild_id`, ou DM)."""
+        key = (discord_id, command_name)
+        self._pending[key] = self._pending.get(key, 0) + count
+        bucket = (int(time.time()) // 3600, command_name, guild_id or 0)
+        self._history[bucket] = self._history.get(bucket, 0) + count
+
+        if len(self._pending) >= self.max_pending and (
+            self._flush_task is None or self._flush_task.done()
+        ):
+            self._flush_task = asyncio.create_task(self._safe_flush())
+
+    async def flush(self) -> int:
+        """
+        Grava tudo o que está pendente.
+
+        :return: O número de pares (user, comando) gravados.
+        """
+        async with self._lock:
+            if not self._pending:
+                return 0
+
+            pending, self._pending = self._pending, {}
+            history, self._history = self._history, {}
+            write = asyncio.ensure_future(self.database.flush_command_usage(pending, history))
+            self._writes.add(write)
+            write.add_done_callback(functools.partial(self._written, pending, history))
+            # shield: cancelar quem espera não cancela a escrita (ver a docstring da classe)
+            await asyncio.shield(write)
+            return len(pending)
+
+    def _written(self, pending: Dict, history: Dict, write: asyncio.Future) -> None:
+        self._writes.discard(write)
+        if write.cancelled() or write.exception() is not None:
+            # Devolve os contadores ao buffer para a próxima tentativa
+            for key, count in pending.items():
+                self._pending[key] = self._pending.get(key, 0) + count
+            for bucket, count in history.items():
+                self._history[bucket] = self._history.get(bucket, 0) + count
+
+    async def _safe_flush(self) -> None:
+        try:
+            await self.flush()
+        except Exception as e:
+            self.logger.error(f"Falha ao gravar contadores de comandos: {e}")
+
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                await self._safe_flush()
+
+    async def close(self) -> None:
+        """Pára o timer (sem o interromper a meio de um flush) e garante que nada fica por gravar."""
+        self._stopping.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        if self._flush_task is not None and not self._flush_task.done():
+            await self._flush_task
+        if self._writes:
+            # escritas de um flush cancelado: se falharem, os contadores voltam ao buffer
+            await asyncio.wait(list(self._writes))
+        await self.flush()
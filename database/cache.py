@@ -0,0 +1,123 @@
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple, Union
+
+USER_FIELDS = (
+    "id", "discord_id", "name", "bio", "zone", "position",
+    "xp", "is_police", "reputation", "gender",
+    "coins", "joined_at", "commands_count",
+    "language", "notifications_enabled", "sound_enabled", "dark_mode",
+    "auto_reply_enabled", "daily_reminder_enabled", "trade_alerts_enabled",
+)
+
+
+class UserRecord:
+    """
+    Uma linha do `get_user` (users + user_settings). Lê-se como o dict de
+    antes (`row["is_police"]`) ou por atributo (`row.is_police`).
+
+    É só de leitura: a mesma instância é partilhada por todos os que a tiram
+    da cache, por isso alterações têm de passar pelo `DatabaseManager`.
+    """
+
+    __slots__ = USER_FIELDS
+
+    def __init__(self, row: Sequence[Any]) -> None:
+        for name, value in zip(USER_FIELDS, row):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("UserRecord é só de leitura")
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in USER_FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in USER_FIELDS
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if key in USER_FIELDS else default
+
+    def keys(self) -> Tuple[str, ...]:
+        return USER_FIELDS
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in USER_FIELDS}
+
+    def __repr__(self) -> str:
+        return f"UserRecord(discord_id={self.discord_id!r}, name={self.name!r})"
+
+
+# Guardado na cache para os utilizadores que não existem (a maioria dos que usam /trocas)
+NOT_FOUND = object()
+
+
+class UserCacheStats:
+    __slots__ = ("hits", "misses", "evictions", "invalidations")
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class UserCache:
+    """
+    Cache LRU dos `UserRecord`, indexada por discord_id, com limite de entradas.
+
+    As escritas invalidam as entradas dos utilizadores que alteram (depois do
+    commit). Uma leitura que começou antes de uma invalidação não guarda o
+    resultado: pode ter lido a linha antiga. Para isso cada invalidação
+    avança `generation`, e `set()` recebe a geração de quando a leitura
+    começou.
+    """
+
+    def __init__(self, *, max_entries: int = 4096) -> None:
+        self.max_entries = max_entries
+        self.generation = 0
+        self._entries: "OrderedDict[int, Union[UserRecord, object]]" = OrderedDict()
+        self.stats = UserCacheStats()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, discord_id: int) -> Optional[Union[UserRecord, object]]:
+        """O registo, `NOT_FOUND` (sabe-se que não existe) ou None (não está em cache)."""
+        entry = self._entries.get(discord_id)
+        if entry is None:
+            self.stats.misses += 1
+            return None
+        self._entries.move_to_end(discord_id)
+        self.stats.hits += 1
+        return entry
+
+    def set(self, discord_id: int, entry: Union[UserRecord, object], generation: int) -> None:
+        if generation != self.generation:
+            return  # houve uma escrita durante a leitura
+        self._entries[discord_id] = entry
+        self._entries.move_to_end(discord_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def invalidate(self, discord_id: int) -> None:
+        self.generation += 1
+        if self._entries.pop(discord_id, None) is not None:
+            self.stats.invalidations += 1
+
+    def invalidate_many(self, discord_ids: Iterable[int]) -> None:
+        self.generation += 1
+        for discord_id in discord_ids:
+            if self._entries.pop(discord_id, None) is not None:
+                self.stats.invalidations += 1
+
+    def clear(self) -> None:
+        self.generation += 1
+        self._entries.clear()
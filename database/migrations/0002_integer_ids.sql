@@ -0,0 +1,86 @@
+-- ================================
+-- IDS DO DISCORD COMO INTEGER E ÍNDICES
+-- ================================
+-- Os snowflakes cabem num INTEGER de 64 bits: passam a ser guardados como
+-- número em todas as tabelas (antes eram TEXT em users/command_usage e
+-- varchar(20) em warns). Cada tabela é refeita (criar nova, copiar, apagar,
+-- renomear) porque o SQLite não muda o tipo de uma coluna no sítio.
+
+-- -------- USERS --------
+CREATE TABLE users_new (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    discord_id INTEGER UNIQUE NOT NULL,
+    name TEXT,
+    bio TEXT,
+    zone TEXT,
+    position TEXT,
+    xp INTEGER DEFAULT 0,
+    is_police INTEGER DEFAULT 0,
+    reputation INTEGER DEFAULT 0,
+    gender TEXT,
+    coins INTEGER DEFAULT 0,
+    joined_at TEXT,
+    commands_count INTEGER DEFAULT 0
+);
+INSERT INTO users_new (id, discord_id, name, bio, zone, position, xp, is_police, reputation, gender, coins, joined_at, commands_count)
+SELECT id, CAST(discord_id AS INTEGER), name, bio, zone, position, xp, is_police, reputation, gender, coins, joined_at, commands_count
+FROM users;
+DROP TABLE users;
+ALTER TABLE users_new RENAME TO users;
+
+-- -------- USER SETTINGS --------
+-- O get_user faz JOIN por user_id e não havia índice (varrimento da tabela
+-- inteira). O create_user já fazia INSERT OR IGNORE a contar com um UNIQUE
+-- que não existia: ficam só as primeiras definições de cada utilizador.
+DELETE FROM user_settings WHERE id NOT IN (SELECT MIN(id) FROM user_settings GROUP BY user_id);
+CREATE UNIQUE INDEX user_settings_user ON user_settings (user_id);
+
+-- -------- WARNS --------
+CREATE TABLE warns_new (
+    id INTEGER NOT NULL, -- numerado por (user_id, server_id)
+    user_id INTEGER NOT NULL,
+    server_id INTEGER NOT NULL,
+    moderator_id INTEGER NOT NULL,
+    reason TEXT NOT NULL,
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+INSERT INTO warns_new (id, user_id, server_id, moderator_id, reason, created_at)
+SELECT CAST(id AS INTEGER), CAST(user_id AS INTEGER), CAST(server_id AS INTEGER), CAST(moderator_id AS INTEGER), reason, created_at
+FROM warns;
+DROP TABLE warns;
+ALTER TABLE warns_new RENAME TO warns;
+-- add_warn (último id), remove_warn (COUNT) e get_warnings
+CREATE INDEX warns_user ON warns (user_id, server_id, id);
+
+-- -------- GAMING --------
+CREATE INDEX gaming_sessions_user ON gaming_sessions (user_id, server_id);
+
+-- A chave primária é o único caminho de acesso: sem rowid a linha fica
+-- guardada na própria árvore da chave (uma pesquisa em vez de duas).
+CREATE TABLE gaming_totals_new (
+    user_id INTEGER NOT NULL,
+    server_id INTEGER NOT NULL,
+    game_name TEXT NOT NULL,
+    total_duration INTEGER NOT NULL,
+    PRIMARY KEY (user_id, server_id, game_name)
+) WITHOUT ROWID;
+INSERT INTO gaming_totals_new (user_id, server_id, game_name, total_duration)
+SELECT user_id, server_id, game_name, total_duration FROM gaming_totals;
+DROP TABLE gaming_totals;
+ALTER TABLE gaming_totals_new RENAME TO gaming_totals;
+
+-- -------- COMMAND USAGE --------
+-- O id não era usado: a chave é (discord_id, command_name), a do upsert.
+CREATE TABLE command_usage_new (
+    discord_id INTEGER NOT NULL,       -- ID do user
+    command_name TEXT NOT NULL,        -- nome do comando
+    usage_count INTEGER NOT NULL DEFAULT 0,  -- vezes usadas
+    PRIMARY KEY (discord_id, command_name)
+) WITHOUT ROWID;
+INSERT INTO command_usage_new (discord_id, command_name, usage_count)
+SELECT CAST(discord_id AS INTEGER), command_name, COALESCE(usage_count, 0) FROM command_usage WHERE true
+ON CONFLICT (discord_id, command_name) DO UPDATE SET usage_count = command_usage_new.usage_count + excluded.usage_count;
+DROP TABLE command_usage;
+ALTER TABLE command_usage_new RENAME TO command_usage;
+-- get_command_stats (SUM por comando) lê só este índice, já ordenado por comando
+CREATE INDEX command_usage_command ON command_usage (command_name, usage_count);
@@ -0,0 +1,46 @@
+-- ================================
+-- TOTAIS POR COMANDO (MATERIALIZADOS)
+-- ================================
+-- O get_command_stats somava o command_usage inteiro (users × comandos) a
+-- cada /stats. Os totais por comando passam a estar guardados e são
+-- mantidos por triggers, na mesma transação de cada escrita no
+-- command_usage: o /stats passa a ler um intervalo do índice por total.
+-- Se ficarem dessincronizados, DatabaseManager.rebuild_command_totals()
+-- refaz a tabela a partir do command_usage.
+
+CREATE TABLE command_totals (
+    command_name TEXT PRIMARY KEY,
+    total INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+-- top/bottom-N do /stats: ORDER BY total lê o índice pela ordem
+CREATE INDEX command_totals_total ON command_totals (total, command_name);
+
+INSERT INTO command_totals (command_name, total)
+SELECT command_name, SUM(usage_count) FROM command_usage GROUP BY command_name;
+
+CREATE TRIGGER command_usage_totals_insert AFTER INSERT ON command_usage
+BEGIN
+    INSERT INTO command_totals (command_name, total) VALUES (NEW.command_name, NEW.usage_count)
+    ON CONFLICT (command_name) DO UPDATE SET total = total + excluded.total;
+END;
+
+-- o caso normal (upsert do flush): o mesmo comando, só muda a contagem
+CREATE TRIGGER command_usage_totals_update AFTER UPDATE OF usage_count ON command_usage
+WHEN OLD.command_name = NEW.command_name
+BEGIN
+    UPDATE command_totals SET total = total + NEW.usage_count - OLD.usage_count
+    WHERE command_name = NEW.command_name;
+END;
+
+CREATE TRIGGER command_usage_totals_rename AFTER UPDATE OF command_name ON command_usage
+WHEN OLD.command_name IS NOT NEW.command_name
+BEGIN
+    UPDATE command_totals SET total = total - OLD.usage_count WHERE command_name = OLD.command_name;
+    INSERT INTO command_totals (command_name, total) VALUES (NEW.command_name, NEW.usage_count)
+    ON CONFLICT (command_name) DO UPDATE SET total = total + excluded.total;
+END;
+
+CREATE TRIGGER command_usage_totals_delete AFTER DELETE ON command_usage
+BEGIN
+    UPDATE command_totals SET total = total - OLD.usage_count WHERE command_name = OLD.command_name;
+END;
@@ -0,0 +1,33 @@
+-- ================================
+-- HISTÓRICO DE USO DOS COMANDOS
+-- ================================
+-- O command_usage só tem contadores desde sempre. Estas tabelas guardam o
+-- uso por hora (e, depois de uns dias, por dia) de cada comando em cada
+-- servidor, para o /stats mostrar as últimas 24h / 7d / 30d.
+-- Tudo com chaves inteiras: o nome do comando passa a um id em
+-- command_names, hour = segundos desde 1970 // 3600, day = hour // 24, e
+-- guild_id = 0 nas mensagens diretas.
+
+CREATE TABLE command_names (
+    id INTEGER PRIMARY KEY,
+    name TEXT UNIQUE NOT NULL
+);
+
+-- intervalos de tempo (o caso do /stats) leem um bloco contíguo da chave
+CREATE TABLE command_usage_hourly (
+    hour INTEGER NOT NULL,
+    command_id INTEGER NOT NULL,
+    guild_id INTEGER NOT NULL DEFAULT 0,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (hour, command_id, guild_id)
+) WITHOUT ROWID;
+
+-- as horas com mais de USAGE_HISTORY_HOURLY_DAYS dias são somadas aqui
+-- (DatabaseManager.rollup_command_history)
+CREATE TABLE command_usage_daily (
+    day INTEGER NOT NULL,
+    command_id INTEGER NOT NULL,
+    guild_id INTEGER NOT NULL DEFAULT 0,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (day, command_id, guild_id)
+) WITHOUT ROWID;
@@ -0,0 +1,112 @@
+"""
+Migrações do esquema da base de dados.
+
+Cada ficheiro `NNNN_nome.sql` desta pasta é uma migração; a versão aplicada
+fica em `PRAGMA user_version`. No arranque só correm as que faltam, cada uma
+numa transação (com o `user_version` novo), por isso uma migração que falhe
+não deixa a base de dados a meio. Uma base de dados de antes das migrações
+tem `user_version` 0: a 0001 é o schema.sql antigo, só com
+`CREATE TABLE IF NOT EXISTS`, e não lhe mexe.
+
+Para mudar o esquema acrescenta-se um ficheiro novo; os antigos nunca se
+alteram depois de chegarem a produção.
+"""
+import logging
+import os
+import re
+import sqlite3
+import time
+from typing import List, NamedTuple, Optional
+
+
+MIGRATIONS_DIR = os.path.dirname(os.path.abspath(__file__))
+_FILENAME = re.compile(r"^(\d{4})_(\w+)\.sql$")
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    statements: List[str]
+
+
+def split_statements(script: str) -> List[str]:
+    """Parte um script SQL em instruções (o executescript faria COMMIT a meio da transação)."""
+    statements = []
+    buffer = ""
+    for line in script.splitlines(keepends=True):
+        buffer += line
+        if sqlite3.complete_statement(buffer):
+            statements.append(buffer.strip())
+            buffer = ""
+    if re.sub(r"--[^\n]*", "", buffer).strip():
+        raise ValueError(f"Instrução SQL incompleta no fim do script: {buffer.strip()[:80]!r}")
+    return statements
+
+
+def load_migrations(directory: str = MIGRATIONS_DIR) -> List[Migration]:
+    migrations = []
+    for filename in sorted(os.listdir(directory)):
+        match = _FILENAME.match(filename)
+        if not match:
+            continue
+        with open(os.path.join(directory, filename), encoding="utf-8") as f:
+            migrations.append(Migration(int(match.group(1)), match.group(2), split_statements(f.read())))
+    versions = [m.version for m in migrations]
+    if versions != list(range(1, len(migrations) + 1)):
+        raise ValueError(f"Migrações fora de sequência: {versions}")
+    return migrations
+
+
+MIGRATIONS = load_migrations()
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+async def migrate(storage, *, target: Optional[int] = None, logger: Optional[logging.Logger] = None) -> int:
+    """
+    Aplica as migrações em falta, pela fila de escrita do `Storage`.
+
+    :param target: Versão final (por defeito a mais recente).
+    :return: A versão do esquema no fim.
+    """
+    logger = logger or logging.getLogger("discord_bot")
+    target = LATEST_VERSION if target is None else target
+    current = (await storage.fetchone("PRAGMA user_version"))[0]
+    if current > LATEST_VERSION:
+        raise RuntimeError(
+            f"A base de dados está na versão {current}, mais recente do que este código ({LATEST_VERSION})"
+        )
+
+    for migration in MIGRATIONS:
+        if not current < migration.version <= target:
+            continue
+
+        def op(connection: sqlite3.Connection, migration: Migration = migration) -> None:
+            for statement in migration.statements:
+                connection.execute(statement)
+            connection.execute(f"PRAGMA user_version = {migration.version}")
+
+        started = time.perf_counter()
+        await storage.write(op)
+        current = migration.version
+        logger.info(
+            f"Base de dados: migração {migration.version:04d}_{migration.name} aplicada "
+            f"em {time.perf_counter() - started:.2f}s"
+        )
+    return current
+
+
+def migrate_sync(connection: sqlite3.Connection, *, target: Optional[int] = None) -> int:
+    """O mesmo que `migrate`, numa ligação `sqlite3` normal (scripts e benchmarks)."""
+    target = LATEST_VERSION if target is None else target
+    current = connection.execute("PRAGMA user_version").fetchone()[0]
+    for migration in MIGRATIONS:
+        if not current < migration.version <= target:
+            continue
+        with connection:
+            if not connection.in_transaction:
+                connection.execute("BEGIN")  # o sqlite3 não abre transação para DDL
+            for statement in migration.statements:
+                connection.execute(statement)
+            connection.execute(f"PRAGMA user_version = {migration.version}")
+        current = migration.version
+    return current
@@ -0,0 +1,271 @@
+"""
+Tempo de todas as instruções SQL que passam pelo `Storage` e registo das lentas.
+
+As ligações do `Storage` (escritor e leitores) são `TimedConnection`: cada
+instrução é medida desde o execute até à última linha lida e entregue ao
+`QueryLog`, que junta os tempos por instrução normalizada (literais e
+listas `IN (?, ?, ...)` trocados por `?`). As que passam de `threshold`
+ficam registadas com a forma dos parâmetros e o `EXPLAIN QUERY PLAN`,
+tirado na hora na mesma ligação, e vão para o log (no máximo uma vez por
+minuto por instrução). É assim que aparecem os full scans
+(`SCAN warns`) à medida que as tabelas crescem.
+
+Os tempos chegam das threads do `Storage`, por isso o `QueryLog` tem um
+lock; a thread do event loop só lê (`top`, `recent`, /metrics).
+"""
+import functools
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from utils.metrics import MetricsRegistry
+
+# Strings e comentários numa só passagem: um "--" dentro de uma string não é comentário
+_STRING_OR_COMMENT = re.compile(r"'(?:[^']|'')*'|--[^\n]*|/\*.*?\*/", re.DOTALL)
+_WHITESPACE = re.compile(r"\s+")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)+\s*\)", re.IGNORECASE)
+# Só estas têm plano; BEGIN/COMMIT/PRAGMA/DDL não
+_EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "REPLACE")
+
+
+@functools.lru_cache(maxsize=2048)
+def normalize(sql: str) -> str:
+    """A instrução numa só linha, sem comentários e com os literais e as listas de parâmetros trocados por `?`."""
+    sql = _STRING_OR_COMMENT.sub(lambda match: "?" if match.group().startswith("'") else " ", sql)
+    sql = _WHITESPACE.sub(" ", sql).strip().rstrip(";").rstrip()
+    sql = _NUMBER.sub("?", sql)
+    return _IN_LIST.sub("IN (?...)", sql)
+
+
+def _type_name(value: Any) -> str:
+    return "null" if value is None else type(value).__name__
+
+
+def param_shape(params: Any, many: int = 0) -> str:
+    """Os tipos dos parâmetros, sem os valores: `(int, str)`, `{nome: int}`, `256 × (int, int)`."""
+    if isinstance(params, dict):
+        shape = "{" + ", ".join(f"{key}: {_type_name(value)}" for key, value in params.items()) + "}"
+    else:
+        shape = "(" + ", ".join(_type_name(value) for value in params or ()) + ")"
+    return f"{many} × {shape}" if many else shape
+
+
+class SlowQuery(NamedTuple):
+    at: float  # time.time()
+    statement: str
+    shape: str
+    seconds: float
+    plan: List[str]
+
+
+class StatementStats:
+    __slots__ = ("count", "total", "max", "slow", "window", "plan")
+
+    def __init__(self, window: int) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.slow = 0
+        self.window: Deque[float] = deque(maxlen=window)
+        self.plan: List[str] = []  # o da última vez que foi lenta
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def quantiles(self, *qs: float) -> Tuple[float, ...]:
+        ordered = sorted(self.window)
+        if not ordered:
+            return tuple(0.0 for _ in qs)
+        return tuple(ordered[min(len(ordered) - 1, int(q * len(ordered)))] for q in qs)
+
+
+class QueryLog:
+    def __init__(
+        self,
+        *,
+        threshold: float = 0.1,
+        window: int = 256,
+        recent: int = 100,
+        log_interval: float = 60.0,
+        metrics: Optional[MetricsRegistry] = None,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        self.threshold = threshold
+        self.window = window
+        self.log_interval = log_interval
+        self.logger = logger or logging.getLogger("discord_bot")
+        self.statements: Dict[str, StatementStats] = {}
+        self.recent: Deque[SlowQuery] = deque(maxlen=recent)
+        self._logged_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+        self._duration = self._slow = None
+        if metrics is not None:
+            self._duration = metrics.histogram(
+                "db_statement_duration_seconds",
+                "Duração de cada instrução SQL (execute + leitura das linhas), por instrução normalizada.",
+                ("statement",),
+                buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0),
+            )
+            self._slow = metrics.counter(
+                "db_slow_statements_total", "Instruções SQL acima do limite do registo de lentas.", ("statement",)
+            )
+
+    def record(
+        self, connection: sqlite3.Connection, sql: str, params: Any, seconds: float, many: int = 0
+    ) -> None:
+        statement = normalize(sql)
+        slow = seconds >= self.threshold
+        with self._lock:
+            stats = self.statements.get(statement)
+            if stats is None:
+                stats = self.statements[statement] = StatementStats(self.window)
+            stats.count += 1
+            stats.total += seconds
+            stats.window.append(seconds)
+            if seconds > stats.max:
+                stats.max = seconds
+            if self._duration is not None:
+                self._duration.observe(seconds, statement=statement[:160])
+            if not slow:
+                return
+            stats.slow += 1
+            if self._slow is not None:
+                self._slow.inc(statement=statement[:160])
+
+        # O plano fora do lock: é mais uma instrução, na ligação (e thread) de quem a correu
+        plan = explain(connection, sql, params)
+        shape = param_shape(params, many)
+        now = time.time()
+        with self._lock:
+            stats.plan = plan
+            self.recent.append(SlowQuery(now, statement, shape, seconds, plan))
+            if now - self._logged_at.get(statement, 0.0) < self.log_interval:
+                return
+            self._logged_at[statement] = now
+        self.logger.warning(
+            f"SQL lenta ({seconds * 1000:.0f} ms, {stats.slow}× acima de {self.threshold * 1000:.0f} ms): "
+            f"{statement[:500]} | parâmetros {shape} | plano: {' | '.join(plan) or '-'}"
+        )
+
+    def top(self, limit: int = 10, *, by: str = "total") -> List[Tuple[str, StatementStats]]:
+        """As instruções com mais tempo total (`by="total"`), maior máximo (`"max"`) ou mais lentas (`"slow"`)."""
+        with self._lock:
+            items = list(self.statements.items())
+        return sorted(items, key=lambda item: getattr(item[1], by), reverse=True)[:limit]
+
+    def clear(self) -> None:
+        with self._lock:
+            self.statements.clear()
+            self.recent.clear()
+            self._logged_at.clear()
+
+
+def explain(connection: sqlite3.Connection, sql: str, params: Any) -> List[str]:
+    if not sql.lstrip().upper().startswith(_EXPLAINABLE):
+        return []
+    # sqlite3.Cursor simples: o EXPLAIN não é medido nem volta a entrar no QueryLog
+    cursor = sqlite3.Cursor(connection)
+    try:
+        return [row[3] for row in cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params or ())]
+    except sqlite3.Error as e:
+        return [f"(sem plano: {e})"]
+    finally:
+        cursor.close()
+
+
+class TimedCursor(sqlite3.Cursor):
+    """Mede cada instrução, do execute até à última linha lida, e entrega-a ao QueryLog da ligação."""
+
+    _pending: Optional[list] = None  # [sql, parâmetros, segundos, linhas do executemany]
+
+    def execute(self, sql: str, parameters: Any = ()) -> "TimedCursor":
+        self._finish()
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._pending = [sql, parameters, time.perf_counter() - started, 0]
+
+    def executemany(self, sql: str, seq_of_parameters: Any) -> "TimedCursor":
+        self._finish()
+        rows = seq_of_parameters if isinstance(seq_of_parameters, Sequence) else list(seq_of_parameters)
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, rows)
+        finally:
+            self._pending = [sql, rows[0] if rows else (), time.perf_counter() - started, len(rows)]
+            self._finish()
+
+    def fetchone(self) -> Any:
+        started = time.perf_counter()
+        row = super().fetchone()
+        self._add(time.perf_counter() - started, row is None)
+        return row
+
+    def fetchmany(self, size: int = -1) -> list:
+        size = self.arraysize if size < 0 else size
+        started = time.perf_counter()
+        rows = super().fetchmany(size)
+        self._add(time.perf_counter() - started, len(rows) < size)
+        return rows
+
+    def fetchall(self) -> list:
+        started = time.perf_counter()
+        rows = super().fetchall()
+        self._add(time.perf_counter() - started, True)
+        return rows
+
+    def __next__(self) -> Any:
+        started = time.perf_counter()
+        try:
+            return super().__next__()
+        except StopIteration:
+            self._add(time.perf_counter() - started, True)
+            raise
+        finally:
+            if self._pending is not None:
+                self._pending[2] += time.perf_counter() - started
+
+    def close(self) -> None:
+        self._finish()
+        super().close()
+
+    def __del__(self) -> None:
+        self._finish()
+
+    def _add(self, seconds: float, done: bool) -> None:
+        if self._pending is not None:
+            self._pending[2] += seconds
+            if done:
+                self._finish()
+
+    def _finish(self) -> None:
+        pending, self._pending = self._pending, None
+        if pending is None:
+            return
+        log = getattr(self.connection, "query_log", None)
+        if log is not None:
+            sql, params, seconds, many = pending
+            log.record(self.connection, sql, params, seconds, many)
+
+
+class TimedConnection(sqlite3.Connection):
+    """`sqlite3.connect(..., factory=TimedConnection)`; depois `connection.query_log = QueryLog(...)`."""
+
+    query_log: Optional[QueryLog] = None
+
+    def cursor(self, factory: type = TimedCursor) -> sqlite3.Cursor:
+        return super().cursor(factory)
+
+    def execute(self, sql: str, parameters: Any = ()) -> sqlite3.Cursor:
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql: str, seq_of_parameters: Any) -> sqlite3.Cursor:
+        return self.cursor().executemany(sql, seq_of_parameters)
@@ -0,0 +1,412 @@
+import asyncio
+import concurrent.futures
+import contextlib
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, List, Optional, Sequence, Tuple, Union
+
+from database.querylog import QueryLog, TimedConnection
+from utils.metrics import MetricsRegistry
+
+WriteFn = Callable[[sqlite3.Connection], Any]
+BodyFn = Callable[["Transaction"], Awaitable[Any]]
+
+
+def _rowcount(connection: sqlite3.Connection, sql: str, params: Sequence[Any]) -> int:
+    cursor = connection.execute(sql, params)
+    try:
+        return cursor.rowcount
+    finally:
+        cursor.close()
+
+
+def _fetchone(connection: sqlite3.Connection, sql: str, params: Sequence[Any]) -> Optional[Tuple]:
+    cursor = connection.execute(sql, params)
+    try:
+        return cursor.fetchone()
+    finally:
+        cursor.close()  # um SELECT por acabar manteria a transação de leitura aberta
+
+
+def _fetchall(connection: sqlite3.Connection, sql: str, params: Sequence[Any]) -> List[Tuple]:
+    cursor = connection.execute(sql, params)
+    try:
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+class _WriteOp:
+    __slots__ = ("fn", "future", "queued_at")
+
+    def __init__(self, fn: Union[WriteFn, BodyFn], future: asyncio.Future) -> None:
+        self.fn = fn
+        self.future = future
+        self.queued_at = time.perf_counter()
+
+
+class _BodyOp(_WriteOp):
+    """O corpo de um `transaction()`: código async que vai usando o escritor."""
+
+    __slots__ = ()
+
+
+class _Rollback(Exception):
+    """O corpo de um `transaction()` falhou: desfaz o SAVEPOINT dessa operação."""
+
+
+class Transaction:
+    """A ligação do escritor durante um `Storage.transaction()`."""
+
+    __slots__ = ("_storage",)
+
+    def __init__(self, storage: "Storage") -> None:
+        self._storage = storage
+
+    async def execute(self, sql: str, params: Sequence[Any] = ()) -> int:
+        return await self._storage._on_writer(_rowcount, self._storage.writer, sql, params)
+
+    async def executemany(self, sql: str, params: Iterable[Sequence[Any]]) -> None:
+        await self._storage._on_writer(self._storage.writer.executemany, sql, list(params))
+
+    async def fetchone(self, sql: str, params: Sequence[Any] = ()) -> Optional[Tuple]:
+        return await self._storage._on_writer(_fetchone, self._storage.writer, sql, params)
+
+    async def fetchall(self, sql: str, params: Sequence[Any] = ()) -> List[Tuple]:
+        return await self._storage._on_writer(_fetchall, self._storage.writer, sql, params)
+
+
+class Storage:
+    """
+    Acesso ao SQLite em modo WAL: um único escritor e várias ligações só de leitura.
+
+    Com uma só ligação, cada leitura (`get_user` em cada `/trocas`, `/perfil`)
+    ficava na fila atrás das escritas e dos commits. Em WAL os leitores não
+    bloqueiam o escritor nem são bloqueados por ele, por isso as leituras vão
+    para um pool de threads, cada uma com a sua ligação `mode=ro`, e as
+    escritas para uma fila servida por uma única ligação, numa thread só dela.
+
+    O escritor faz group commit: junta todas as escritas que chegaram
+    enquanto o commit anterior corria numa só transação (cada uma no seu
+    SAVEPOINT, para que o erro de uma não desfaça as outras) e faz um único
+    commit. As escritas simples (`write`/`execute`) são funções síncronas e
+    um grupo inteiro, do BEGIN ao COMMIT, corre numa só ida à thread do
+    escritor; só os corpos de `transaction()` vão e vêm a cada instrução.
+    Cada escrita só volta depois do commit, por isso uma leitura feita a
+    seguir já vê o que foi escrito.
+
+    Com `path=":memory:"` não há leitores à parte: as leituras usam a ligação
+    do escritor.
+
+    Com `query_log` todas as ligações são `TimedConnection`: cada instrução
+    é medida e as lentas ficam registadas com o plano (database/querylog.py).
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        readers: int = 3,
+        max_batch: int = 256,
+        synchronous: str = "NORMAL",
+        busy_timeout: float = 5.0,
+        metrics: Optional[MetricsRegistry] = None,
+        logger: Optional[logging.Logger] = None,
+        query_log: Optional[QueryLog] = None,
+    ) -> None:
+        self.path = path
+        self.readers = 0 if path == ":memory:" else readers
+        self.max_batch = max_batch
+        self.synchronous = synchronous
+        self.busy_timeout = busy_timeout
+        self.logger = logger or logging.getLogger("discord_bot")
+        self.query_log = query_log
+        self.writer: Optional[sqlite3.Connection] = None
+        self._writer_thread: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._read_pool: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._local = threading.local()
+        self._reader_connections: List[sqlite3.Connection] = []
+        self._reader_lock = threading.Lock()
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.commits = 0
+        self.writes = 0
+
+        self._batch_size = self._wait = None
+        if metrics is not None:
+            self._batch_size = metrics.histogram(
+                "db_write_batch_ops",
+                "Escritas juntas em cada commit (group commit).",
+                buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+            )
+            self._wait = metrics.histogram(
+                "db_queue_wait_seconds",
+                "Tempo à espera de uma ligação (read) ou do commit do escritor (write).",
+                ("kind",),
+            )
+
+    def _connect(self, read_only: bool) -> sqlite3.Connection:
+        # isolation_level=None: as transações são abertas/fechadas à mão pelo escritor
+        factory = sqlite3.Connection if self.query_log is None else TimedConnection
+        if read_only:
+            connection = sqlite3.connect(
+                f"file:{self.path}?mode=ro", uri=True, isolation_level=None, check_same_thread=False, factory=factory
+            )
+            connection.execute("PRAGMA query_only = ON")
+        else:
+            connection = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False, factory=factory)
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute(f"PRAGMA synchronous = {self.synchronous}")
+        connection.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout * 1000)}")
+        if self.query_log is not None:
+            connection.query_log = self.query_log
+        return connection
+
+    async def open(self) -> "Storage":
+        self._writer_thread = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-writer")
+        self.writer = await self._on_writer(self._connect, False)
+        if self.readers:
+            self._read_pool = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.readers, thread_name_prefix="db-reader"
+            )
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run_writer())
+        return self
+
+    async def close(self) -> None:
+        """Espera pelas escritas que estão na fila e fecha todas as ligações."""
+        if self._task is not None:
+            await self._queue.put(None)
+            await self._task
+            self._task = None
+        if self._read_pool is not None:
+            await asyncio.to_thread(self._read_pool.shutdown)
+            self._read_pool = None
+        for connection in self._reader_connections:
+            connection.close()
+        self._reader_connections = []
+        if self.writer is not None:
+            await self._on_writer(self.writer.close)
+            self.writer = None
+        if self._writer_thread is not None:
+            self._writer_thread.shutdown()
+            self._writer_thread = None
+
+    def _on_writer(self, fn: Callable[..., Any], *args: Any) -> Awaitable[Any]:
+        return asyncio.get_running_loop().run_in_executor(self._writer_thread, fn, *args)
+
+    # ---------- leituras ----------
+    def _reader(self) -> sqlite3.Connection:
+        # uma ligação por thread do pool, aberta na primeira leitura
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = self._connect(read_only=True)
+            with self._reader_lock:
+                self._reader_connections.append(connection)
+        return connection
+
+    async def _read(self, fn: Callable[..., Any], sql: str, params: Sequence[Any]) -> Any:
+        if self._read_pool is None:
+            return await self._on_writer(fn, self.writer, sql, params)
+        queued_at = time.perf_counter()
+
+        def run() -> Tuple[float, Any]:
+            return time.perf_counter() - queued_at, fn(self._reader(), sql, params)
+
+        wait, result = await asyncio.get_running_loop().run_in_executor(self._read_pool, run)
+        if self._wait is not None:
+            self._wait.observe(wait, kind="read")
+        return result
+
+    async def fetchone(self, sql: str, params: Sequence[Any] = ()) -> Optional[Tuple]:
+        return await self._read(_fetchone, sql, params)
+
+    async def fetchall(self, sql: str, params: Sequence[Any] = ()) -> List[Tuple]:
+        return await self._read(_fetchall, sql, params)
+
+    # ---------- escritas ----------
+    def _submit(self, op: _WriteOp) -> asyncio.Future:
+        if self._task is None:
+            raise RuntimeError("Storage.open() ainda não foi chamado")
+        self._queue.put_nowait(op)
+        return op.future
+
+    async def write(self, fn: WriteFn) -> Any:
+        """
+        Corre `fn(ligação)` na thread do escritor, dentro da transação do
+        próximo grupo, e devolve o resultado depois do commit. `fn` é síncrona
+        e não deve fazer commit.
+        """
+        return await self._submit(_WriteOp(fn, asyncio.get_running_loop().create_future()))
+
+    async def execute(self, sql: str, params: Sequence[Any] = ()) -> int:
+        """Uma instrução de escrita. Devolve o número de linhas alteradas."""
+        return await self.write(lambda connection: _rowcount(connection, sql, params))
+
+    async def execute_returning(self, sql: str, params: Sequence[Any] = ()) -> List[Tuple]:
+        """Uma instrução com `RETURNING`: devolve as linhas, já depois do commit."""
+        return await self.write(lambda connection: _fetchall(connection, sql, params))
+
+    async def executemany(self, sql: str, params: Iterable[Sequence[Any]]) -> None:
+        rows = list(params)
+
+        def op(connection: sqlite3.Connection) -> None:
+            connection.executemany(sql, rows)
+
+        await self.write(op)
+
+    @contextlib.asynccontextmanager
+    async def transaction(self) -> AsyncIterator[Transaction]:
+        """
+        `async with storage.transaction() as tx:` lê e escreve no escritor, numa
+        só operação do grupo: ou fica tudo gravado (no commit do grupo, antes
+        de o `async with` terminar) ou, se o corpo levantar uma exceção, nada.
+
+        Enquanto o corpo corre o escritor está ocupado: lá dentro só se usa o
+        `tx` (nunca `self.write()`/`execute()`, que ficariam à espera dele) e
+        não se espera por mais nada (HTTP, Discord).
+        """
+        loop = asyncio.get_running_loop()
+        ready: asyncio.Future = loop.create_future()
+        body_done: asyncio.Future = loop.create_future()
+
+        async def body(tx: Transaction) -> None:
+            if ready.cancelled():
+                raise _Rollback()  # quem pediu a transação desistiu antes de ela começar
+            ready.set_result(tx)
+            if await body_done:
+                raise _Rollback()
+
+        write = asyncio.ensure_future(self._submit(_BodyOp(body, loop.create_future())))
+        try:
+            await asyncio.wait((ready, write), return_when=asyncio.FIRST_COMPLETED)
+            if not ready.done():
+                await write  # falhou antes de começar (ex. BEGIN): levanta o erro
+            try:
+                yield ready.result()
+            except BaseException:
+                body_done.set_result(True)
+                with contextlib.suppress(_Rollback):
+                    await write
+                raise
+            body_done.set_result(False)
+            await write
+        finally:
+            # cancelado à espera da vez: o escritor não pode ficar preso nesta operação
+            ready.cancel()
+            if not body_done.done():
+                body_done.set_result(True)
+            if not write.done():
+                write.cancel()
+
+    async def _run_writer(self) -> None:
+        closing = False
+        while not closing:
+            op = await self._queue.get()
+            if op is None:
+                break
+            batch = [op]
+            # junta o que chegou entretanto (enquanto o commit anterior corria)
+            while len(batch) < self.max_batch and not self._queue.empty():
+                op = self._queue.get_nowait()
+                if op is None:
+                    closing = True
+                    break
+                batch.append(op)
+            await self._commit_batch(batch)
+
+    def _apply(self, ops: List[_WriteOp], begin: bool, commit: bool) -> List[Tuple[_WriteOp, bool, Any]]:
+        """Na thread do escritor: as operações síncronas seguidas, cada uma no seu SAVEPOINT."""
+        writer = self.writer
+        if begin:
+            writer.execute("BEGIN IMMEDIATE")
+        results = []
+        for op in ops:
+            writer.execute("SAVEPOINT op")
+            try:
+                results.append((op, True, op.fn(writer)))
+            except Exception as e:
+                writer.execute("ROLLBACK TO op")
+                results.append((op, False, e))
+            writer.execute("RELEASE op")
+        if commit:
+            writer.execute("COMMIT")
+        return results
+
+    async def _run_body(self, op: _BodyOp, begin: bool, commit: bool) -> Tuple[_WriteOp, bool, Any]:
+        writer = self.writer
+        if begin:
+            await self._on_writer(writer.execute, "BEGIN IMMEDIATE")
+        await self._on_writer(writer.execute, "SAVEPOINT op")
+        try:
+            result = (op, True, await op.fn(Transaction(self)))
+        except Exception as e:
+            await self._on_writer(writer.execute, "ROLLBACK TO op")
+            result = (op, False, e)
+        await self._on_writer(writer.execute, "RELEASE op")
+        if commit:
+            await self._on_writer(writer.execute, "COMMIT")
+        return result
+
+    def _rollback(self) -> None:
+        if self.writer.in_transaction:
+            self.writer.execute("ROLLBACK")
+
+    async def _commit_batch(self, batch: List[_WriteOp]) -> None:
+        batch = [op for op in batch if not op.future.cancelled()]
+        if not batch:
+            return
+
+        # operações síncronas seguidas vão juntas à thread do escritor
+        segments: List[Union[List[_WriteOp], _BodyOp]] = []
+        for op in batch:
+            if isinstance(op, _BodyOp):
+                segments.append(op)
+            elif segments and isinstance(segments[-1], list):
+                segments[-1].append(op)
+            else:
+                segments.append([op])
+
+        results: List[Tuple[_WriteOp, bool, Any]] = []
+        try:
+            for i, segment in enumerate(segments):
+                begin, commit = i == 0, i == len(segments) - 1
+                if isinstance(segment, list):
+                    results.extend(await self._on_writer(self._apply, segment, begin, commit))
+                else:
+                    results.append(await self._run_body(segment, begin, commit))
+        except Exception as e:
+            # falhou o BEGIN/COMMIT (disco cheio, base de dados bloqueada): nada ficou gravado
+            self.logger.error(f"Falha no commit de {len(batch)} escritas: {e}")
+            await self._on_writer(self._rollback)
+            for op in batch:
+                if not op.future.done():
+                    op.future.set_exception(e)
+            return
+
+        self.commits += 1
+        self.writes += len(results)
+        now = time.perf_counter()
+        if self._batch_size is not None:
+            self._batch_size.observe(len(batch))
+        for op, ok, value in results:
+            if self._wait is not None:
+                self._wait.observe(now - op.queued_at, kind="write")
+            if op.future.done():
+                continue
+            if ok:
+                op.future.set_result(value)
+            else:
+                op.future.set_exception(value)
+
+    def stats(self) -> dict:
+        return {
+            "readers": self.readers,
+            "reader_connections": len(self._reader_connections),
+            "queued_writes": self._queue.qsize() if self._queue is not None else 0,
+            "commits": self.commits,
+            "writes": self.writes,
+            "writes_per_commit": self.writes / self.commits if self.commits else 0.0,
+        }
@@ -0,0 +1,75 @@
+"""Ciclo completo das cópias de segurança (database/backup.py) numa base de dados pequena."""
+import asyncio
+import os
+import sqlite3
+
+import pytest
+
+from database import backup
+
+
+def _create_database(path: str) -> None:
+    connection = sqlite3.connect(path)
+    with connection:
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("CREATE TABLE users (discord_id INTEGER PRIMARY KEY, username TEXT, xp INTEGER)")
+        connection.execute("CREATE TABLE warns (id INTEGER PRIMARY KEY, user_id INTEGER, reason TEXT)")
+        connection.executemany(
+            "INSERT INTO users VALUES (?, ?, ?)", ((i, f"user{i}", i * 7) for i in range(200))
+        )
+        connection.executemany(
+            "INSERT INTO warns (user_id, reason) VALUES (?, ?)", ((i % 20, f"aviso {i}") for i in range(50))
+        )
+    connection.close()
+
+
+def _dump(path: str) -> list:
+    connection = sqlite3.connect(path)
+    try:
+        return list(connection.iterdump())
+    finally:
+        connection.close()
+
+
+@pytest.fixture
+def database_path(tmp_path) -> str:
+    path = str(tmp_path / "database.db")
+    _create_database(path)
+    return path
+
+
+def test_snapshot_verify_restore(database_path, tmp_path):
+    manager = backup.BackupManager(database_path, str(tmp_path / "backups"), step_sleep=0, pages=1)
+    result = asyncio.run(manager.run())
+    assert manager.backups() == [result.path]
+    assert result.pages > 1  # copiada em vários passos
+
+    info = backup.verify(result.path)
+    assert info.tables == {"users": 200, "warns": 50}
+
+    original = _dump(database_path)
+    connection = sqlite3.connect(database_path)
+    with connection:
+        connection.execute("DELETE FROM warns")
+        connection.execute("UPDATE users SET xp = 0")
+    connection.close()
+    assert _dump(database_path) != original
+
+    backup.restore(result.path, database_path)
+    assert _dump(database_path) == original
+
+
+def test_backup_never_overwrites(database_path, tmp_path, monkeypatch):
+    manager = backup.BackupManager(database_path, str(tmp_path / "backups"), step_sleep=0)
+    first = asyncio.run(manager.run())
+    second = asyncio.run(manager.run())
+    assert first.path != second.path
+    assert manager.backups() == [first.path, second.path]
+
+    # Se o nome já existir, a cópia nova falha e a antiga fica como estava
+    monkeypatch.setattr(backup, "backup_name", lambda when: os.path.basename(first.path))
+    before = os.stat(first.path)
+    with pytest.raises(FileExistsError):
+        asyncio.run(manager.run())
+    assert os.stat(first.path) == before
+    assert manager.backups() == [first.path, second.path]
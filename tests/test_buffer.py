@@ -0,0 +1,75 @@
+"""CommandUsageBuffer (database/buffer.py): nada se perde quando um flush é interrompido."""
+import asyncio
+
+from database.buffer import CommandUsageBuffer
+
+
+class SlowDatabase:
+    """Faz de DatabaseManager: cada flush_command_usage só termina quando `release` é chamado."""
+
+    def __init__(self, fail: bool = False) -> None:
+        self.fail = fail
+        self.usage = {}
+        self.started = asyncio.Event()
+        self._release = asyncio.Event()
+
+    def release(self) -> None:
+        self._release.set()
+
+    async def flush_command_usage(self, usage, history=None) -> None:
+        self.started.set()
+        await self._release.wait()
+        if self.fail:
+            raise RuntimeError("disco cheio")
+        for key, count in usage.items():
+            self.usage[key] = self.usage.get(key, 0) + count
+
+
+def test_close_during_periodic_flush_keeps_counters():
+    async def scenario():
+        database = SlowDatabase()
+        buffer = CommandUsageBuffer(database, flush_interval=0.01)
+        buffer.start()
+        buffer.add(1, "ping", count=3)
+        buffer.add(2, "help")
+        await database.started.wait()  # o timer está a meio do flush
+
+        closing = asyncio.create_task(buffer.close())
+        await asyncio.sleep(0.05)
+        database.release()
+        await closing
+        return database.usage
+
+    assert asyncio.run(scenario()) == {(1, "ping"): 3, (2, "help"): 1}
+
+
+def test_cancelled_flush_still_writes_once():
+    async def scenario():
+        database = SlowDatabase()
+        buffer = CommandUsageBuffer(database)
+        buffer.add(1, "ping", count=2)
+        flush = asyncio.create_task(buffer.flush())
+        await database.started.wait()
+        flush.cancel()
+        await asyncio.sleep(0)
+        database.release()
+        await buffer.close()
+        return database.usage, len(buffer)
+
+    assert asyncio.run(scenario()) == ({(1, "ping"): 2}, 0)
+
+
+def test_failed_write_after_cancel_returns_counters_to_buffer():
+    async def scenario():
+        database = SlowDatabase(fail=True)
+        buffer = CommandUsageBuffer(database)
+        buffer.add(1, "ping", count=2)
+        flush = asyncio.create_task(buffer.flush())
+        await database.started.wait()
+        flush.cancel()
+        await asyncio.sleep(0)
+        database.release()
+        await asyncio.sleep(0.01)
+        return buffer._pending
+
+    assert asyncio.run(scenario()) == {(1, "ping"): 2}
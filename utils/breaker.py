@@ -0,0 +1,147 @@
+"""
+Circuit breaker por host externo, usado pelo `HTTPClient`.
+
+Cada host tem uma janela com o resultado dos últimos pedidos. Quando a
+proporção de falhas (erros de ligação, timeouts, 5xx ou pedidos mais lentos
+que `slow_call`) passa do limite, o circuito abre: durante `open_for`
+segundos os pedidos para esse host falham logo com `CircuitOpenError`, sem
+abrir sockets nem ficar à espera do timeout. Depois o `HTTPClient` faz um
+pedido de teste em background (half-open): se correr bem o circuito fecha,
+se não volta a abrir, com o dobro do tempo (até `max_open_for`).
+
+Sem um GET para repetir (ex. um host que só recebe POSTs), o próximo pedido
+real serve de teste. Um teste que não chega a dar resultado (cancelado pelo
+comando, ou perdido) não prende o circuito em half-open: o cancelamento põe-no
+outra vez aberto, e ao fim de `trial_timeout` segundos sem resultado o pedido
+seguinte passa a ser o teste.
+"""
+import collections
+import time
+from typing import Deque, Dict, Optional, Tuple
+
+import aiohttp
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+
+# valor do gauge http_circuit_state
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(aiohttp.ClientConnectionError):
+    """
+    O host está com o circuito aberto. É uma `aiohttp.ClientError`, por isso
+    os cogs tratam-na como qualquer outra falha de rede.
+    """
+
+    def __init__(self, host: str, retry_after: float) -> None:
+        super().__init__(f"{host} indisponível (circuito aberto, nova tentativa em {retry_after:.0f}s)")
+        self.host = host
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        host: str,
+        *,
+        window: int = 20,
+        min_calls: int = 5,
+        failure_rate: float = 0.5,
+        slow_call: float = 10.0,
+        open_for: float = 30.0,
+        max_open_for: float = 300.0,
+        trial_timeout: float = 60.0,
+    ) -> None:
+        self.host = host
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call = slow_call
+        self.base_open_for = open_for
+        self.max_open_for = max_open_for
+        self.trial_timeout = trial_timeout
+        self.open_for = open_for
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.half_opened_at = 0.0
+        self.rejected = 0
+        self._trial = False
+        # o HTTPClient tem um pedido de teste agendado em background
+        self.probing = False
+        # (falhou?, duração) dos últimos `window` pedidos
+        self.calls: Deque[Tuple[bool, float]] = collections.deque(maxlen=window)
+        # último GET feito a este host: é repetido como pedido de teste
+        self.probe: Optional[Tuple[str, dict]] = None
+
+    @property
+    def retry_after(self) -> float:
+        return max(0.0, self.opened_at + self.open_for - time.monotonic())
+
+    def check(self) -> None:
+        """Antes de cada pedido: levanta `CircuitOpenError` se o circuito não estiver fechado."""
+        if self.state == CLOSED:
+            return
+        if self.state == OPEN and not self.probing and not self.retry_after:
+            # Sem pedido de teste em background: o próximo pedido real serve de teste
+            self._start_trial()
+            return
+        if self.state == HALF_OPEN and time.monotonic() - self.half_opened_at >= self.trial_timeout:
+            # O teste anterior nunca deu resultado: este pedido fica com o lugar
+            self._start_trial()
+            return
+        self.rejected += 1
+        raise CircuitOpenError(self.host, self.retry_after)
+
+    def record(self, failed: bool, duration: float) -> Optional[str]:
+        """Regista um pedido. Devolve o novo estado se o circuito mudou."""
+        failed = failed or duration >= self.slow_call
+        if self._trial:
+            self._trial = False
+            return self.probe_result(not failed)
+        self.calls.append((failed, duration))
+        if self.state != CLOSED or len(self.calls) < self.min_calls:
+            return None
+        failures = sum(1 for f, _ in self.calls if f)
+        if failures / len(self.calls) >= self.failure_rate:
+            self._open()
+            return OPEN
+        return None
+
+    def _start_trial(self) -> None:
+        self.half_open()
+        self._trial = True
+
+    def abandon_trial(self) -> None:
+        """O pedido de teste foi cancelado sem resultado: volta a aberto e o próximo pedido é o teste."""
+        if self._trial:
+            self._trial = False
+            self.state = OPEN
+
+    def half_open(self) -> None:
+        self.state = HALF_OPEN
+        self.half_opened_at = time.monotonic()
+
+    def probe_result(self, ok: bool) -> str:
+        """Resultado do pedido de teste. Devolve o novo estado."""
+        if ok:
+            self.state = CLOSED
+            self.open_for = self.base_open_for
+            self.calls.clear()
+        else:
+            self.open_for = min(self.open_for * 2, self.max_open_for)
+            self._open()
+        return self.state
+
+    def _open(self) -> None:
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+
+    def stats(self) -> Dict[str, float]:
+        failures = sum(1 for f, _ in self.calls if f)
+        durations = sorted(d for _, d in self.calls)
+        return {
+            "calls": len(self.calls),
+            "failure_rate": failures / len(self.calls) if self.calls else 0.0,
+            "p50": durations[len(durations) // 2] if durations else 0.0,
+        }
@@ -0,0 +1,131 @@
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+
+class CacheEntry:
+    __slots__ = ("endpoint", "stored_at", "status", "body")
+
+    def __init__(self, endpoint: str, stored_at: float, status: int, body: Any) -> None:
+        self.endpoint = endpoint
+        self.stored_at = stored_at
+        self.status = status
+        self.body = body
+
+
+class CacheStats:
+    __slots__ = ("hits", "stale_hits", "misses")
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    @property
+    def ratio(self) -> float:
+        total = self.hits + self.stale_hits + self.misses
+        return (self.hits + self.stale_hits) / total if total else 0.0
+
+
+class ResponseCache:
+    """
+    Cache LRU das respostas do `HTTPClient`, indexada por método + URL + params.
+
+    O TTL não fica guardado na entrada: é indicado em cada chamada a
+    `HTTPClient.fetch(cache_ttl=..., stale_ttl=...)`, por isso mudar o TTL de um
+    endpoint também se aplica ao que já está em cache. As chaves são hashes
+    para que segredos passados nos params (API keys) não acabem no disco.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 512,
+        path: Optional[str] = None,
+        max_age: float = 7 * 24 * 3600,
+    ) -> None:
+        self.max_entries = max_entries
+        self.path = path
+        self.max_age = max_age
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self.stats: Dict[str, CacheStats] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def make_key(method: str, url: str, params: Any = None, read: str = "json") -> str:
+        if isinstance(params, dict):
+            params = sorted((str(k), str(v)) for k, v in params.items())
+        raw = json.dumps([method.upper(), url, params, read], default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def endpoint(url: str) -> str:
+        parts = urlsplit(url)
+        return f"{parts.netloc}{parts.path}"
+
+    def record(self, endpoint: str, outcome: str) -> None:
+        stats = self.stats.setdefault(endpoint, CacheStats())
+        setattr(stats, outcome, getattr(stats, outcome) + 1)
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key: str, endpoint: str, status: int, body: Any) -> None:
+        self._entries[key] = CacheEntry(endpoint, time.time(), status, body)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.stats.clear()
+
+    # ---------- persistência ----------
+    def load(self) -> int:
+        """Carrega as entradas guardadas em disco. Devolve quantas foram carregadas."""
+        if not self.path or not os.path.exists(self.path):
+            return 0
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return 0
+
+        now = time.time()
+        entries = sorted(data.get("entries", []), key=lambda e: e["stored_at"])
+        for e in entries[-self.max_entries:]:
+            if now - e["stored_at"] > self.max_age:
+                continue
+            self._entries[e["key"]] = CacheEntry(e["endpoint"], e["stored_at"], e["status"], e["body"])
+        return len(self._entries)
+
+    def save(self) -> int:
+        """Grava as entradas em disco (exceto respostas binárias). Devolve quantas foram gravadas."""
+        if not self.path:
+            return 0
+
+        entries = [
+            {
+                "key": key,
+                "endpoint": entry.endpoint,
+                "stored_at": entry.stored_at,
+                "status": entry.status,
+                "body": entry.body,
+            }
+            for key, entry in self._entries.items()
+            if not isinstance(entry.body, (bytes, bytearray))
+        ]
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "entries": entries}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        return len(entries)
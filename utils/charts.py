@@ -0,0 +1,68 @@
+"""
+Gráficos pequenos gerados localmente, sem dependências (/stats).
+
+`sparkline` devolve uma série como texto (▁▂▃▄▅▆▇█), para pôr num embed;
+`heatmap_png` desenha uma grelha (ex. dia da semana × hora) num PNG, escrito
+à mão com zlib, para mandar como anexo sem pedir nada a um serviço externo
+nem instalar Pillow/matplotlib.
+"""
+import struct
+import zlib
+from typing import Sequence, Tuple
+
+SPARK_BLOCKS = "▁▂▃▄▅▆▇█"
+
+# Do vazio ao máximo (a cor do embed do /stats), sobre o fundo escuro do Discord
+BACKGROUND = (24, 25, 28)
+LOW_COLOR = (32, 34, 37)
+HIGH_COLOR = (0, 255, 0)
+
+
+def sparkline(values: Sequence[int]) -> str:
+    """Uma linha de blocos, com a altura de cada valor relativa ao máximo."""
+    top = max(values, default=0)
+    if top <= 0:
+        return SPARK_BLOCKS[0] * len(values)
+    last = len(SPARK_BLOCKS) - 1
+    return "".join(SPARK_BLOCKS[min(last, -(-value * last // top))] for value in values)
+
+
+def _chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+
+def _blend(low: Tuple[int, int, int], high: Tuple[int, int, int], t: float) -> bytes:
+    return bytes(round(a + (b - a) * t) for a, b in zip(low, high))
+
+
+def heatmap_png(grid: Sequence[Sequence[int]], *, cell: int = 16, gap: int = 2) -> bytes:
+    """
+    PNG (RGB) com uma célula por valor da grelha, mais clara quanto maior o
+    valor. As linhas da grelha são as linhas da imagem.
+    """
+    rows = len(grid)
+    columns = max((len(row) for row in grid), default=0)
+    top = max((value for row in grid for value in row), default=0)
+    pitch = cell + gap
+    width, height = columns * pitch + gap, rows * pitch + gap
+
+    background = bytes(BACKGROUND)
+    raw = bytearray()
+    gap_line = b"\x00" + background * width
+    for row in grid:
+        line = bytearray(background * gap)
+        for column in range(columns):
+            value = row[column] if column < len(row) else 0
+            # raiz quadrada: as horas calmas não desaparecem ao lado dos picos
+            color = _blend(LOW_COLOR, HIGH_COLOR, (value / top) ** 0.5 if top and value > 0 else 0.0)
+            line += color * cell + background * gap
+        raw += gap_line * gap + (b"\x00" + bytes(line)) * cell
+    raw += gap_line * gap
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + _chunk(b"IHDR", header)
+        + _chunk(b"IDAT", zlib.compress(bytes(raw), 9))
+        + _chunk(b"IEND", b"")
+    )
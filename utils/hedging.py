@@ -0,0 +1,98 @@
+"""
+Pedidos "hedged" para endpoints com cauda de latência longa.
+
+Com `HTTPClient.fetch(..., hedge=True)`, se o primeiro pedido não tiver
+resposta ao fim do p90 observado para esse endpoint, é enviado um segundo
+pedido igual; fica a primeira resposta que chegar e o outro é cancelado.
+Só compensa em GETs idempotentes que devolvem um item (os comandos de
+conteúdo aleatório), onde a lentidão vem de cold starts e não da carga.
+
+O orçamento por endpoint é um token bucket: cada pedido acrescenta `budget`
+tokens (ex. 0.1) e cada hedge gasta um, por isso os pedidos extra nunca
+passam de `budget` x pedidos (mais uma pequena reserva para rajadas).
+"""
+import collections
+from typing import Deque, Dict, Optional
+
+from utils.metrics import MetricsRegistry
+
+
+class EndpointHedging:
+    __slots__ = ("latencies", "tokens", "requests", "hedged", "hedge_wins")
+
+    def __init__(self, window: int) -> None:
+        self.latencies: Deque[float] = collections.deque(maxlen=window)
+        self.tokens = 0.0
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+
+class HedgingPolicy:
+    def __init__(
+        self,
+        *,
+        budget: float = 0.1,
+        min_samples: int = 20,
+        min_delay: float = 0.05,
+        quantile: float = 0.9,
+        window: int = 200,
+        burst: float = 3.0,
+        metrics: Optional[MetricsRegistry] = None,
+    ) -> None:
+        self.budget = budget
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.quantile = quantile
+        self.window = window
+        self.burst = burst
+        self.endpoints: Dict[str, EndpointHedging] = {}
+        self._hedges = None
+        if metrics is not None:
+            self._hedges = metrics.counter(
+                "http_hedged_requests_total",
+                "Pedidos hedged por endpoint: fired (segundo pedido enviado), won (o segundo ganhou), "
+                "skipped (sem orçamento).",
+                ("endpoint", "outcome"),
+            )
+
+    def _endpoint(self, endpoint: str) -> EndpointHedging:
+        state = self.endpoints.get(endpoint)
+        if state is None:
+            state = self.endpoints[endpoint] = EndpointHedging(self.window)
+        return state
+
+    def delay(self, endpoint: str) -> Optional[float]:
+        """
+        Chamado no início de cada pedido: devolve quanto esperar antes do hedge,
+        ou None se ainda não houver amostras suficientes para saber o p90.
+        """
+        state = self._endpoint(endpoint)
+        state.requests += 1
+        state.tokens = min(state.tokens + self.budget, self.burst)
+        if len(state.latencies) < self.min_samples:
+            return None
+        ordered = sorted(state.latencies)
+        return max(self.min_delay, ordered[min(len(ordered) - 1, int(self.quantile * len(ordered)))])
+
+    def acquire(self, endpoint: str) -> bool:
+        """Gasta um token para enviar o segundo pedido. False = orçamento esgotado."""
+        state = self._endpoint(endpoint)
+        if state.tokens < 1.0:
+            self._count(endpoint, "skipped")
+            return False
+        state.tokens -= 1.0
+        state.hedged += 1
+        self._count(endpoint, "fired")
+        return True
+
+    def observe(self, endpoint: str, seconds: float) -> None:
+        self._endpoint(endpoint).latencies.append(seconds)
+
+    def won(self, endpoint: str) -> None:
+        self._endpoint(endpoint).hedge_wins += 1
+        self._count(endpoint, "won")
+
+    def _count(self, endpoint: str, outcome: str) -> None:
+        if self._hedges is not None:
+            self._hedges.inc(endpoint=endpoint, outcome=outcome)
@@ -0,0 +1,424 @@
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Set
+
+import aiohttp
+from yarl import URL
+
+from utils.breaker import OPEN, STATE_VALUES, CircuitBreaker, CircuitOpenError
+from utils.cache import ResponseCache
+from utils.hedging import HedgingPolicy
+from utils.metrics import MetricsRegistry
+from utils.singleflight import SingleFlight
+
+USER_AGENT = "DebocheBot/1.0.0"
+
+
+@dataclass
+class HTTPResponse:
+    """Resposta já lida de um pedido feito com `HTTPClient.fetch`."""
+
+    status: int
+    body: Any
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 300
+
+
+class HTTPClient:
+    """
+    Cliente HTTP partilhado por todo o bot (`bot.http_client`).
+
+    Mantém uma única `aiohttp.ClientSession` com pools keep-alive por host e
+    cache de DNS, para que os cogs não abram uma ligação TCP+TLS nova em cada
+    comando. É iniciado no `setup_hook` e fechado no `close()` do bot.
+    """
+
+    def __init__(
+        self,
+        *,
+        timeout: float = 30.0,
+        connect_timeout: float = 10.0,
+        limit: int = 100,
+        limit_per_host: int = 10,
+        dns_ttl: int = 300,
+        keepalive_timeout: float = 30.0,
+        cache: Optional[ResponseCache] = None,
+        logger: Optional[logging.Logger] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        json_loads: Callable[[Any], Any] = json.loads,
+        json_dumps: Callable[[Any], str] = json.dumps,
+        circuit_breaker: bool = True,
+        breaker_settings: Optional[Dict[str, float]] = None,
+        probe_timeout: float = 10.0,
+        hedge_settings: Optional[Dict[str, float]] = None,
+    ) -> None:
+        self.timeout = aiohttp.ClientTimeout(total=timeout, connect=connect_timeout)
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_ttl = dns_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.cache = cache if cache is not None else ResponseCache()
+        self.logger = logger or logging.getLogger("discord_bot")
+        # codec JSON do perfil de runtime (utils/runtime.py)
+        self.json_loads = json_loads
+        self.json_dumps = json_dumps
+        self._session: Optional[aiohttp.ClientSession] = None
+        # GETs iguais em curso partilham o mesmo pedido; os cogs também o podem
+        # usar para partilhar resultados já processados (ver `fetch` e o /epstein)
+        self.flights = SingleFlight("http", metrics=metrics)
+        self._revalidating: Set[str] = set()
+        self._background: Set[asyncio.Task] = set()
+        # Um circuit breaker por host (utils/breaker.py)
+        self.circuit_breaker = circuit_breaker
+        self.breaker_settings = breaker_settings or {}
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.probe_timeout = aiohttp.ClientTimeout(total=probe_timeout)
+        # fetch(hedge=True): segundo pedido se o primeiro passar do p90 (utils/hedging.py)
+        self.hedging = HedgingPolicy(**(hedge_settings or {}), metrics=metrics)
+        self.metrics = metrics
+        if metrics is not None:
+            self.upstream_duration = metrics.histogram(
+                "http_upstream_duration_seconds",
+                "Tempo até aos headers da resposta, por host externo.",
+                ("host", "status"),
+            )
+            self.upstream_errors = metrics.counter(
+                "http_upstream_errors_total", "Pedidos externos que falharam sem resposta.", ("host", "error")
+            )
+            # o /cache limpar recomeça os contadores: para o Prometheus é um reset, como um restart
+            cache_requests = metrics.counter(
+                "http_cache_requests_total", "Pedidos com cache_ttl, por endpoint e resultado.", ("endpoint", "outcome")
+            )
+            cache_requests.set_function(self._cache_samples)
+            circuit_state = metrics.gauge(
+                "http_circuit_state", "Estado do circuit breaker por host (0 fechado, 1 half-open, 2 aberto).", ("host",)
+            )
+            circuit_state.set_function(
+                lambda: {(host,): STATE_VALUES[b.state] for host, b in self.breakers.items()}
+            )
+            self.circuit_rejected = metrics.counter(
+                "http_circuit_rejected_total", "Pedidos recusados logo por o circuito estar aberto.", ("host",)
+            )
+            self.circuit_transitions = metrics.counter(
+                "http_circuit_transitions_total", "Mudanças de estado do circuit breaker.", ("host", "state")
+            )
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            raise RuntimeError("O HTTPClient ainda não foi iniciado")
+        return self._session
+
+    async def start(self) -> None:
+        if self._session is not None and not self._session.closed:
+            return
+
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            ttl_dns_cache=self.dns_ttl,
+            keepalive_timeout=self.keepalive_timeout,
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=self.timeout,
+            headers={"User-Agent": USER_AGENT},
+            json_serialize=self.json_dumps,
+            trace_configs=[self._trace_config()],
+        )
+        loaded = await asyncio.to_thread(self.cache.load)
+        if loaded:
+            self.logger.info(f"Cache HTTP: {loaded} respostas carregadas do disco")
+
+    async def close(self) -> None:
+        for task in list(self._background):
+            task.cancel()
+        try:
+            await asyncio.to_thread(self.cache.save)
+        except OSError as e:
+            self.logger.warning(f"Não foi possível gravar a cache HTTP: {e}")
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        # Mede todos os pedidos da sessão, incluindo os "crus" (request/get/post)
+        loop = asyncio.get_running_loop()
+
+        async def on_request_start(session, ctx, params):
+            ctx.started = loop.time()
+
+        async def on_request_end(session, ctx, params):
+            elapsed = loop.time() - ctx.started
+            host = params.url.host or "-"
+            status = params.response.status
+            self._record_outcome(host, status >= 500 or status == 429, elapsed)
+            if self.metrics is not None:
+                self.upstream_duration.observe(elapsed, host=host, status=f"{status // 100}xx")
+
+        async def on_request_exception(session, ctx, params):
+            host = params.url.host or "-"
+            if isinstance(params.exception, asyncio.CancelledError):
+                # quem cancelou foi o comando, não o host; se era o pedido de teste, fica para o próximo
+                breaker = self.breakers.get(host)
+                if breaker is not None:
+                    breaker.abandon_trial()
+                return
+            self._record_outcome(host, True, loop.time() - ctx.started)
+            if self.metrics is not None:
+                self.upstream_errors.inc(host=host, error=type(params.exception).__name__)
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_request_end.append(on_request_end)
+        trace_config.on_request_exception.append(on_request_exception)
+        return trace_config
+
+    def _cache_samples(self):
+        return {
+            (endpoint, outcome): getattr(stats, outcome)
+            for endpoint, stats in self.cache.stats.items()
+            for outcome in ("hits", "stale_hits", "misses")
+        }
+
+    # ---------- circuit breaker ----------
+    def _breaker(self, host: str) -> CircuitBreaker:
+        breaker = self.breakers.get(host)
+        if breaker is None:
+            breaker = self.breakers[host] = CircuitBreaker(host, **self.breaker_settings)
+        return breaker
+
+    def _check_circuit(self, method: str, url: str, kwargs: dict) -> None:
+        host = URL(url).host or "-"
+        breaker = self._breaker(host)
+        try:
+            breaker.check()
+        except CircuitOpenError:
+            if self.metrics is not None:
+                self.circuit_rejected.inc(host=host)
+            raise
+        if method.upper() == "GET":
+            breaker.probe = (url, {k: kwargs[k] for k in ("params", "headers", "ssl") if k in kwargs})
+
+    def _record_outcome(self, host: str, failed: bool, elapsed: float) -> None:
+        breaker = self.breakers.get(host)
+        if breaker is None:
+            return
+        new_state = breaker.record(failed, elapsed)
+        if new_state is not None:
+            self._circuit_changed(breaker, new_state)
+
+    def _circuit_changed(self, breaker: CircuitBreaker, state: str) -> None:
+        if self.metrics is not None:
+            self.circuit_transitions.inc(host=breaker.host, state=state)
+        if state != OPEN:
+            self.logger.info(f"Circuito de {breaker.host} fechado: o serviço voltou a responder")
+            return
+        stats = breaker.stats()
+        self.logger.warning(
+            f"Circuito de {breaker.host} aberto durante {breaker.open_for:.0f}s "
+            f"({stats['failure_rate']:.0%} de falhas nos últimos {stats['calls']:.0f} pedidos)"
+        )
+        if breaker.probe is not None:
+            breaker.probing = True
+            task = asyncio.create_task(self._probe(breaker))
+            self._background.add(task)
+            task.add_done_callback(self._background.discard)
+
+    async def _probe(self, breaker: CircuitBreaker) -> None:
+        """
+        Half-open: repete em background o último GET ao host depois de `open_for`.
+        Qualquer desfecho passa pelo `probe_result`, para o circuito nunca ficar
+        em half-open sem ninguém a testar.
+        """
+        ok = False
+        try:
+            await asyncio.sleep(breaker.retry_after)
+            breaker.half_open()
+            if self.metrics is not None:
+                self.circuit_transitions.inc(host=breaker.host, state="half_open")
+            url, kwargs = breaker.probe
+            async with self.session.request("GET", url, timeout=self.probe_timeout, **kwargs) as resp:
+                ok = resp.status < 500 and resp.status != 429
+        except asyncio.CancelledError:
+            # close(): fica aberto sem novo teste agendado; depois do open_for, um pedido real serve de teste
+            breaker.probing = False
+            breaker.probe_result(False)
+            raise
+        except Exception as e:
+            if not isinstance(e, (aiohttp.ClientError, asyncio.TimeoutError)):
+                self.logger.warning(f"Pedido de teste a {breaker.host} falhou: {type(e).__name__}: {e}")
+        breaker.probing = False
+        self._circuit_changed(breaker, breaker.probe_result(ok))
+
+    def request(self, method: str, url: str, **kwargs):
+        """
+        Pedido "cru": devolve o context manager da aiohttp (para uploads, streams, etc.).
+        Levanta logo `CircuitOpenError` se o circuito do host estiver aberto.
+        """
+        if self.circuit_breaker:
+            self._check_circuit(method, url, kwargs)
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    async def fetch(
+        self,
+        url: str,
+        *,
+        method: str = "GET",
+        read: str = "json",
+        cache_ttl: Optional[float] = None,
+        stale_ttl: float = 0.0,
+        coalesce: bool = False,
+        hedge: bool = False,
+        **kwargs,
+    ) -> HTTPResponse:
+        """
+        Faz o pedido e lê logo o corpo da resposta.
+
+        :param read: "json", "text" ou "bytes". Em respostas de erro (status >= 400)
+            o corpo é sempre devolvido como texto.
+        :param cache_ttl: Se indicado (só GET), respostas 2xx ficam em cache durante
+            este número de segundos. O body devolvido é partilhado: não o alterar.
+        :param stale_ttl: Depois de expirar, a resposta em cache ainda é devolvida
+            durante mais este tempo, enquanto é atualizada em background
+            (stale-while-revalidate). Se o circuito do host estiver aberto, a
+            resposta em cache é devolvida seja qual for a idade.
+        :param coalesce: GETs iguais (URL, params, headers) feitos ao mesmo tempo
+            são um só pedido e recebem o mesmo body, tal como na cache: não o alterar.
+            Só para leituras em que todos devem ver a mesma resposta; nunca em
+            endpoints que devolvem algo aleatório a cada pedido.
+        :param hedge: Só GET. Se a resposta demorar mais que o p90 do endpoint, faz
+            um segundo pedido igual e fica com o primeiro que responder.
+        :param kwargs: Argumentos passados à `aiohttp.ClientSession.request`
+            (params, headers, json, data, timeout, ssl, ...).
+        """
+        if cache_ttl is None or method.upper() != "GET":
+            return await self._shared_fetch(url, method, read, kwargs, coalesce, hedge)
+
+        key = ResponseCache.make_key(method, url, kwargs.get("params"), read)
+        endpoint = ResponseCache.endpoint(url)
+        entry = self.cache.get(key)
+        if entry is not None:
+            age = time.time() - entry.stored_at
+            if age < cache_ttl:
+                self.cache.record(endpoint, "hits")
+                return HTTPResponse(entry.status, entry.body)
+            if age < cache_ttl + stale_ttl:
+                self.cache.record(endpoint, "stale_hits")
+                self._revalidate(key, endpoint, url, method, read, kwargs)
+                return HTTPResponse(entry.status, entry.body)
+
+        self.cache.record(endpoint, "misses")
+        try:
+            resp = await self._shared_fetch(url, method, read, kwargs, coalesce, hedge)
+        except CircuitOpenError:
+            if entry is None:
+                raise
+            # Host em baixo: mais vale uma resposta antiga do que nenhuma
+            return HTTPResponse(entry.status, entry.body)
+        if resp.ok:
+            self.cache.set(key, endpoint, resp.status, resp.body)
+        return resp
+
+    def _revalidate(self, key: str, endpoint: str, url: str, method: str, read: str, kwargs: dict) -> None:
+        if key in self._revalidating:
+            return
+        self._revalidating.add(key)
+
+        async def refresh():
+            try:
+                resp = await self._shared_fetch(url, method, read, kwargs, True, False)
+                if resp.ok:
+                    self.cache.set(key, endpoint, resp.status, resp.body)
+            except Exception as e:
+                self.logger.warning(f"Falha ao revalidar {endpoint} em background: {e}")
+            finally:
+                self._revalidating.discard(key)
+
+        task = asyncio.create_task(refresh())
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _shared_fetch(
+        self, url: str, method: str, read: str, kwargs: dict, coalesce: bool, hedge: bool
+    ) -> HTTPResponse:
+        is_get = method.upper() == "GET" and "data" not in kwargs and "json" not in kwargs
+        fetch = self._hedged_fetch if hedge and is_get else self._fetch
+        if not coalesce or not is_get:
+            return await fetch(url, method, read, kwargs)
+        headers = kwargs.get("headers")
+        key = ResponseCache.make_key(
+            method, url, [kwargs.get("params"), sorted(headers.items()) if headers else None], read
+        )
+        return await self.flights.do(
+            key, lambda: fetch(url, method, read, kwargs), label=ResponseCache.endpoint(url)
+        )
+
+    async def _hedged_fetch(self, url: str, method: str, read: str, kwargs: dict) -> HTTPResponse:
+        endpoint = ResponseCache.endpoint(url)
+        delay = self.hedging.delay(endpoint)
+        loop = asyncio.get_running_loop()
+
+        async def attempt(hedge: bool = False) -> HTTPResponse:
+            # Falhas, timeouts e pedidos cancelados também contam: o tempo até ao
+            # cancelamento é um limite inferior da latência. Só não conta o hedge que
+            # perdeu: começou depois e o tempo do pedido já vem do primeiro.
+            started = loop.time()
+            cancelled = False
+            try:
+                return await self._fetch(url, method, read, kwargs)
+            except asyncio.CancelledError:
+                cancelled = True
+                raise
+            finally:
+                if not (cancelled and hedge):
+                    self.hedging.observe(endpoint, loop.time() - started)
+
+        if delay is None:
+            return await attempt()
+
+        primary = asyncio.ensure_future(attempt())
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done and self.hedging.acquire(endpoint):
+                tasks.add(asyncio.ensure_future(attempt(hedge=True)))
+            while True:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                # a primeira resposta ganha; um erro rápido não, se o outro ainda puder responder
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.hedging.won(endpoint)
+                        return task.result()
+                if not tasks:
+                    return done.pop().result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _fetch(self, url: str, method: str, read: str, kwargs: dict) -> HTTPResponse:
+        async with self.request(method, url, **kwargs) as resp:
+            if resp.status >= 400:
+                return HTTPResponse(resp.status, await resp.text())
+            return HTTPResponse(resp.status, await self._read(resp, read))
+
+    async def _read(self, resp: aiohttp.ClientResponse, read: str) -> Any:
+        if read == "json":
+            return await resp.json(content_type=None, loads=self.json_loads)
+        if read == "text":
+            return await resp.text()
+        if read == "bytes":
+            return await resp.read()
+        raise ValueError(f"Modo de leitura desconhecido: {read}")
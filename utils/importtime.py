@@ -0,0 +1,191 @@
+"""
+Relatório de tempo de import no arranque.
+
+Instala um finder em `sys.meta_path` que mede quanto tempo (e quanta RSS)
+custa executar cada módulo importado, e junta-lhe o custo de carregar cada
+cog. Este módulo não pode importar nada pesado: é o primeiro a ser
+importado pelo bot.py.
+"""
+import os
+import sys
+import threading
+import time
+from typing import Dict, List, Tuple
+
+try:
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = 4096
+
+
+def current_rss() -> int:
+    """RSS atual do processo em bytes (0 se não for possível saber)."""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        pass
+    try:
+        import resource
+
+        # ru_maxrss é o pico (KiB em Linux, bytes em macOS), mas é melhor que nada
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss if sys.platform == "darwin" else maxrss * 1024
+    except (ImportError, OSError):
+        return 0
+
+
+class _ModuleTiming:
+    __slots__ = ("name", "elapsed", "rss", "child_elapsed", "child_rss")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.elapsed = 0.0
+        self.rss = 0
+        self.child_elapsed = 0.0
+        self.child_rss = 0
+
+    @property
+    def self_elapsed(self) -> float:
+        return self.elapsed - self.child_elapsed
+
+    @property
+    def self_rss(self) -> int:
+        return self.rss - self.child_rss
+
+
+class _TimedLoader:
+    def __init__(self, loader, profiler: "ImportProfiler") -> None:
+        self._loader = loader
+        self._profiler = profiler
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        # Nas extensões em C é aqui que o trabalho pesado acontece
+        self._profiler._enter(spec.name)
+        try:
+            return self._loader.create_module(spec)
+        finally:
+            self._profiler._exit()
+
+    def exec_module(self, module) -> None:
+        # O resto do Python deve continuar a ver o loader original
+        module.__loader__ = self._loader
+        if getattr(module, "__spec__", None) is not None:
+            module.__spec__.loader = self._loader
+        self._profiler._enter(module.__name__)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler._exit()
+
+
+class ImportProfiler:
+    def __init__(self) -> None:
+        self.modules: Dict[str, _ModuleTiming] = {}
+        self.extensions: List[Tuple[str, float, int]] = []
+        self.started_at = time.perf_counter()
+        self.started_rss = current_rss()
+        self._local = threading.local()
+        self._installed = False
+
+    # ---------- finder ----------
+    def find_spec(self, fullname, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self:
+                continue
+            find_spec = getattr(finder, "find_spec", None)
+            if find_spec is None:
+                continue
+            spec = find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimedLoader(spec.loader, self)
+        return spec
+
+    @property
+    def installed(self) -> bool:
+        return self._installed
+
+    def install(self) -> None:
+        if not self._installed:
+            sys.meta_path.insert(0, self)
+            self._installed = True
+
+    def uninstall(self) -> None:
+        if self._installed:
+            sys.meta_path.remove(self)
+            self._installed = False
+
+    @property
+    def _stack(self) -> List[Tuple[_ModuleTiming, float, int]]:
+        # imports em threads diferentes (executors) têm cada um a sua pilha
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _enter(self, name: str) -> None:
+        timing = self.modules.setdefault(name, _ModuleTiming(name))
+        self._stack.append((timing, time.perf_counter(), current_rss()))
+
+    def _exit(self) -> None:
+        stack = self._stack
+        timing, started, rss = stack.pop()
+        elapsed = time.perf_counter() - started
+        rss_delta = current_rss() - rss
+        timing.elapsed += elapsed
+        timing.rss += rss_delta
+        if stack:
+            parent = stack[-1][0]
+            parent.child_elapsed += elapsed
+            parent.child_rss += rss_delta
+
+    # ---------- cogs ----------
+    def record_extension(self, name: str, elapsed: float, rss_delta: int) -> None:
+        self.extensions.append((name, elapsed, rss_delta))
+
+    # ---------- relatório ----------
+    def by_package(self) -> List[Tuple[str, float, int]]:
+        """Custo próprio (sem os imports aninhados de outros pacotes) agregado por pacote de topo."""
+        packages: Dict[str, List[float]] = {}
+        for timing in self.modules.values():
+            root = timing.name.split(".", 1)[0]
+            totals = packages.setdefault(root, [0.0, 0])
+            totals[0] += timing.self_elapsed
+            totals[1] += timing.self_rss
+        return sorted(
+            ((name, elapsed, rss) for name, (elapsed, rss) in packages.items()),
+            key=lambda item: item[1],
+            reverse=True,
+        )
+
+    def report(self, top: int = 15) -> str:
+        mib = 1024 * 1024
+        elapsed = time.perf_counter() - self.started_at
+        rss = current_rss()
+        lines = [
+            f"Import-time report: {elapsed * 1000:.0f} ms desde o arranque, "
+            f"RSS {rss / mib:.1f} MiB (+{(rss - self.started_rss) / mib:.1f} MiB), "
+            f"{len(self.modules)} módulos importados"
+        ]
+
+        lines.append("Pacotes (tempo e RSS próprios):")
+        for name, pkg_elapsed, pkg_rss in self.by_package()[:top]:
+            lines.append(f"  {name:<28} {pkg_elapsed * 1000:8.1f} ms  {pkg_rss / mib:+7.1f} MiB")
+
+        if self.extensions:
+            lines.append("Cogs (load_extension):")
+            for name, ext_elapsed, ext_rss in sorted(self.extensions, key=lambda e: e[1], reverse=True):
+                lines.append(f"  {name:<28} {ext_elapsed * 1000:8.1f} ms  {ext_rss / mib:+7.1f} MiB")
+
+        return "\n".join(lines)
+
+
+profiler = ImportProfiler()
@@ -0,0 +1,178 @@
+"""
+Pipeline de logging do bot.
+
+O event loop só mete os records numa fila (`QueueHandler`); a formatação e a
+escrita na consola/ficheiro são feitas por uma thread (`QueueListener`). Se a
+fila encher (disco lento), os records são descartados em vez de bloquear o
+loop, e o número de descartados é reportado assim que houver espaço.
+"""
+import atexit
+import copy
+import datetime
+import json
+import logging
+import logging.handlers
+import queue
+import traceback
+from typing import Optional
+
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class LoggingFormatter(logging.Formatter):
+    # Colors
+    black = "\x1b[30m"
+    red = "\x1b[31m"
+    green = "\x1b[32m"
+    yellow = "\x1b[33m"
+    blue = "\x1b[34m"
+    gray = "\x1b[38m"
+    # Styles
+    reset = "\x1b[0m"
+    bold = "\x1b[1m"
+
+    COLORS = {
+        logging.DEBUG: gray + bold,
+        logging.INFO: blue + bold,
+        logging.WARNING: yellow + bold,
+        logging.ERROR: red,
+        logging.CRITICAL: red + bold,
+    }
+
+    FORMAT = "(black){asctime}(reset) (levelcolor){levelname:<8}(reset) (green){name}(reset) {message}"
+
+    def __init__(self) -> None:
+        super().__init__(datefmt=DATE_FORMAT, style="{")
+        # Um formatter por nível, compilado uma vez (e não a cada record)
+        self.formatters = {
+            level: logging.Formatter(self._compile(color), DATE_FORMAT, style="{")
+            for level, color in self.COLORS.items()
+        }
+        self.default_formatter = logging.Formatter(self._compile(self.reset), DATE_FORMAT, style="{")
+
+    def _compile(self, level_color: str) -> str:
+        fmt = self.FORMAT.replace("(black)", self.black + self.bold)
+        fmt = fmt.replace("(reset)", self.reset)
+        fmt = fmt.replace("(levelcolor)", level_color)
+        return fmt.replace("(green)", self.green + self.bold)
+
+    def format(self, record):
+        return self.formatters.get(record.levelno, self.default_formatter).format(record)
+
+
+class JsonFormatter(logging.Formatter):
+    """Uma linha JSON por record, para ingestão (Loki, Elastic, jq, ...)."""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "module": record.module,
+            "line": record.lineno,
+            "thread": record.threadName,
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = record.stack_info
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """`QueueHandler` que descarta records quando a fila está cheia, em vez de bloquear."""
+
+    def __init__(self, log_queue: queue.Queue) -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._unreported = 0
+
+    def prepare(self, record):
+        # Igual ao QueueHandler, mas mantém o traceback em exc_text (em vez de o
+        # colar na mensagem) para o JsonFormatter o pôr num campo próprio
+        message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = "".join(traceback.format_exception(*record.exc_info)).rstrip("\n")
+        record = copy.copy(record)
+        record.message = message
+        record.msg = message
+        record.args = None
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            if self._unreported:
+                self.queue.put_nowait(self._dropped_record())
+                self._unreported = 0
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            self._unreported += 1
+
+    def _dropped_record(self) -> logging.LogRecord:
+        return logging.LogRecord(
+            name="discord_bot.logging",
+            level=logging.WARNING,
+            pathname=__file__,
+            lineno=0,
+            msg=f"Fila de logging cheia: {self._unreported} records descartados",
+            args=None,
+            exc_info=None,
+        )
+
+
+def setup_logging(
+    *,
+    level: int = logging.INFO,
+    filename: str = "discord.log",
+    max_bytes: int = 10 * 1024 * 1024,
+    backup_count: int = 5,
+    rotate_when: Optional[str] = None,
+    json_file: bool = False,
+    queue_size: int = 10000,
+) -> logging.Logger:
+    """
+    Configura o logger "discord_bot" (e os avisos do discord.py) para passarem
+    pela fila. A thread de escrita é parada no fim do processo (atexit).
+
+    :param rotate_when: Se indicado (ex. "midnight"), o ficheiro roda por tempo;
+        caso contrário roda quando chega a `max_bytes`.
+    :param json_file: Escreve o ficheiro em JSON lines em vez de texto.
+    """
+    # Consola
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(LoggingFormatter())
+    # Ficheiro
+    if rotate_when:
+        file_handler = logging.handlers.TimedRotatingFileHandler(
+            filename, when=rotate_when, backupCount=backup_count, encoding="utf-8"
+        )
+    else:
+        file_handler = logging.handlers.RotatingFileHandler(
+            filename, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+        )
+    if json_file:
+        file_handler.setFormatter(JsonFormatter())
+    else:
+        file_handler.setFormatter(
+            logging.Formatter("[{asctime}] [{levelname:<8}] {name}: {message}", DATE_FORMAT, style="{")
+        )
+
+    log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    queue_handler = NonBlockingQueueHandler(log_queue)
+    listener = logging.handlers.QueueListener(
+        log_queue, console_handler, file_handler, respect_handler_level=True
+    )
+    listener.start()
+    atexit.register(listener.stop)
+
+    logger = logging.getLogger("discord_bot")
+    logger.setLevel(level)
+    logger.addHandler(queue_handler)
+    # Os avisos/erros do discord.py (que sem handler iam para o stderr) também passam pela fila
+    logging.getLogger("discord").addHandler(queue_handler)
+    return logger
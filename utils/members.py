@@ -0,0 +1,94 @@
+"""
+Política de cache de membros/presenças e helpers para ir buscar membros a pedido.
+
+Com os intents `members` + `presences` e o chunking no arranque, o
+discord.py guarda todos os membros de todos os servidores e processa cada
+mudança de estado/atividade de cada um deles, mesmo que nenhum cog as use.
+A política (intents, `MemberCacheFlags`, chunking) vem do config; os
+comandos que precisam de um membro fora da cache usam
+`get_or_fetch_member`/`get_or_fetch_user`, que fazem o pedido à API só
+quando é preciso.
+
+Custo de cada opção: `python -m benchmarks.member_cache_bench`.
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+import discord
+
+MEMBER_CACHE_CHOICES = ("all", "none", "default", "voice", "joined")
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    intents: discord.Intents
+    member_cache_flags: discord.MemberCacheFlags
+    chunk_guilds_at_startup: bool
+
+    def describe(self) -> str:
+        flags = [name for name, enabled in self.member_cache_flags if enabled] or ["nenhum"]
+        return (
+            f"members={self.intents.members} presences={self.intents.presences} "
+            f"cache={','.join(flags)} chunking={self.chunk_guilds_at_startup}"
+        )
+
+
+def build_cache_policy(
+    *,
+    members: bool,
+    presences: bool,
+    message_content: bool = True,
+    member_cache: str = "default",
+    chunk_guilds_at_startup: bool = False,
+) -> CachePolicy:
+    """
+    :param member_cache: "all", "none", "default" (o que os intents permitem) ou
+        uma lista separada por vírgulas de "voice", "joined".
+    """
+    intents = discord.Intents.default()
+    intents.message_content = message_content
+    intents.members = members
+    intents.presences = presences
+
+    choice = member_cache.strip().lower()
+    if choice == "all":
+        flags = discord.MemberCacheFlags.all()
+    elif choice == "none":
+        flags = discord.MemberCacheFlags.none()
+    elif choice == "default":
+        flags = discord.MemberCacheFlags.from_intents(intents)
+    else:
+        flags = discord.MemberCacheFlags.none()
+        for name in filter(None, (part.strip() for part in choice.split(","))):
+            if name not in MEMBER_CACHE_CHOICES[3:]:
+                raise ValueError(f"MEMBER_CACHE inválido: {name} (opções: {', '.join(MEMBER_CACHE_CHOICES)})")
+            setattr(flags, name, True)
+
+    # As mesmas regras que o discord.py valida no Client, mas com uma mensagem que diz o que mudar no .env
+    if flags.joined and not members:
+        raise ValueError("MEMBER_CACHE=joined precisa de INTENT_MEMBERS=true")
+    if chunk_guilds_at_startup and not members:
+        raise ValueError("CHUNK_GUILDS_AT_STARTUP precisa de INTENT_MEMBERS=true")
+    return CachePolicy(intents, flags, chunk_guilds_at_startup)
+
+
+async def get_or_fetch_member(guild: discord.Guild, user_id: int) -> Optional[discord.Member]:
+    """Membro da cache ou, se não estiver lá, da API. None se já não estiver no servidor."""
+    member = guild.get_member(user_id)
+    if member is not None:
+        return member
+    try:
+        return await guild.fetch_member(user_id)
+    except discord.NotFound:
+        return None
+
+
+async def get_or_fetch_user(client: discord.Client, user_id: int) -> Optional[discord.User]:
+    """Utilizador da cache ou da API (chega para mandar DMs sem precisar do membro)."""
+    user = client.get_user(user_id)
+    if user is not None:
+        return user
+    try:
+        return await client.fetch_user(user_id)
+    except discord.NotFound:
+        return None
@@ -0,0 +1,292 @@
+"""
+Métricas em memória do bot (`bot.metrics`), expostas em formato de texto do
+Prometheus num endpoint HTTP local e resumidas pelo comando /metricas.
+
+Sem dependências: contadores, gauges e histogramas com labels. Os
+histogramas guardam, além dos buckets, uma janela com as últimas amostras
+para calcular p50/p95/p99 sem precisar de um Prometheus à frente.
+"""
+import bisect
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, object]) -> LabelValues:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name}: labels esperadas {self.labelnames}, recebidas {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        lines.extend(self.samples())
+        return lines
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.values: Dict[LabelValues, float] = {}
+        self._function: Optional[Callable[[], Dict[LabelValues, float]]] = None
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        self.values[key] = self.values.get(key, 0.0) + amount
+
+    def set_function(self, function: Callable[[], Dict[LabelValues, float]]) -> None:
+        """Como no Gauge, para contadores que já existem noutro objeto (têm de só subir)."""
+        self._function = function
+
+    def samples(self) -> Iterable[str]:
+        # list(): há métricas atualizadas noutras threads (database/querylog.py)
+        values = self._function() if self._function is not None else self.values
+        for key, value in list(values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.values: Dict[LabelValues, float] = {}
+        self._function: Optional[Callable[[], Dict[LabelValues, float]]] = None
+
+    def set(self, value: float, **labels) -> None:
+        self.values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        self.values[key] = self.values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set_function(self, function: Callable[[], Dict[LabelValues, float]]) -> None:
+        """O valor passa a ser lido na altura do scrape: {(valores das labels): valor}."""
+        self._function = function
+
+    def collect(self) -> Dict[LabelValues, float]:
+        return self._function() if self._function is not None else self.values
+
+    def samples(self) -> Iterable[str]:
+        for key, value in self.collect().items():
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class HistogramSeries:
+    __slots__ = ("bucket_counts", "count", "sum", "window")
+
+    def __init__(self, buckets: int, window: int) -> None:
+        self.bucket_counts = [0] * (buckets + 1)  # o último é o +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.window: Deque[float] = deque(maxlen=window)
+
+    def quantiles(self, *qs: float) -> Tuple[float, ...]:
+        """Quantis das últimas amostras (janela), 0.0 se ainda não houver nenhuma."""
+        if not self.window:
+            return tuple(0.0 for _ in qs)
+        ordered = sorted(self.window)
+        return tuple(ordered[min(len(ordered) - 1, int(q * len(ordered)))] for q in qs)
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        *,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        window: int = 1024,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self.window = window
+        self.series: Dict[LabelValues, HistogramSeries] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        series = self.series.get(key)
+        if series is None:
+            series = self.series[key] = HistogramSeries(len(self.buckets), self.window)
+        series.bucket_counts[bisect.bisect_left(self.buckets, value)] += 1
+        series.count += 1
+        series.sum += value
+        series.window.append(value)
+
+    def samples(self) -> Iterable[str]:
+        for key, series in list(self.series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series.bucket_counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(series.sum)}"
+            yield f"{self.name}_count{labels} {series.count}"
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            # Registar duas vezes (ex. reload de um cog) devolve a mesma métrica
+            if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                raise ValueError(f"Métrica {metric.name} já registada com outro tipo ou labels")
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), **kwargs) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, **kwargs))
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class CommandMetrics:
+    """
+    Latência, comandos em curso e erros por comando.
+
+    `start` e `finish` recebem uma chave que identifica a invocação (o id do
+    Context ou da Interaction), para que o início e o fim possam vir de
+    eventos diferentes do discord.py.
+    """
+
+    LABELS = ("cog", "command", "source")
+
+    def __init__(self, registry: MetricsRegistry, *, max_age: float = 900.0) -> None:
+        self.duration = registry.histogram(
+            "bot_command_duration_seconds", "Duração dos comandos, do início ao fim.", self.LABELS
+        )
+        self.in_flight = registry.gauge(
+            "bot_commands_in_flight", "Comandos a correr neste momento.", self.LABELS
+        )
+        self.errors = registry.counter(
+            "bot_command_errors_total", "Comandos que terminaram em erro, por tipo de exceção.",
+            self.LABELS + ("error",),
+        )
+        self.max_age = max_age
+        self._started: Dict[int, Tuple[LabelValues, float]] = {}
+
+    def start(self, key: int, cog: Optional[str], command: str, source: str) -> None:
+        labels = (cog or "-", command, source)
+        if len(self._started) > 256:
+            self._prune()
+        self._started[key] = (labels, time.perf_counter())
+        self.in_flight.inc(**dict(zip(self.LABELS, labels)))
+
+    def finish(self, key: int, error: Optional[BaseException] = None) -> Optional[float]:
+        """Devolve a duração, ou None se o início não tiver sido registado."""
+        started = self._started.pop(key, None)
+        if started is None:
+            return None
+        labels, started_at = started
+        elapsed = time.perf_counter() - started_at
+        named = dict(zip(self.LABELS, labels))
+        self.in_flight.dec(**named)
+        self.duration.observe(elapsed, **named)
+        if error is not None:
+            original = getattr(error, "original", None) or error
+            self.errors.inc(error=type(original).__name__, **named)
+        return elapsed
+
+    def running(self) -> List[Tuple[LabelValues, float]]:
+        """(labels, segundos a correr) de cada comando em curso."""
+        now = time.perf_counter()
+        return [(labels, now - started_at) for labels, started_at in self._started.values()]
+
+    def _prune(self) -> None:
+        # Invocações cujo fim nunca chegou (ex. erro interno do discord.py)
+        limit = time.perf_counter() - self.max_age
+        for key, (labels, started_at) in list(self._started.items()):
+            if started_at < limit:
+                del self._started[key]
+                self.in_flight.dec(**dict(zip(self.LABELS, labels)))
+
+
+class MetricsServer:
+    """Endpoint HTTP local (GET /metrics) para o Prometheus fazer scrape."""
+
+    def __init__(self, registry: MetricsRegistry, *, host: str = "127.0.0.1", port: int = 9108) -> None:
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._runner = None
+
+    async def start(self) -> None:
+        from aiohttp import web
+
+        async def handle(request: web.Request) -> web.Response:
+            return web.Response(
+                text=self.registry.render(),
+                content_type="text/plain",
+                charset="utf-8",
+                headers={"X-Content-Type-Options": "nosniff"},
+            )
+
+        app = web.Application()
+        app.router.add_get("/metrics", handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+
+    async def close(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
@@ -0,0 +1,109 @@
+"""
+Profiler por amostragem para usar no bot em produção (/perfil).
+
+Uma thread lê `sys._current_frames()` a intervalos regulares e regista a
+stack da thread do event loop e das threads do executor por omissão do
+asyncio (`run_in_executor(None, ...)`, `asyncio.to_thread`). Não instala
+hooks de tracing, por isso o custo é só o de percorrer as stacks em cada
+amostra (~100 por segundo), e o código do bot corre à velocidade normal.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+# Nome das threads do executor por omissão do asyncio: "asyncio_0", "asyncio_1", ...
+EXECUTOR_THREAD_PREFIX = "asyncio_"
+
+
+def _frame_label(code) -> str:
+    filename = os.path.basename(code.co_filename)
+    # ";" é o separador do formato collapsed
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(";", ":")
+
+
+class SamplingProfiler:
+    def __init__(self, *, interval: float = 0.01, max_depth: int = 128) -> None:
+        self.interval = interval
+        self.max_depth = max_depth
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.elapsed = 0.0
+        self._loop_thread_id: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, loop_thread_id: Optional[int] = None) -> None:
+        """Começa a amostrar. Por omissão a thread do loop é a thread que chama start()."""
+        if self.running:
+            raise RuntimeError("O profiler já está a correr")
+        self._loop_thread_id = loop_thread_id if loop_thread_id is not None else threading.get_ident()
+        self.stacks.clear()
+        self.samples = 0
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _thread_names(self) -> Dict[int, str]:
+        names = {}
+        for thread in threading.enumerate():
+            if thread.ident == self._loop_thread_id:
+                names[thread.ident] = "event-loop"
+            elif thread.name.startswith(EXECUTOR_THREAD_PREFIX):
+                names[thread.ident] = thread.name
+        return names
+
+    def _run(self) -> None:
+        started = time.perf_counter()
+        names = self._thread_names()
+        names_refreshed = started
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            # threads do executor aparecem e desaparecem; não vale a pena ver a cada amostra
+            if now - names_refreshed > 1.0:
+                names = self._thread_names()
+                names_refreshed = now
+
+            for thread_id, frame in sys._current_frames().items():
+                name = names.get(thread_id)
+                if name is None:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < self.max_depth:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(name)
+                stack.reverse()
+                self.stacks[";".join(stack)] += 1
+            self.samples += 1
+        self.elapsed = time.perf_counter() - started
+
+    # ---------- resultados ----------
+    def collapsed(self) -> str:
+        """Formato "collapsed" do flamegraph.pl / speedscope / inferno: "a;b;c contagem"."""
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common()) + "\n"
+
+    def top(self, n: int = 15) -> List[Tuple[str, int, int]]:
+        """(função, amostras em que estava no topo da stack, amostras em que aparecia na stack)."""
+        own: Counter = Counter()
+        total: Counter = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")[1:]  # o primeiro é o nome da thread
+            if not frames:
+                continue
+            own[frames[-1]] += count
+            for frame in set(frames):
+                total[frame] += count
+        return [(frame, count, total[frame]) for frame, count in own.most_common(n)]
@@ -0,0 +1,32 @@
+"""
+Onde são registados os slash commands (COMMAND_GUILDS no config).
+
+Os cogs usam `@command_guilds()` em vez de `@app_commands.guilds(...)`, para
+que o mesmo código sirva para um servidor de testes, uma lista de
+servidores ou comandos globais.
+"""
+from typing import List, Optional
+
+from discord import app_commands
+
+from config import COMMAND_GUILDS
+
+
+def parse_guild_ids(value: str) -> Optional[List[int]]:
+    """IDs separados por vírgulas; None para "global"."""
+    if value.strip().lower() == "global":
+        return None
+    ids = [int(part) for part in value.split(",") if part.strip()]
+    if not ids:
+        raise ValueError('COMMAND_GUILDS vazio: indica IDs de servidores ou "global"')
+    return ids
+
+
+COMMAND_GUILD_IDS = parse_guild_ids(COMMAND_GUILDS)
+
+
+def command_guilds():
+    """Decorator para slash/híbridos: regista o comando nos servidores do config (ou global)."""
+    if COMMAND_GUILD_IDS is None:
+        return lambda command: command
+    return app_commands.guilds(*COMMAND_GUILD_IDS)
@@ -0,0 +1,102 @@
+"""
+Sharding: configuração dos shards e métricas por shard.
+
+Com `SHARDED=true` o bot passa a ser um `AutoShardedBot`: uma ligação ao
+gateway por shard, cada uma com os eventos dos servidores que lhe cabem
+(`(guild_id >> 22) % shard_count`). `SHARD_COUNT`/`SHARD_IDS` permitem
+correr só parte dos shards num processo e o resto noutros.
+
+`ShardMetrics` expõe a latência e o estado de cada shard e conta os eventos
+do gateway por shard e por tipo, para se ver quando um shard (ou um
+servidor grande) começa a concentrar a carga.
+"""
+import math
+from typing import Any, Callable, Dict, List, Optional
+
+import discord
+
+from utils.metrics import MetricsRegistry
+
+
+def parse_shard_ids(value: str, shard_count: Optional[int]) -> Optional[List[int]]:
+    """
+    "0-3,6" -> [0, 1, 2, 3, 6]. Vazio = todos os shards (None).
+    O discord.py só aceita uma lista de shards com o total definido.
+    """
+    ids: List[int] = []
+    for part in filter(None, (p.strip() for p in value.split(","))):
+        start, _, end = part.partition("-")
+        ids.extend(range(int(start), int(end or start) + 1))
+    if not ids:
+        return None
+    if shard_count is None:
+        raise ValueError("SHARD_IDS precisa de SHARD_COUNT")
+    invalid = [i for i in ids if not 0 <= i < shard_count]
+    if invalid:
+        raise ValueError(f"SHARD_IDS fora do intervalo 0-{shard_count - 1}: {invalid}")
+    return sorted(set(ids))
+
+
+def shard_for_guild(guild_id: int, shard_count: int) -> int:
+    """O shard que recebe os eventos de um servidor (fórmula do Discord)."""
+    return (guild_id >> 22) % shard_count
+
+
+class ShardMetrics:
+    def __init__(self, bot: discord.Client, metrics: MetricsRegistry) -> None:
+        self.bot = bot
+        self._events = metrics.counter(
+            "bot_gateway_events_total",
+            "Eventos recebidos do gateway por shard e tipo (shard - = evento sem servidor).",
+            ("shard", "event"),
+        )
+        latency = metrics.gauge("bot_shard_latency_seconds", "Latência do heartbeat de cada shard.", ("shard",))
+        latency.set_function(self._latencies)
+        up = metrics.gauge("bot_shard_up", "1 se a ligação do shard ao gateway está aberta.", ("shard",))
+        up.set_function(self._up)
+
+    def _shard_count(self) -> int:
+        return self.bot.shard_count or 1
+
+    def _latencies(self) -> Dict[tuple, float]:
+        if isinstance(self.bot, discord.AutoShardedClient):
+            latencies = self.bot.latencies
+        else:
+            latencies = [(self.bot.shard_id or 0, self.bot.latency)]
+        # antes do primeiro heartbeat a latência é inf/nan
+        return {(str(shard),): value for shard, value in latencies if math.isfinite(value)}
+
+    def _up(self) -> Dict[tuple, float]:
+        if isinstance(self.bot, discord.AutoShardedClient):
+            return {(str(shard_id),): float(not info.is_closed()) for shard_id, info in self.bot.shards.items()}
+        ws = self.bot.ws
+        return {(str(self.bot.shard_id or 0),): float(ws is not None and ws.open)}
+
+    def install(self) -> None:
+        """
+        Embrulha os parsers de eventos do discord.py para os contar. O dicionário
+        é partilhado com as ligações ao gateway, por isso tem de ser alterado no
+        sítio (chamar no setup_hook, antes de ligar).
+        """
+        parsers = self.bot._connection.parsers
+        for event, parser in list(parsers.items()):
+            parsers[event] = self._wrap(event, parser)
+
+    def _wrap(self, event: str, parser: Callable[[Any], None]) -> Callable[[Any], None]:
+        count = self._events.inc
+
+        def counted(data: Any) -> None:
+            count(shard=self._shard_of(event, data), event=event)
+            return parser(data)
+
+        return counted
+
+    def _shard_of(self, event: str, data: Any) -> str:
+        if not isinstance(data, dict):
+            return "-"
+        if "__shard_id__" in data:  # o RESUMED traz o shard (chave interna do discord.py)
+            return str(data["__shard_id__"])
+        guild_id = data.get("id") if event in ("GUILD_CREATE", "GUILD_UPDATE", "GUILD_DELETE") else data.get("guild_id")
+        if guild_id is None:
+            return "-"
+        return str(shard_for_guild(int(guild_id), self._shard_count()))
@@ -0,0 +1,73 @@
+"""
+Agrupamento de pedidos iguais em curso (single-flight).
+
+Se dois comandos pedem a mesma coisa ao mesmo tempo, só o primeiro (o
+"líder") faz o trabalho; os restantes esperam pelo mesmo resultado. Não é
+uma cache: assim que o pedido termina, a chamada seguinte volta a fazê-lo.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from utils.metrics import MetricsRegistry
+
+
+class FlightStats:
+    __slots__ = ("leaders", "coalesced")
+
+    def __init__(self) -> None:
+        self.leaders = 0
+        self.coalesced = 0
+
+
+class SingleFlight:
+    def __init__(self, name: str, *, metrics: Optional[MetricsRegistry] = None) -> None:
+        self.name = name
+        self.stats: Dict[str, FlightStats] = {}
+        self._flights: Dict[Hashable, asyncio.Task] = {}
+        self._requests = None
+        if metrics is not None:
+            self._requests = metrics.counter(
+                "singleflight_requests_total",
+                "Chamadas ao single-flight, por papel (leader faz o pedido, coalesced espera pelo de outro).",
+                ("group", "label", "role"),
+            )
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable[Any]], *, label: str = "-") -> Any:
+        """
+        Devolve o resultado de `factory()`, partilhado com as chamadas
+        concorrentes com a mesma `key`. O resultado é o mesmo objeto para
+        todas: não o alterar. Exceções também são propagadas a todas.
+
+        :param label: Agrupa as estatísticas (ex. o endpoint), não entra na chave.
+        """
+        task = self._flights.get(key)
+        if task is None:
+            role = "leader"
+            task = asyncio.ensure_future(factory())
+            self._flights[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        else:
+            role = "coalesced"
+        self._record(label, role)
+        # shield: se quem chamou for cancelado (ex. timeout do comando), o
+        # pedido continua para quem ainda está à espera dele
+        return await asyncio.shield(task)
+
+    def _done(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._flights.get(key) is task:
+            del self._flights[key]
+        # se todos os que esperavam foram cancelados, ninguém lê a exceção
+        if not task.cancelled():
+            task.exception()
+
+    def _record(self, label: str, role: str) -> None:
+        stats = self.stats.setdefault(label, FlightStats())
+        if role == "leader":
+            stats.leaders += 1
+        else:
+            stats.coalesced += 1
+        if self._requests is not None:
+            self._requests.inc(group=self.name, label=label, role=role)
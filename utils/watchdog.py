@@ -0,0 +1,183 @@
+"""
+Monitor de lag do event loop e detetor de chamadas bloqueantes.
+
+Uma corrotina (heartbeat) acorda a cada `interval` segundos e mede quanto se
+atrasou: isso é o lag do loop. Uma thread separada vigia o heartbeat e, se
+ele ficar parado mais de `threshold` segundos, tira uma fotografia da stack
+da thread do loop, ou seja, do código que o está a bloquear, junto com os
+comandos que estavam a correr nesse momento.
+"""
+import asyncio
+import collections
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from typing import Deque, Dict, List, Optional, Tuple
+
+from utils.metrics import CommandMetrics, MetricsRegistry
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class Stall:
+    __slots__ = ("beat", "where", "stack", "commands", "duration")
+
+    def __init__(self, beat: float, where: str, stack: List[str], commands: List[str]) -> None:
+        self.beat = beat
+        self.where = where
+        self.stack = stack
+        self.commands = commands
+        self.duration = 0.0
+
+
+class Offender:
+    """Estatísticas acumuladas dos bloqueios com origem no mesmo sítio do código."""
+
+    __slots__ = ("where", "count", "total", "max", "commands", "stack")
+
+    def __init__(self, where: str) -> None:
+        self.where = where
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.commands: collections.Counter = collections.Counter()
+        self.stack: List[str] = []
+
+
+class LoopWatchdog:
+    def __init__(
+        self,
+        *,
+        interval: float = 0.1,
+        threshold: float = 0.25,
+        metrics: Optional[MetricsRegistry] = None,
+        command_metrics: Optional[CommandMetrics] = None,
+        logger: Optional[logging.Logger] = None,
+        max_frames: int = 25,
+    ) -> None:
+        self.interval = interval
+        self.threshold = threshold
+        self.command_metrics = command_metrics
+        self.logger = logger or logging.getLogger("discord_bot")
+        self.max_frames = max_frames
+        self.offenders: Dict[str, Offender] = {}
+        self.max_lag = 0.0
+
+        registry = metrics if metrics is not None else MetricsRegistry()
+        self.lag = registry.histogram(
+            "bot_event_loop_lag_seconds",
+            "Atraso do heartbeat do event loop.",
+            buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+        )
+        self.stalls = registry.counter(
+            "bot_event_loop_stalls_total", "Bloqueios do event loop acima do limite, por origem.", ("where",)
+        )
+        self.stall_seconds = registry.counter(
+            "bot_event_loop_stall_seconds_total", "Tempo total com o event loop bloqueado, por origem.", ("where",)
+        )
+
+        self._beat = time.perf_counter()
+        self._loop_thread_id: Optional[int] = None
+        self._finished: Deque[Stall] = collections.deque()
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        """Tem de ser chamado a partir do event loop."""
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.perf_counter()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._thread is not None:
+            await asyncio.to_thread(self._thread.join)
+            self._thread = None
+
+    # ---------- loop ----------
+    async def _heartbeat(self) -> None:
+        while True:
+            started = time.perf_counter()
+            self._beat = started
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - started - self.interval)
+            self.lag.observe(lag)
+            self.max_lag = max(self.max_lag, lag)
+            while self._finished:
+                self._record(self._finished.popleft())
+
+    def _record(self, stall: Stall) -> None:
+        offender = self.offenders.get(stall.where)
+        if offender is None:
+            offender = self.offenders[stall.where] = Offender(stall.where)
+        offender.count += 1
+        offender.total += stall.duration
+        offender.max = max(offender.max, stall.duration)
+        offender.commands.update(stall.commands)
+        offender.stack = stall.stack
+        self.stalls.inc(where=stall.where)
+        self.stall_seconds.inc(stall.duration, where=stall.where)
+        self.logger.warning(
+            f"Event loop bloqueado {stall.duration * 1000:.0f} ms em {stall.where}"
+            + (f" (a correr: {', '.join(stall.commands)})" if stall.commands else "")
+        )
+
+    def worst(self, n: int = 10) -> List[Offender]:
+        return sorted(self.offenders.values(), key=lambda o: o.total, reverse=True)[:n]
+
+    # ---------- thread de vigia ----------
+    def _watch(self) -> None:
+        stall: Optional[Stall] = None
+        while not self._stop.wait(self.interval / 2):
+            beat = self._beat
+            if stall is None:
+                # o heartbeat só atualiza a cada `interval`, daí a folga
+                if time.perf_counter() - beat > self.threshold + self.interval:
+                    stall = self._capture(beat)
+            elif beat != stall.beat:
+                # o loop voltou a correr: o bloqueio durou até ao novo heartbeat
+                stall.duration = beat - stall.beat - self.interval
+                self._finished.append(stall)
+                stall = None
+
+    def _capture(self, beat: float) -> Optional[Stall]:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return None
+        summary = traceback.extract_stack(frame)[-self.max_frames:]
+        stack = [
+            f"{os.path.relpath(f.filename, PROJECT_ROOT)}:{f.lineno} {f.name}" for f in summary
+        ]
+        return Stall(beat, self._where(summary), stack, self._running_commands())
+
+    @staticmethod
+    def _where(summary: traceback.StackSummary) -> str:
+        # O frame mais interior que seja código do bot (e não do asyncio/bibliotecas)
+        for f in reversed(summary):
+            path = os.path.abspath(f.filename)
+            if path.startswith(PROJECT_ROOT + os.sep) and os.sep + "site-packages" + os.sep not in path:
+                return f"{os.path.relpath(path, PROJECT_ROOT)}:{f.lineno} {f.name}"
+        f = summary[-1]
+        return f"{os.path.basename(f.filename)}:{f.lineno} {f.name}"
+
+    def _running_commands(self) -> List[str]:
+        if self.command_metrics is None:
+            return []
+        try:
+            running: List[Tuple[Tuple[str, ...], float]] = self.command_metrics.running()
+        except RuntimeError:
+            # o dicionário mudou entretanto (o loop não estava afinal parado)
+            return []
+        return [f"{cog}/{command}" for (cog, command, _), _ in running]
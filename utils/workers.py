@@ -0,0 +1,275 @@
+"""
+Pool de processos para trabalho pesado de CPU (yt-dlp, parsing de HTML).
+
+No executor por defeito (threads) estes trabalhos disputam o GIL com o event
+loop e com a thread que envia o áudio de voz: um `/musica` com uma playlist
+chega para atrasar os outros comandos e dar cortes no som. Aqui correm em
+processos à parte, que arrancam já com os módulos pesados importados
+(`preload`), com um limite de trabalhos em simultâneo por tipo (ex. os
+downloads não ocupam todos os processos) e um tempo máximo por trabalho.
+
+As funções têm de estar ao nível de um módulo (são enviadas por referência)
+e devolver dados simples (dicts, listas, strings): o resultado volta por
+pickle. Com `processes=0` corre tudo em threads, como antes.
+
+Impacto na latência do loop e no jitter da voz: `python -m benchmarks.workers_bench`.
+"""
+import asyncio
+import concurrent.futures
+import functools
+import importlib
+import importlib.util
+import logging
+import multiprocessing
+import os
+import signal
+import time
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from utils.metrics import MetricsRegistry
+
+DEFAULT_PRELOAD = ("yt_dlp", "bs4", "selectolax.parser")
+
+
+class JobTimeout(Exception):
+    """O trabalho passou do tempo máximo e foi interrompido."""
+
+
+def parse_limits(value: str) -> Dict[str, int]:
+    """"ytdlp=2,html=2" -> {"ytdlp": 2, "html": 2}"""
+    limits = {}
+    for part in filter(None, (p.strip() for p in value.split(","))):
+        kind, _, limit = part.partition("=")
+        limits[kind.strip()] = int(limit)
+    return limits
+
+
+# ---------- dentro dos processos ----------
+def _init_worker(preload: Sequence[str]) -> None:
+    # O Ctrl+C é tratado pelo processo principal, que fecha o pool
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    for module in preload:
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            pass
+
+
+def _raise_timeout(signum, frame) -> None:
+    raise JobTimeout()
+
+
+def _call(func: Callable[..., Any], args: tuple, kwargs: dict, timeout: Optional[float]) -> Any:
+    # O trabalho corre na thread principal do processo, por isso um alarme
+    # consegue interrompê-lo a meio (ex. um extract_info pendurado)
+    if timeout and hasattr(signal, "setitimer"):
+        signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return func(*args, **kwargs)
+    finally:
+        if timeout and hasattr(signal, "setitimer"):
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def _ping() -> int:
+    time.sleep(0.05)  # para cada ping ficar num processo diferente
+    return os.getpid()
+
+
+# ---------- processo principal ----------
+def _release_from_thread(loop: asyncio.AbstractEventLoop, release: Callable[[], None], job) -> None:
+    # Os callbacks de um concurrent.futures.Future correm na thread do executor
+    try:
+        loop.call_soon_threadsafe(release)
+    except RuntimeError:
+        pass  # o loop já fechou
+
+
+class WorkerPool:
+    def __init__(
+        self,
+        *,
+        processes: int = 2,
+        limits: Optional[Dict[str, int]] = None,
+        timeout: float = 60.0,
+        preload: Sequence[str] = DEFAULT_PRELOAD,
+        metrics: Optional[MetricsRegistry] = None,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        self.processes = processes
+        self.limits = limits or {}
+        self.timeout = timeout
+        self.preload = tuple(preload)
+        self.logger = logger or logging.getLogger(__name__)
+        self._executor: Optional[concurrent.futures.Executor] = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.waiting: Dict[str, int] = {}
+        self.running: Dict[str, int] = {}
+
+        self._jobs = self._duration = None
+        if metrics is not None:
+            self._jobs = metrics.counter(
+                "worker_jobs_total", "Trabalhos no pool de processos por tipo e resultado.", ("kind", "outcome")
+            )
+            self._duration = metrics.histogram(
+                "worker_job_seconds", "Duração dos trabalhos no pool (sem o tempo na fila).", ("kind",)
+            )
+            queue = metrics.gauge("worker_jobs_waiting", "Trabalhos à espera de vaga (limite do tipo ou processo livre).", ("kind",))
+            queue.set_function(lambda: {(kind,): float(n) for kind, n in self.waiting.items()})
+            busy = metrics.gauge("worker_jobs_running", "Trabalhos a correr no pool, por tipo.", ("kind",))
+            busy.set_function(lambda: {(kind,): float(n) for kind, n in self.running.items()})
+
+    @property
+    def uses_processes(self) -> bool:
+        return self.processes > 0
+
+    def _context(self):
+        # fork a partir de um processo com threads (logs, watchdog) pode deixar locks presos
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        context = multiprocessing.get_context(method)
+        if method == "forkserver":
+            # os processos nascem de um servidor que já importou os módulos pesados
+            context.set_forkserver_preload([m for m in self.preload if importlib.util.find_spec(m.split(".")[0])])
+        return context
+
+    def _get_executor(self) -> concurrent.futures.Executor:
+        if self._executor is None:
+            if self.uses_processes:
+                self._executor = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=self.processes,
+                    mp_context=self._context(),
+                    initializer=_init_worker,
+                    initargs=(self.preload,),
+                )
+            else:
+                self._executor = concurrent.futures.ThreadPoolExecutor(thread_name_prefix="worker")
+        return self._executor
+
+    async def start(self) -> None:
+        """Arranca os processos já com o preload feito, para o primeiro comando não pagar o custo."""
+        if not self.uses_processes:
+            return
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        pids = await asyncio.gather(*(loop.run_in_executor(executor, _ping) for _ in range(self.processes)))
+        self.logger.info(
+            f"Pool de processos pronto: {len(set(pids))} processos em {time.perf_counter() - started:.1f}s "
+            f"(limites {self.limits or 'nenhum'})"
+        )
+
+    def _semaphore(self, kind: str) -> asyncio.Semaphore:
+        semaphore = self._semaphores.get(kind)
+        if semaphore is None:
+            limit = self.limits.get(kind) or max(self.processes, 1)
+            semaphore = self._semaphores[kind] = asyncio.Semaphore(limit)
+        return semaphore
+
+    def _process_slots(self) -> Optional[asyncio.Semaphore]:
+        # Um lugar por processo: só se entrega o trabalho ao executor com um
+        # processo livre, para a fila interna do executor estar sempre vazia
+        if not self.uses_processes:
+            return None
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.processes)
+        return self._slots
+
+    async def run(self, kind: str, func: Callable[..., Any], *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """
+        Corre `func(*args, **kwargs)` num processo e devolve o resultado.
+
+        :param kind: Tipo de trabalho ("ytdlp", "html", ...): define o limite de simultâneos.
+        :param timeout: Segundos (por defeito o do pool), contados a partir do momento em
+            que o trabalho começa num processo (o tempo na fila não conta). Ao fim deste
+            tempo o trabalho é interrompido no processo e levanta `JobTimeout`.
+        :raises JobTimeout: Se passar do tempo máximo.
+        """
+        timeout = timeout or self.timeout
+        semaphore = self._semaphore(kind)
+        slots = self._process_slots()
+        self.waiting[kind] = self.waiting.get(kind, 0) + 1
+        try:
+            await semaphore.acquire()
+            try:
+                if slots is not None:
+                    await slots.acquire()
+            except BaseException:
+                semaphore.release()
+                raise
+        finally:
+            self.waiting[kind] -= 1
+
+        self.running[kind] = self.running.get(kind, 0) + 1
+        started = time.perf_counter()
+        outcome = "error"
+        job: Optional[concurrent.futures.Future] = None
+        try:
+            if self.uses_processes:
+                call = functools.partial(_call, func, args, kwargs, timeout)
+            else:
+                call = functools.partial(func, *args, **kwargs)
+            job = self._get_executor().submit(call)
+            # Nos processos o alarme interrompe o trabalho; o wait_for é só uma rede de segurança.
+            # Cancelar o comando não para um trabalho que já começou (ver o finally).
+            try:
+                result = await asyncio.wait_for(
+                    asyncio.wrap_future(job), timeout + 5 if self.uses_processes else timeout
+                )
+            except asyncio.TimeoutError:
+                raise JobTimeout() from None
+            outcome = "ok"
+            return result
+        except JobTimeout:
+            outcome = "timeout"
+            self.logger.warning(f"Trabalho {kind} ({getattr(func, '__qualname__', func)}) passou de {timeout:g}s")
+            raise
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            raise
+        except BrokenProcessPool:
+            # um processo morreu (ex. falta de memória): o executor não recupera, cria-se outro
+            self.logger.error("Pool de processos avariado, a recriar")
+            self._discard_executor()
+            raise
+        finally:
+            def release() -> None:
+                self.running[kind] -= 1
+                if slots is not None:
+                    slots.release()
+                semaphore.release()
+
+            if job is None or job.done():
+                release()
+            else:
+                # Cancelado (ou passou da rede de segurança) com o trabalho ainda a correr:
+                # o processo continua ocupado, por isso a vaga só se liberta quando acabar
+                job.add_done_callback(functools.partial(_release_from_thread, asyncio.get_running_loop(), release))
+            if self._jobs is not None:
+                self._jobs.inc(kind=kind, outcome=outcome)
+                if outcome in ("ok", "error"):
+                    self._duration.observe(time.perf_counter() - started, kind=kind)
+
+    def _discard_executor(self) -> None:
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    async def close(self) -> None:
+        executor, self._executor = self._executor, None
+        if executor is None:
+            return
+        executor.shutdown(wait=False, cancel_futures=True)
+        # espera pelos processos fora do loop (trabalhos a meio acabam ou chegam ao alarme)
+        await asyncio.to_thread(executor.shutdown, wait=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": "processes" if self.uses_processes else "threads",
+            "processes": self.processes,
+            "running": {k: v for k, v in self.running.items() if v},
+            "waiting": {k: v for k, v in self.waiting.items() if v},
+        }
+